@@ -12,7 +12,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import models for Alembic to detect
 from app.db.session import Base
-from app.models import user, webauthn, category, item, bookmark, notification
+from app.models import user, webauthn, category, item, bookmark, notification, counter, rollup, rendered_content, item_view, refresh_token
 
 
 # this is the Alembic Config object, which provides
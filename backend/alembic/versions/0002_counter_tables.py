@@ -0,0 +1,75 @@
+"""Counter tables
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-01-15
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'item',
+        sa.Column('bookmark_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.create_index('ix_item_bookmark_count', 'item', ['bookmark_count'])
+    op.add_column(
+        'user',
+        sa.Column('unread_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    
+    # Create counter table
+    op.create_table(
+        'counter',
+        sa.Column('id', sa.Integer(), primary_key=True, index=True),
+        sa.Column('key', sa.String(), unique=True, index=True, nullable=False),
+        sa.Column('value', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(), default=sa.func.now(), onupdate=sa.func.now()),
+    )
+    
+    # Backfill per-row counters
+    op.execute(
+        'UPDATE item SET bookmark_count = '
+        '(SELECT COUNT(*) FROM bookmark WHERE bookmark.item_id = item.id)'
+    )
+    op.execute(
+        'UPDATE "user" SET unread_count = '
+        '(SELECT COUNT(*) FROM notification '
+        'WHERE notification.user_id = "user".id AND notification.is_read = false)'
+    )
+    
+    # Backfill global counters
+    op.execute(
+        "INSERT INTO counter (key, value, created_at, updated_at) "
+        "SELECT 'users.role.' || lower(role), COUNT(*), now(), now() FROM \"user\" GROUP BY role"
+    )
+    op.execute(
+        "INSERT INTO counter (key, value, created_at, updated_at) "
+        "SELECT 'items.category.' || category.id, COUNT(item.id), now(), now() "
+        "FROM category LEFT JOIN item ON item.category_id = category.id GROUP BY category.id"
+    )
+    op.execute(
+        "INSERT INTO counter (key, value, created_at, updated_at) VALUES "
+        "('users.active', (SELECT COUNT(*) FROM \"user\" WHERE is_active = true), now(), now()), "
+        "('categories.total', (SELECT COUNT(*) FROM category), now(), now()), "
+        "('items.featured', (SELECT COUNT(*) FROM item WHERE is_featured = true), now(), now()), "
+        "('bookmarks.total', (SELECT COUNT(*) FROM bookmark), now(), now()), "
+        "('notifications.total', (SELECT COUNT(*) FROM notification), now(), now()), "
+        "('notifications.unread', (SELECT COUNT(*) FROM notification WHERE is_read = false), now(), now())"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('counter')
+    op.drop_column('user', 'unread_count')
+    op.drop_index('ix_item_bookmark_count', table_name='item')
+    op.drop_column('item', 'bookmark_count')
@@ -0,0 +1,49 @@
+"""Engagement rollups
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-01-22
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Create engagement_rollup table
+    op.create_table(
+        'engagement_rollup',
+        sa.Column('id', sa.Integer(), primary_key=True, index=True),
+        sa.Column('metric', sa.String(), nullable=False),
+        sa.Column('granularity', sa.String(), nullable=False),
+        sa.Column('dimension', sa.String(), nullable=False, server_default=''),
+        sa.Column('bucket', sa.DateTime(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(), default=sa.func.now(), onupdate=sa.func.now()),
+        sa.UniqueConstraint(
+            'metric', 'granularity', 'dimension', 'bucket',
+            name='uq_engagement_rollup_bucket',
+        ),
+    )
+    
+    # Create rollup_watermark table
+    op.create_table(
+        'rollup_watermark',
+        sa.Column('id', sa.Integer(), primary_key=True, index=True),
+        sa.Column('metric', sa.String(), unique=True, index=True, nullable=False),
+        sa.Column('last_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(), default=sa.func.now(), onupdate=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('rollup_watermark')
+    op.drop_table('engagement_rollup')
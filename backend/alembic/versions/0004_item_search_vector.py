@@ -0,0 +1,50 @@
+"""Item full-text search
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-02-03
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE item ADD COLUMN search_vector tsvector")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION item_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector :=
+                setweight(to_tsvector('english', coalesce(NEW.name, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B') ||
+                setweight(to_tsvector('english', coalesce(NEW.content, '')), 'C');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER item_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF name, description, content ON item
+        FOR EACH ROW EXECUTE PROCEDURE item_search_vector_update()
+    """)
+    
+    # Backfill existing rows, then index them
+    op.execute("""
+        UPDATE item SET search_vector =
+            setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(content, '')), 'C')
+    """)
+    op.execute("CREATE INDEX ix_item_search_vector ON item USING gin (search_vector)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_item_search_vector")
+    op.execute("DROP TRIGGER IF EXISTS item_search_vector_trigger ON item")
+    op.execute("DROP FUNCTION IF EXISTS item_search_vector_update()")
+    op.execute("ALTER TABLE item DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,26 @@
+"""Keyset pagination indexes
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2025-02-10
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_item_name_id', 'item', ['name', 'id'])
+    op.create_index('ix_notification_user_created', 'notification', ['user_id', 'created_at', 'id'])
+    op.create_index('ix_bookmark_user_id_id', 'bookmark', ['user_id', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bookmark_user_id_id', table_name='bookmark')
+    op.drop_index('ix_notification_user_created', table_name='notification')
+    op.drop_index('ix_item_name_id', table_name='item')
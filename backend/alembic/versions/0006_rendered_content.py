@@ -0,0 +1,37 @@
+"""Rendered item content
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2025-02-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'rendered_content',
+        sa.Column('id', sa.Integer(), primary_key=True, index=True),
+        sa.Column('content_hash', sa.String(64), unique=True, index=True, nullable=False),
+        sa.Column('html', sa.Text(), nullable=False),
+        sa.Column('toc', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(), default=sa.func.now(), onupdate=sa.func.now()),
+    )
+    op.add_column('item', sa.Column('content_hash', sa.String(64), nullable=True))
+    op.create_index('ix_item_content_hash', 'item', ['content_hash'])
+    # Existing items are rendered on first view, or in bulk with
+    # python -m scripts.render_content
+
+
+def downgrade() -> None:
+    op.drop_index('ix_item_content_hash', table_name='item')
+    op.drop_column('item', 'content_hash')
+    op.drop_table('rendered_content')
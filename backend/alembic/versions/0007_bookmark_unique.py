@@ -0,0 +1,35 @@
+"""Unique bookmark per user and item
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2025-02-24
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Drop duplicates left by concurrent creates, keeping the oldest
+    op.execute(
+        'DELETE FROM bookmark WHERE id NOT IN '
+        '(SELECT MIN(id) FROM bookmark GROUP BY user_id, item_id)'
+    )
+    op.execute(
+        'UPDATE item SET bookmark_count = '
+        '(SELECT COUNT(*) FROM bookmark WHERE bookmark.item_id = item.id)'
+    )
+    op.execute(
+        "UPDATE counter SET value = (SELECT COUNT(*) FROM bookmark) "
+        "WHERE key = 'bookmarks.total'"
+    )
+    op.create_unique_constraint('uq_bookmark_user_item', 'bookmark', ['user_id', 'item_id'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_bookmark_user_item', 'bookmark', type_='unique')
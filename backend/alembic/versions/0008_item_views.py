@@ -0,0 +1,34 @@
+"""Daily item view counters
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2025-03-03
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'item_view',
+        sa.Column('id', sa.Integer(), primary_key=True, index=True),
+        sa.Column('item_id', sa.Integer(), sa.ForeignKey('item.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('views', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(), default=sa.func.now(), onupdate=sa.func.now()),
+        sa.UniqueConstraint('item_id', 'day', name='uq_item_view_item_day'),
+    )
+    op.create_index('ix_item_view_day_item', 'item_view', ['day', 'item_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_item_view_day_item', table_name='item_view')
+    op.drop_table('item_view')
@@ -0,0 +1,40 @@
+"""Rotating refresh tokens
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2025-03-10
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'refresh_token',
+        sa.Column('id', sa.Integer(), primary_key=True, index=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('user.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('token_hash', sa.String(64), nullable=False),
+        sa.Column('family_id', sa.String(32), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('used_at', sa.DateTime(), nullable=True),
+        sa.Column('revoked_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(), default=sa.func.now(), onupdate=sa.func.now()),
+    )
+    op.create_index('ix_refresh_token_token_hash', 'refresh_token', ['token_hash'], unique=True)
+    op.create_index('ix_refresh_token_user_id', 'refresh_token', ['user_id'])
+    op.create_index('ix_refresh_token_family_id', 'refresh_token', ['family_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_refresh_token_family_id', table_name='refresh_token')
+    op.drop_index('ix_refresh_token_user_id', table_name='refresh_token')
+    op.drop_index('ix_refresh_token_token_hash', table_name='refresh_token')
+    op.drop_table('refresh_token')
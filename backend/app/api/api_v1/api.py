@@ -6,7 +6,7 @@ MIT License
 
 from fastapi import APIRouter
 
-from app.api.api_v1.endpoints import auth, users, categories, items, bookmarks, notifications, statistics
+from app.api.api_v1.endpoints import auth, users, categories, items, bookmarks, notifications, statistics, export
 
 api_router = APIRouter()
 
@@ -16,4 +16,5 @@ api_router.include_router(categories.router, prefix="/categories", tags=["catego
 api_router.include_router(items.router, prefix="/items", tags=["items"])
 api_router.include_router(bookmarks.router, prefix="/bookmarks", tags=["bookmarks"])
 api_router.include_router(notifications.router, prefix="/notifications", tags=["notifications"])
-api_router.include_router(statistics.router, prefix="/statistics", tags=["statistics"]) 
\ No newline at end of file
+api_router.include_router(statistics.router, prefix="/statistics", tags=["statistics"])
+api_router.include_router(export.router, prefix="/export", tags=["export"]) 
\ No newline at end of file
@@ -2,38 +2,49 @@ from datetime import timedelta
 from typing import Any, Dict
 
 from fastapi import APIRouter, Body, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
 from app.api import deps
+from app.core import hashing
 from app.core.config import settings
 from app.core.security import create_access_token
-from app.models.user import User
-from app.schemas.token import Token
-from app.schemas.user import UserCreate
+from app.schemas.token import RefreshTokenRequest, Token
+from app.schemas.user import Principal, UserCreate
 from app.schemas.webauthn import (
     WebAuthnRegistrationOptions,
     WebAuthnRegistrationResponse,
     WebAuthnAuthenticationOptions,
     WebAuthnAuthenticationResponse,
 )
+from app.services import refresh_token as refresh_token_service
 from app.services import user as user_service
 from app.services import webauthn as webauthn_service
 
 router = APIRouter()
 
 
-@router.post("/login", response_model=Token)
-def login_access_token(
+@router.post("/login", response_model=Token, dependencies=[Depends(deps.limit_login)])
+async def login_access_token(
     db: Session = Depends(deps.get_db),
     form_data: OAuth2PasswordRequestForm = Depends(),
 ) -> Any:
     """
-    Get an access token for future requests using username and password
+    Get an access token for future requests using username and password.
+    Attempts are throttled per client IP, per email and overall (429).
+    The password is checked in the hashing pool, and rehashed if it was
+    hashed with an outdated cost; when the pool is saturated the response
+    is 503 with a Retry-After header.
     """
-    user = user_service.authenticate(
-        db, email=form_data.username, password=form_data.password
-    )
+    user = await run_in_threadpool(user_service.get_by_email, db, email=form_data.username)
+    if user:
+        valid, new_hash = await hashing.check_and_update_password_async(form_data.password, user.hashed_password)
+        if not valid:
+            user = None
+        elif new_hash:
+            # Upgrade hashes made with an older BCRYPT_ROUNDS
+            await run_in_threadpool(user_service.rehash, db, user, new_hash)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -53,26 +64,30 @@ def login_access_token(
             subject=user.id, expires_delta=access_token_expires
         ),
         "token_type": "bearer",
+        "refresh_token": await run_in_threadpool(refresh_token_service.issue, db, user.id),
     }
 
 
 @router.post("/register", response_model=Token)
-def register_user(
+async def register_user(
     *,
     db: Session = Depends(deps.get_db),
     user_in: UserCreate,
 ) -> Any:
     """
-    Register a new user
+    Register a new user.
+    The password is hashed in the hashing pool; when that is saturated
+    the response is 503 with a Retry-After header.
     """
-    user = user_service.get_by_email(db, email=user_in.email)
+    user = await run_in_threadpool(user_service.get_by_email, db, email=user_in.email)
     if user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="A user with this email already exists",
         )
     
-    user = user_service.create(db, obj_in=user_in)
+    hashed_password = await hashing.hash_password_async(user_in.password)
+    user = await run_in_threadpool(user_service.create, db, obj_in=user_in, hashed_password=hashed_password)
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
@@ -81,15 +96,61 @@ def register_user(
             subject=user.id, expires_delta=access_token_expires
         ),
         "token_type": "bearer",
+        "refresh_token": await run_in_threadpool(refresh_token_service.issue, db, user.id),
     }
 
 
+@router.post("/refresh", response_model=Token)
+def refresh_access_token(
+    *,
+    db: Session = Depends(deps.get_db),
+    token_in: RefreshTokenRequest,
+) -> Any:
+    """
+    Exchange a refresh token for a new access token and a new refresh token.
+    Each refresh token works once: presenting a used one again revokes
+    every token issued from the same login.
+    """
+    rotated = refresh_token_service.rotate(db, token_in.refresh_token)
+    if not rotated:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    user_id, refresh_token = rotated
+    
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    
+    return {
+        "access_token": create_access_token(
+            subject=user_id, expires_delta=access_token_expires
+        ),
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+    }
+
+
+@router.post("/logout", response_model=Dict[str, Any])
+def logout(
+    *,
+    db: Session = Depends(deps.get_db),
+    token_in: RefreshTokenRequest,
+) -> Any:
+    """
+    Revoke a refresh token and every token issued from the same login.
+    Access tokens already issued stay valid until they expire.
+    """
+    revoked = refresh_token_service.revoke(db, token_in.refresh_token)
+    return {"status": "success", "revoked": revoked}
+
+
 # WebAuthn Registration
 @router.post("/webauthn/register/options", response_model=Dict[str, Any])
 def webauthn_register_options(
     *,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Get WebAuthn registration options for the current user
@@ -106,7 +167,7 @@ def webauthn_register_options(
 def webauthn_register_verify(
     *,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
     credential: Dict[str, Any] = Body(...),
     expected_challenge: str = Body(...),
 ) -> Any:
@@ -158,7 +219,7 @@ def webauthn_login_options(
         )
 
 
-@router.post("/webauthn/login/verify", response_model=Token)
+@router.post("/webauthn/login/verify", response_model=Token, dependencies=[Depends(deps.limit_webauthn_login)])
 def webauthn_login_verify(
     *,
     db: Session = Depends(deps.get_db),
@@ -166,7 +227,8 @@ def webauthn_login_verify(
     expected_challenge: str = Body(...),
 ) -> Any:
     """
-    Verify WebAuthn authentication
+    Verify WebAuthn authentication.
+    Attempts are throttled per client IP and overall (429).
     """
     try:
         # In a real application, retrieve the challenge from a secure store
@@ -183,6 +245,7 @@ def webauthn_login_verify(
                 subject=user.id, expires_delta=access_token_expires
             ),
             "token_type": "bearer",
+            "refresh_token": refresh_token_service.issue(db, user.id),
         }
     
     except Exception as e:
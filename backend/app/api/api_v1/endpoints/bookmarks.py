@@ -1,30 +1,58 @@
-from typing import Any, List
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 
-from app.api import deps
-from app.models.user import User
-from app.schemas.bookmark import Bookmark, BookmarkCreate
+from app.api import deps, fields as fieldsets
+from app.models.bookmark import Bookmark as BookmarkModel
+from app.models.item import Item as ItemModel
+from app.schemas.user import Principal
+from app.schemas.bookmark import (
+    Bookmark, BookmarkBatch, BookmarkBatchResult, BookmarkCheck, BookmarkCheckResult, BookmarkCreate, BookmarkSummary
+)
+from app.schemas.item import ItemSummary
 from app.services import bookmark as bookmark_service
 from app.services import item as item_service
+from app.services import pagination
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[Bookmark])
 def read_bookmarks(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(deps.get_current_active_user),
+    cursor: Optional[str] = None,
+    view: str = Query(fieldsets.FULL, pattern=fieldsets.VIEW_PATTERN),
+    fields: Optional[str] = None,
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Retrieve current user's bookmarks
+    Retrieve current user's bookmarks.
+    Follow the X-Next-Cursor response header with ?cursor= to page by keyset.
+    Use view=summary for BookmarkSummary rows with an ItemSummary, or
+    fields=item_id,created_at,... to get only those bookmark fields.
     """
+    columns = fieldsets.select_columns(view, fields, BookmarkSummary, BookmarkModel)
+    item_columns = fieldsets.schema_columns(ItemSummary, ItemModel) if columns is not None else None
     bookmarks = bookmark_service.get_all_by_user(
-        db, user_id=current_user.id, skip=skip, limit=limit
+        db,
+        user_id=current_user.id,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        columns=columns,
+        item_columns=item_columns,
     )
+    next_cursor = pagination.next_cursor(bookmarks, limit, bookmark_service.ORDER_BY)
+    if next_cursor:
+        response.headers[pagination.NEXT_CURSOR_HEADER] = next_cursor
+    if fields:
+        return fieldsets.render_sparse(bookmarks, columns, headers=response.headers)
+    if view == fieldsets.SUMMARY:
+        return fieldsets.render_summary(bookmarks, BookmarkSummary, headers=response.headers)
     return bookmarks
 
 
@@ -33,7 +61,7 @@ def create_bookmark(
     *,
     db: Session = Depends(deps.get_db),
     bookmark_in: BookmarkCreate,
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Create new bookmark
@@ -60,12 +88,50 @@ def create_bookmark(
     return bookmark
 
 
+@router.post("/batch", response_model=BookmarkBatchResult)
+def batch_bookmarks(
+    *,
+    db: Session = Depends(deps.get_db),
+    batch_in: BookmarkBatch,
+    current_user: Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Add and remove bookmarks for lists of item ids in one transaction.
+    Idempotent, so an offline client can replay its changes safely.
+    """
+    overlap = set(batch_in.add) & set(batch_in.remove)
+    if overlap:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Item ids in both add and remove: {sorted(overlap)}",
+        )
+    
+    added, removed, not_found = bookmark_service.apply_batch(
+        db, user_id=current_user.id, add=batch_in.add, remove=batch_in.remove
+    )
+    return {"added": added, "removed": removed, "not_found": not_found}
+
+
+@router.post("/check", response_model=BookmarkCheckResult)
+def check_bookmarks(
+    *,
+    db: Session = Depends(deps.get_db),
+    check_in: BookmarkCheck,
+    current_user: Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Get which of the given item ids the current user has bookmarked
+    """
+    bookmarked = bookmark_service.get_bookmarked_item_ids(db, current_user.id, check_in.item_ids)
+    return {"bookmarked": bookmarked}
+
+
 @router.delete("/{bookmark_id}", response_model=Bookmark)
 def delete_bookmark(
     *,
     db: Session = Depends(deps.get_db),
     bookmark_id: int,
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Delete a bookmark
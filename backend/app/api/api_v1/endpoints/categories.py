@@ -1,27 +1,51 @@
-from typing import Any, List
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
 
-from app.api import deps
-from app.models.user import User
-from app.schemas.category import Category, CategoryCreate, CategoryUpdate
+from app.api import conditional, deps, fields as fieldsets
+from app.models.category import Category as CategoryModel
+from app.schemas.user import Principal
+from app.schemas.category import Category, CategoryCreate, CategorySummary, CategoryUpdate
 from app.services import category as category_service
+from app.services import entity_cache
+from app.services import pagination
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[Category])
 def read_categories(
+    request: Request,
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(deps.get_current_active_user),
+    cursor: Optional[str] = None,
+    view: str = Query(fieldsets.FULL, pattern=fieldsets.VIEW_PATTERN),
+    fields: Optional[str] = None,
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Retrieve categories
+    Retrieve categories.
+    Follow the X-Next-Cursor response header with ?cursor= to page by keyset.
+    Use view=summary for CategorySummary rows, or fields=name,icon,... to get
+    only those fields.
+    Supports conditional requests with If-None-Match / If-Modified-Since.
     """
-    categories = category_service.get_all(db, skip=skip, limit=limit)
+    validators = conditional.validators(request, *category_service.get_version(db))
+    not_modified = conditional.check(request, response, validators)
+    if not_modified:
+        return not_modified
+    columns = fieldsets.select_columns(view, fields, CategorySummary, CategoryModel)
+    categories = category_service.get_all(db, skip=skip, limit=limit, cursor=cursor, columns=columns)
+    next_cursor = pagination.next_cursor(categories, limit, category_service.ORDER_BY)
+    if next_cursor:
+        response.headers[pagination.NEXT_CURSOR_HEADER] = next_cursor
+    if fields:
+        return fieldsets.render_sparse(categories, columns, headers=response.headers)
+    if view == fieldsets.SUMMARY:
+        return fieldsets.render_summary(categories, CategorySummary, headers=response.headers)
     return categories
 
 
@@ -30,7 +54,7 @@ def create_category(
     *,
     db: Session = Depends(deps.get_db),
     category_in: CategoryCreate,
-    current_user: User = Depends(deps.get_current_admin_user),
+    current_user: Principal = Depends(deps.get_current_admin_user),
 ) -> Any:
     """
     Create new category (admin only)
@@ -49,20 +73,26 @@ def create_category(
 @router.get("/{category_id}", response_model=Category)
 def read_category(
     *,
+    request: Request,
+    response: Response,
     db: Session = Depends(deps.get_db),
     category_id: int,
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Get category by ID
+    Get category by ID.
+    Supports conditional requests with If-None-Match / If-Modified-Since.
     """
-    category = category_service.get_by_id(db, category_id=category_id)
+    category = entity_cache.get_category(db, category_id=category_id)
     if not category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Category not found",
         )
     
+    not_modified = conditional.check(request, response, conditional.entity_validators(request, category))
+    if not_modified:
+        return not_modified
     return category
 
 
@@ -72,7 +102,7 @@ def update_category(
     db: Session = Depends(deps.get_db),
     category_id: int,
     category_in: CategoryUpdate,
-    current_user: User = Depends(deps.get_current_admin_user),
+    current_user: Principal = Depends(deps.get_current_admin_user),
 ) -> Any:
     """
     Update a category (admin only)
@@ -102,7 +132,7 @@ def delete_category(
     *,
     db: Session = Depends(deps.get_db),
     category_id: int,
-    current_user: User = Depends(deps.get_current_admin_user),
+    current_user: Principal = Depends(deps.get_current_admin_user),
 ) -> Any:
     """
     Delete a category (admin only)
@@ -0,0 +1,28 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from app.api import deps
+from app.schemas.user import Principal
+from app.services import export as export_service
+from app.services.export import ExportFormat, ExportTable
+
+router = APIRouter()
+
+
+@router.get("/{table}")
+def export_table(
+    table: ExportTable,
+    format: ExportFormat = ExportFormat.NDJSON,
+    current_user: Principal = Depends(deps.get_current_admin_user),
+) -> Any:
+    """
+    Stream a whole table as NDJSON or CSV (admin only).
+    Rows are read with a server-side cursor and sent as they are encoded.
+    """
+    return StreamingResponse(
+        export_service.stream(table, format),
+        media_type=export_service.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{table.value}.{format.value}"'},
+    )
@@ -1,13 +1,25 @@
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from fastapi import APIRouter, Body, Depends, HTTPException, status, Query, Request, Response, UploadFile, File
 from sqlalchemy.orm import Session
 
-from app.api import deps
-from app.models.user import User
-from app.schemas.item import Item, ItemCreate, ItemUpdate
+from app.api import conditional, deps, fields as fieldsets
+from app.core.config import settings
+from app.models.category import Category as CategoryModel
+from app.models.item import Item as ItemModel
+from app.models.item_view import ItemView
+from app.schemas.user import Principal
+from app.schemas.item import BulkItemResponse, Item, ItemCreate, ItemRendered, ItemSummary, ItemUpdate, RelatedItem
+from app.schemas.suggest import Suggestion
 from app.services import item as item_service
 from app.services import category as category_service
+from app.services import entity_cache
+from app.services import pagination
+from app.services import related as related_service
+from app.services import render as render_service
+from app.services import similar as similar_service
+from app.services import suggest as suggest_service
+from app.services import view_counter
 from app.utils.files import save_upload_file
 
 router = APIRouter()
@@ -15,6 +27,8 @@ router = APIRouter()
 
 @router.get("/", response_model=List[Item])
 def read_items(
+    request: Request,
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
@@ -22,29 +36,91 @@ def read_items(
     search: Optional[str] = None,
     is_featured: Optional[bool] = None,
     difficulty: Optional[str] = None,
-    current_user: User = Depends(deps.get_current_active_user),
+    cursor: Optional[str] = None,
+    sort: str = Query(item_service.SORT_NAME, pattern=item_service.SORT_PATTERN),
+    view: str = Query(fieldsets.FULL, pattern=fieldsets.VIEW_PATTERN),
+    fields: Optional[str] = None,
+    ids: Optional[List[int]] = Depends(deps.get_ids),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Retrieve items with filtering
-    """
-    items = item_service.get_all(
-        db, 
-        skip=skip, 
-        limit=limit, 
-        category_id=category_id,
-        search=search,
-        is_featured=is_featured,
-        difficulty=difficulty,
-    )
+    Retrieve items with filtering.
+    Use ids=1,2,3 to fetch those items in one query, in that order;
+    missing IDs are left out and the other filters are ignored.
+    Follow the X-Next-Cursor response header with ?cursor= to page by keyset.
+    Use sort=most_viewed to order by recent views instead of by name
+    (skip only, no cursor).
+    Use view=summary for ItemSummary rows without the content, or
+    fields=name,image,... to get only those fields.
+    Supports conditional requests with If-None-Match / If-Modified-Since.
+    """
+    models = [ItemModel, CategoryModel]
+    if sort == item_service.SORT_MOST_VIEWED:
+        models.append(ItemView)
+    validators = conditional.collection_validators(request, db, *models)
+    not_modified = conditional.check(request, response, validators)
+    if not_modified:
+        return not_modified
+    columns = fieldsets.select_columns(view, fields, ItemSummary, ItemModel)
+    if ids:
+        items = item_service.get_by_ids(db, ids)
+    else:
+        items = item_service.get_all(
+            db, 
+            skip=skip, 
+            limit=limit, 
+            category_id=category_id,
+            search=search,
+            is_featured=is_featured,
+            difficulty=difficulty,
+            cursor=cursor,
+            columns=columns,
+            sort=sort,
+        )
+    if not search and not ids and sort == item_service.SORT_NAME:
+        next_cursor = pagination.next_cursor(items, limit, item_service.ORDER_BY)
+        if next_cursor:
+            response.headers[pagination.NEXT_CURSOR_HEADER] = next_cursor
+    if fields:
+        return fieldsets.render_sparse(items, columns, headers=response.headers)
+    if view == fieldsets.SUMMARY:
+        return fieldsets.render_summary(items, ItemSummary, headers=response.headers)
     return items
 
 
+@router.get("/suggest", response_model=List[Suggestion])
+def suggest_items(
+    db: Session = Depends(deps.get_db),
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    kind: Optional[str] = Query(None, pattern="^(item|category)$"),
+    current_user: Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Suggest item and category names starting with a prefix
+    """
+    return suggest_service.suggest(db, q, limit=limit, kind=kind)
+
+
+@router.get("/similar", response_model=List[RelatedItem])
+def search_similar_items(
+    db: Session = Depends(deps.get_db),
+    q: str = Query(..., min_length=1, max_length=1000),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Get the items whose name, description and content are most like a free-text query
+    """
+    return _scored_items(db, similar_service.similar_to_text(db, q, limit=limit))
+
+
 @router.post("/", response_model=Item)
 def create_item(
     *,
     db: Session = Depends(deps.get_db),
     item_in: ItemCreate,
-    current_user: User = Depends(deps.get_current_admin_user),
+    current_user: Principal = Depends(deps.get_current_admin_user),
 ) -> Any:
     """
     Create new item (admin only)
@@ -61,33 +137,122 @@ def create_item(
     return item
 
 
-@router.get("/{item_id}", response_model=Item)
+@router.post("/bulk", response_model=BulkItemResponse)
+def create_items_bulk(
+    *,
+    db: Session = Depends(deps.get_db),
+    rows: List[Any] = Body(...),
+    chunk_size: int = Query(settings.ITEM_BULK_CHUNK_SIZE, ge=0),
+    current_user: Principal = Depends(deps.get_current_admin_user),
+) -> Any:
+    """
+    Create many items at once (admin only).
+    Each row is an ItemCreate payload. Invalid rows are reported and skipped
+    without failing the others. Rows are inserted and committed chunk_size
+    at a time; chunk_size=0 imports everything in one transaction.
+    """
+    if len(rows) > settings.ITEM_BULK_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.ITEM_BULK_MAX_ROWS} rows per request",
+        )
+    
+    results = item_service.bulk_create(db, rows, chunk_size=chunk_size)
+    failed = sum(1 for result in results if result["error"])
+    return {"created": len(results) - failed, "failed": failed, "results": results}
+
+
+@router.get("/{item_id}", response_model=Union[ItemRendered, Item])
 def read_item(
     *,
+    request: Request,
+    response: Response,
     db: Session = Depends(deps.get_db),
     item_id: int,
-    current_user: User = Depends(deps.get_current_active_user),
+    format: str = Query("markdown", pattern="^(markdown|html)$"),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Get item by ID
+    Get item by ID.
+    With format=html the content is returned as sanitized HTML with a
+    table of contents (ItemRendered) instead of markdown.
+    Supports conditional requests with If-None-Match / If-Modified-Since.
     """
-    item = item_service.get_by_id(db, item_id=item_id)
+    item = entity_cache.get_item(db, item_id=item_id)
     if not item:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Item not found",
         )
+    view_counter.record(item_id)
+    version = (item.id, item.updated_at, item.category.id, item.category.updated_at)
+    not_modified = conditional.check(request, response, conditional.validators(request, *version))
+    if not_modified:
+        return not_modified
     
+    if format == "html":
+        rendered = render_service.get_for_content(db, item.content)
+        return ItemRendered.model_validate({
+            **Item.model_validate(item).model_dump(exclude={"content"}),
+            "content_html": rendered.html,
+            "toc": rendered.toc,
+        })
     return item
 
 
+@router.get("/{item_id}/related", response_model=List[RelatedItem])
+def read_related_items(
+    *,
+    db: Session = Depends(deps.get_db),
+    item_id: int,
+    limit: int = Query(10, ge=1, le=settings.RELATED_TOP_K),
+    current_user: Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Get the items most often bookmarked by the learners who bookmarked this one
+    """
+    if not entity_cache.get_item(db, item_id=item_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Item not found",
+        )
+    return _scored_items(db, related_service.related(db, item_id, limit=limit))
+
+
+@router.get("/{item_id}/similar", response_model=List[RelatedItem])
+def read_similar_items(
+    *,
+    db: Session = Depends(deps.get_db),
+    item_id: int,
+    limit: int = Query(10, ge=1, le=50),
+    current_user: Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Get the items whose name, description and content are most like this one's
+    """
+    if not entity_cache.get_item(db, item_id=item_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Item not found",
+        )
+    return _scored_items(db, similar_service.similar_to_item(db, item_id, limit=limit))
+
+
+def _scored_items(db: Session, scores: List[Tuple[int, float]]) -> List[Dict[str, Any]]:
+    """Load the item summaries of (item_id, score) pairs, keeping their order."""
+    columns = fieldsets.schema_columns(ItemSummary, ItemModel)
+    items = {item.id: item for item in item_service.get_by_ids(db, [id_ for id_, _ in scores], columns=columns)}
+    # Items deleted since an index was built are left out
+    return [{"item": items[id_], "score": score} for id_, score in scores if id_ in items]
+
+
 @router.put("/{item_id}", response_model=Item)
 def update_item(
     *,
     db: Session = Depends(deps.get_db),
     item_id: int,
     item_in: ItemUpdate,
-    current_user: User = Depends(deps.get_current_admin_user),
+    current_user: Principal = Depends(deps.get_current_admin_user),
 ) -> Any:
     """
     Update an item (admin only)
@@ -117,7 +282,7 @@ def delete_item(
     *,
     db: Session = Depends(deps.get_db),
     item_id: int,
-    current_user: User = Depends(deps.get_current_admin_user),
+    current_user: Principal = Depends(deps.get_current_admin_user),
 ) -> Any:
     """
     Delete an item (admin only)
@@ -1,12 +1,13 @@
-from typing import Any, List
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 
 from app.api import deps
-from app.models.user import User
+from app.schemas.user import Principal
 from app.schemas.notification import Notification, NotificationCreate, NotificationUpdate
 from app.services import notification as notification_service
+from app.services import pagination
 from app.services import user as user_service
 
 router = APIRouter()
@@ -14,18 +15,24 @@ router = APIRouter()
 
 @router.get("/", response_model=List[Notification])
 def read_notifications(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     unread_only: bool = False,
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Retrieve current user's notifications
+    Retrieve current user's notifications.
+    Follow the X-Next-Cursor response header with ?cursor= to page by keyset.
     """
     notifications = notification_service.get_all_by_user(
-        db, user_id=current_user.id, skip=skip, limit=limit, unread_only=unread_only
+        db, user_id=current_user.id, skip=skip, limit=limit, unread_only=unread_only, cursor=cursor
     )
+    next_cursor = pagination.next_cursor(notifications, limit, notification_service.ORDER_BY)
+    if next_cursor:
+        response.headers[pagination.NEXT_CURSOR_HEADER] = next_cursor
     return notifications
 
 
@@ -34,7 +41,7 @@ def create_notification(
     *,
     db: Session = Depends(deps.get_db),
     notification_in: NotificationCreate,
-    current_user: User = Depends(deps.get_current_admin_user),
+    current_user: Principal = Depends(deps.get_current_admin_user),
 ) -> Any:
     """
     Create new notification (admin only)
@@ -54,7 +61,7 @@ def create_notification(
 @router.get("/mark-all-read", response_model=dict)
 def mark_all_notifications_read(
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Mark all notifications as read for current user
@@ -63,12 +70,24 @@ def mark_all_notifications_read(
     return {"success": True, "marked_count": count}
 
 
+@router.get("/unread-count", response_model=dict)
+def read_unread_count(
+    db: Session = Depends(deps.get_db),
+    current_user: Principal = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Get the number of unread notifications for current user
+    """
+    count = notification_service.get_unread_count(db, user_id=current_user.id)
+    return {"unread_count": count}
+
+
 @router.get("/{notification_id}", response_model=Notification)
 def read_notification(
     *,
     db: Session = Depends(deps.get_db),
     notification_id: int,
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Get notification by ID
@@ -96,7 +115,7 @@ def update_notification(
     db: Session = Depends(deps.get_db),
     notification_id: int,
     notification_in: NotificationUpdate,
-    current_user: User = Depends(deps.get_current_admin_user),
+    current_user: Principal = Depends(deps.get_current_admin_user),
 ) -> Any:
     """
     Update a notification (admin only)
@@ -117,7 +136,7 @@ def mark_notification_read(
     *,
     db: Session = Depends(deps.get_db),
     notification_id: int,
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Mark a notification as read
@@ -145,7 +164,7 @@ def delete_notification(
     *,
     db: Session = Depends(deps.get_db),
     notification_id: int,
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Delete a notification
@@ -4,74 +4,118 @@ Copyright (c) 2025 xPOURY4
 MIT License
 """
 
-from typing import Any, Dict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.api import deps
-from app.models.user import User
-from app.services import user as user_service
-from app.services import category as category_service
-from app.services import item as item_service
-from app.services import bookmark as bookmark_service
-from app.services import notification as notification_service
+from app.core import metrics
+from app.core.config import settings
+from app.schemas.user import Principal
+from app.schemas.statistics import TimeSeries
+from app.services import rollup as rollup_service
+from app.services import statistics as statistics_service
+from app.services.rollup import Granularity, Metric
 
 router = APIRouter()
 
+# Default look-back window for each granularity
+DEFAULT_RANGES = {
+    Granularity.MINUTE: timedelta(hours=6),
+    Granularity.HOUR: timedelta(days=7),
+    Granularity.DAY: timedelta(days=365),
+}
+
+
+def _as_naive_utc(value: datetime) -> datetime:
+    """Rollup buckets are stored as naive UTC, like every created_at column."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
 
 @router.get("/", response_model=Dict[str, Any])
 def read_statistics(
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_admin_user),
+    current_user: Principal = Depends(deps.get_current_admin_user),
 ) -> Any:
     """
     Get system statistics (admin only)
     """
-    total_users = len(user_service.get_all(db))
-    total_active_users = len([u for u in user_service.get_all(db) if u.is_active])
-    
-    total_categories = len(category_service.get_all(db))
-    total_items = len(item_service.get_all(db))
-    
-    # Get most bookmarked items
-    all_items = item_service.get_all(db)
-    item_bookmark_counts = {}
-    for item in all_items:
-        item_bookmark_counts[item.id] = len(item.bookmarks)
-    
-    top_bookmarked = sorted(
-        [(item_id, count) for item_id, count in item_bookmark_counts.items()],
-        key=lambda x: x[1],
-        reverse=True
-    )[:5]
-    
-    top_bookmarked_items = []
-    for item_id, count in top_bookmarked:
-        item = item_service.get_by_id(db, item_id)
-        if item:
-            top_bookmarked_items.append({
-                "id": item.id,
-                "name": item.name,
-                "bookmark_count": count
-            })
+    return statistics_service.get_cached_statistics()
+
+
+@router.get("/metrics", response_model=Dict[str, Any])
+def read_metrics(
+    current_user: Principal = Depends(deps.get_current_admin_user),
+) -> Any:
+    """
+    Get in-process cache and subsystem metrics for this worker (admin only)
+    """
+    return metrics.snapshot()
+
+
+@router.get("/timeseries", response_model=TimeSeries)
+def read_timeseries(
+    db: Session = Depends(deps.get_db),
+    metric: Metric = Metric.SIGNUPS,
+    granularity: Granularity = Granularity.DAY,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    dimension: str = "",
+    current_user: Principal = Depends(deps.get_current_admin_user),
+) -> Any:
+    """
+    Get a metric over time from the pre-aggregated rollups (admin only)
+    """
+    end = _as_naive_utc(end) if end else datetime.utcnow()
+    start = _as_naive_utc(start) if start else end - DEFAULT_RANGES[granularity]
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end",
+        )
+    if (end - start) / rollup_service.BUCKET_WIDTHS[granularity] > settings.ROLLUP_MAX_POINTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Range too large for this granularity",
+        )
     
+    series = rollup_service.get_series(
+        db, metric, granularity, start=start, end=end, dimension=dimension
+    )
+    return {
+        "metric": metric.value,
+        "granularity": granularity.value,
+        "dimension": dimension,
+        "start": start,
+        "end": end,
+        "points": [{"bucket": bucket, "count": total} for bucket, total in series],
+    }
+
+
+@router.get("/timeseries/dimensions", response_model=Dict[str, Any])
+def read_timeseries_dimensions(
+    db: Session = Depends(deps.get_db),
+    metric: Metric = Metric.NOTIFICATIONS,
+    current_user: Principal = Depends(deps.get_current_admin_user),
+) -> Any:
+    """
+    Get the breakdown values available for a metric (admin only)
+    """
     return {
-        "user_statistics": {
-            "total_users": total_users,
-            "total_active_users": total_active_users,
-            "admin_count": len([u for u in user_service.get_all(db) if u.role == "admin"]),
-            "member_count": len([u for u in user_service.get_all(db) if u.role == "member"]),
-        },
-        "content_statistics": {
-            "total_categories": total_categories,
-            "total_items": total_items,
-            "featured_items": len([i for i in all_items if i.is_featured]),
-        },
-        "engagement_statistics": {
-            "total_bookmarks": len(bookmark_service.get_all_by_user(db, current_user.id)),
-            "total_notifications": len(notification_service.get_all_by_user(db, current_user.id)),
-            "unread_notifications": len(notification_service.get_all_by_user(db, current_user.id, unread_only=True)),
-        },
-        "top_bookmarked_items": top_bookmarked_items
-    } 
\ No newline at end of file
+        "metric": metric.value,
+        "dimensions": rollup_service.get_dimensions(db, metric),
+    }
+
+
+@router.post("/timeseries/refresh", response_model=Dict[str, Any])
+def refresh_timeseries(
+    db: Session = Depends(deps.get_db),
+    current_user: Principal = Depends(deps.get_current_admin_user),
+) -> Any:
+    """
+    Fold new rows into the rollups (admin only)
+    """
+    return {"processed": rollup_service.run(db)}
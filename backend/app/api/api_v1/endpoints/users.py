@@ -1,12 +1,13 @@
-from typing import Any, List
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Body, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Body, Depends, HTTPException, status, Request, Response, UploadFile, File
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 
-from app.api import deps
+from app.api import conditional, deps
 from app.models.user import User
-from app.schemas.user import User as UserSchema, UserCreate, UserUpdate
+from app.schemas.user import Principal, User as UserSchema, UserCreate, UserUpdate
+from app.services import pagination
 from app.services import user as user_service
 
 router = APIRouter()
@@ -14,15 +15,32 @@ router = APIRouter()
 
 @router.get("/", response_model=List[UserSchema])
 def read_users(
+    request: Request,
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(deps.get_current_admin_user),
+    cursor: Optional[str] = None,
+    ids: Optional[List[int]] = Depends(deps.get_ids),
+    current_user: Principal = Depends(deps.get_current_admin_user),
 ) -> Any:
     """
-    Retrieve users (admin only)
+    Retrieve users (admin only).
+    Use ids=1,2,3 to fetch those users in one query, in that order;
+    missing IDs are left out.
+    Follow the X-Next-Cursor response header with ?cursor= to page by keyset.
+    Supports conditional requests with If-None-Match / If-Modified-Since.
     """
-    users = user_service.get_all(db, skip=skip, limit=limit)
+    validators = conditional.collection_validators(request, db, User)
+    not_modified = conditional.check(request, response, validators)
+    if not_modified:
+        return not_modified
+    if ids:
+        return user_service.get_by_ids(db, ids)
+    users = user_service.get_all(db, skip=skip, limit=limit, cursor=cursor)
+    next_cursor = pagination.next_cursor(users, limit, user_service.ORDER_BY)
+    if next_cursor:
+        response.headers[pagination.NEXT_CURSOR_HEADER] = next_cursor
     return users
 
 
@@ -31,7 +49,7 @@ def create_user(
     *,
     db: Session = Depends(deps.get_db),
     user_in: UserCreate,
-    current_user: User = Depends(deps.get_current_admin_user),
+    current_user: Principal = Depends(deps.get_current_admin_user),
 ) -> Any:
     """
     Create new user (admin only)
@@ -48,11 +66,17 @@ def create_user(
 
 @router.get("/me", response_model=UserSchema)
 def read_user_me(
-    current_user: User = Depends(deps.get_current_active_user),
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Get current user
+    Get current user.
+    Supports conditional requests with If-None-Match / If-Modified-Since.
     """
+    not_modified = conditional.check(request, response, conditional.entity_validators(request, current_user))
+    if not_modified:
+        return not_modified
     return current_user
 
 
@@ -61,23 +85,33 @@ def update_user_me(
     *,
     db: Session = Depends(deps.get_db),
     user_in: UserUpdate,
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Update current user
     """
-    user = user_service.update(db, db_obj=current_user, obj_in=user_in)
+    # current_user is a cached snapshot, so load the row to change
+    user = user_service.get_by_id(db, user_id=current_user.id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found",
+        )
+    user = user_service.update(db, db_obj=user, obj_in=user_in)
     return user
 
 
 @router.get("/{user_id}", response_model=UserSchema)
 def read_user_by_id(
+    request: Request,
+    response: Response,
     user_id: int,
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: Principal = Depends(deps.get_current_active_user),
     db: Session = Depends(deps.get_db),
 ) -> Any:
     """
-    Get a specific user by id
+    Get a specific user by id.
+    Supports conditional requests with If-None-Match / If-Modified-Since.
     """
     user = user_service.get_by_id(db, user_id=user_id)
     if not user:
@@ -93,6 +127,9 @@ def read_user_by_id(
             detail="Not enough permissions",
         )
     
+    not_modified = conditional.check(request, response, conditional.entity_validators(request, user))
+    if not_modified:
+        return not_modified
     return user
 
 
@@ -102,7 +139,7 @@ def update_user(
     db: Session = Depends(deps.get_db),
     user_id: int,
     user_in: UserUpdate,
-    current_user: User = Depends(deps.get_current_admin_user),
+    current_user: Principal = Depends(deps.get_current_admin_user),
 ) -> Any:
     """
     Update a user (admin only)
@@ -123,7 +160,7 @@ def delete_user(
     *,
     db: Session = Depends(deps.get_db),
     user_id: int,
-    current_user: User = Depends(deps.get_current_admin_user),
+    current_user: Principal = Depends(deps.get_current_admin_user),
 ) -> Any:
     """
     Delete a user (admin only)
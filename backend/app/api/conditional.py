@@ -0,0 +1,91 @@
+import datetime
+import hashlib
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional, Tuple
+
+from fastapi import Request, Response, status
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+Validators = Tuple[str, Optional[datetime.datetime]]
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a strong ETag from the values that identify a representation."""
+    digest = hashlib.sha256(repr(parts).encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def validators(request: Request, *versions: Any) -> Validators:
+    """
+    Get the ETag and Last-Modified of a response from values that change
+    whenever it does, typically (id, updated_at) pairs. The query string
+    is part of the ETag since it selects the representation.
+    """
+    last_modified = max(
+        (value for value in versions if isinstance(value, datetime.datetime)),
+        default=None,
+    )
+    return make_etag(request.url.path, request.url.query, *versions), last_modified
+
+
+def entity_validators(request: Request, *entities: Any) -> Validators:
+    """Get the ETag and Last-Modified of a response built from loaded entities."""
+    versions = []
+    for entity in entities:
+        if entity is not None:
+            versions.extend([type(entity).__name__, entity.id, entity.updated_at])
+    return validators(request, *versions)
+
+
+def collection_validators(request: Request, db: Session, *models: Any) -> Validators:
+    """
+    Get the ETag and Last-Modified of a list built from the tables of
+    models, from max(updated_at) and count(*) of each in one query.
+    Any insert, update or delete changes one of them.
+    """
+    columns = []
+    for model in models:
+        columns.append(select(func.max(model.updated_at)).scalar_subquery())
+        columns.append(select(func.count(model.id)).scalar_subquery())
+    return validators(request, *db.execute(select(*columns)).one())
+
+
+def _http_date(value: datetime.datetime) -> str:
+    # updated_at is stored as naive UTC
+    return format_datetime(value.replace(tzinfo=datetime.timezone.utc, microsecond=0), usegmt=True)
+
+
+def _is_not_modified(request: Request, etag: str, last_modified: Optional[datetime.datetime]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=datetime.timezone.utc)
+        return last_modified.replace(tzinfo=datetime.timezone.utc, microsecond=0) <= since
+    return False
+
+
+def check(request: Request, response: Response, validators: Validators) -> Optional[Response]:
+    """
+    Answer a conditional GET.
+
+    Returns a 304 response when the client's copy is current, so the
+    endpoint can return it before loading or serializing anything else.
+    Otherwise sets ETag and Last-Modified on response and returns None.
+    """
+    etag, last_modified = validators
+    headers = {"ETag": etag}
+    if last_modified:
+        headers["Last-Modified"] = _http_date(last_modified)
+    if _is_not_modified(request, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
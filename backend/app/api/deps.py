@@ -1,16 +1,18 @@
-from typing import Generator, Optional
+from typing import Generator, List, Optional
 
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from fastapi import Depends, HTTPException, Query, Request, status
+from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import jwt, JWTError
 from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
+from app.core import rate_limit
 from app.core.config import settings
 from app.core.security import verify_password
 from app.db.session import SessionLocal
-from app.models.user import User
 from app.schemas.token import TokenPayload
+from app.schemas.user import Principal
+from app.services import principal_cache
 from app.services import user as user_service
 
 oauth2_scheme = OAuth2PasswordBearer(
@@ -29,8 +31,16 @@ def get_db() -> Generator:
 
 def get_current_user(
     db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
-) -> User:
-    """Get the current authenticated user."""
+) -> Principal:
+    """
+    Get the current authenticated user.
+    A token seen before is served from the principal cache without
+    decoding it or touching the database.
+    """
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
@@ -43,7 +53,10 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = user_service.get_by_id(db, int(token_data.sub))
+    user_id = int(token_data.sub)
+    user = principal_cache.load(
+        token, user_id, token_data.exp, lambda: user_service.get_by_id(db, user_id)
+    )
     
     if not user:
         raise HTTPException(
@@ -55,8 +68,8 @@ def get_current_user(
 
 
 def get_current_active_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     """Get the current active user."""
     if not user_service.is_active(current_user):
         raise HTTPException(
@@ -67,12 +80,41 @@ def get_current_active_user(
 
 
 def get_current_admin_user(
-    current_user: User = Depends(get_current_active_user),
-) -> User:
+    current_user: Principal = Depends(get_current_active_user),
+) -> Principal:
     """Get the current admin user."""
     if not user_service.is_admin(current_user):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions",
         )
-    return current_user 
\ No newline at end of file
+    return current_user
+
+
+def get_ids(ids: Optional[str] = Query(None, description="Comma-separated IDs to fetch")) -> Optional[List[int]]:
+    """Parse a comma-separated ?ids= multi-get list."""
+    if ids is None:
+        return None
+    try:
+        parsed = [int(id_) for id_ in ids.split(",") if id_.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids must be comma-separated integers",
+        )
+    if not parsed or len(parsed) > settings.MULTI_GET_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"ids must list 1 to {settings.MULTI_GET_MAX_IDS} IDs",
+        )
+    return parsed
+
+
+def limit_login(request: Request, form_data: OAuth2PasswordRequestForm = Depends()) -> None:
+    """Throttle password logins per client IP, per email and overall."""
+    rate_limit.check_login(request.client.host if request.client else None, form_data.username)
+
+
+def limit_webauthn_login(request: Request) -> None:
+    """Throttle WebAuthn logins per client IP and overall."""
+    rate_limit.check_login(request.client.host if request.client else None)
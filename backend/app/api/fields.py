@@ -0,0 +1,52 @@
+from typing import Any, Iterable, List, Mapping, Optional, Type
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+FULL = "full"
+SUMMARY = "summary"
+VIEW_PATTERN = f"^({SUMMARY}|{FULL})$"
+
+
+def schema_columns(schema: Type[BaseModel], model: Any) -> List[str]:
+    """Get the fields of a schema that are plain columns of a model."""
+    columns = model.__table__.columns.keys()
+    return [name for name in schema.model_fields if name in columns]
+
+
+def parse_fields(fields: str, model: Any) -> List[str]:
+    """
+    Parse a comma-separated ?fields= list into column names of a model.
+    The id is always included; unknown names are rejected with 400.
+    """
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = sorted(set(requested) - set(model.__table__.columns.keys()))
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}",
+        )
+    return ["id"] + [name for name in dict.fromkeys(requested) if name != "id"]
+
+
+def select_columns(view: str, fields: Optional[str], summary: Type[BaseModel], model: Any) -> Optional[List[str]]:
+    """Resolve ?view= and ?fields= into the columns to load, or None for the full view."""
+    if fields:
+        return parse_fields(fields, model)
+    if view == SUMMARY:
+        return schema_columns(summary, model)
+    return None
+
+
+def render_sparse(rows: Iterable[Any], columns: List[str], headers: Optional[Mapping[str, str]] = None) -> JSONResponse:
+    """Serialize only the given columns of each row."""
+    content = [{name: getattr(row, name) for name in columns} for row in rows]
+    return JSONResponse(jsonable_encoder(content), headers=dict(headers or {}))
+
+
+def render_summary(rows: Iterable[Any], summary: Type[BaseModel], headers: Optional[Mapping[str, str]] = None) -> JSONResponse:
+    """Serialize rows with a summary schema."""
+    content = [summary.model_validate(row) for row in rows]
+    return JSONResponse(jsonable_encoder(content), headers=dict(headers or {}))
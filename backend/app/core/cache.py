@@ -0,0 +1,239 @@
+"""
+In-process caches.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SWRCache:
+    """
+    Single-value cache with a TTL and stale-while-revalidate.
+
+    While a value is fresh it is returned directly. Once it expires or is
+    invalidated, the first caller starts one background recompute and every
+    caller keeps getting the last value until the new one is ready. Only the
+    very first load, when there is nothing to serve, blocks (and only one
+    caller runs it).
+    """
+
+    def __init__(self, loader: Callable[[], Any], ttl: float) -> None:
+        self._loader = loader
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._value: Any = None
+        self._has_value = False
+        self._expires_at = 0.0
+        self._loaded_at = 0.0
+        self._generation = 0
+        self._refreshing = False
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.recomputes = 0
+        self.recompute_errors = 0
+        self.last_recompute_seconds = 0.0
+        self.total_recompute_seconds = 0.0
+
+    def get(self) -> Any:
+        """Get the cached value, recomputing it if needed."""
+        with self._lock:
+            if self._has_value:
+                if time.monotonic() < self._expires_at:
+                    self.hits += 1
+                    return self._value
+                self.stale_hits += 1
+                if not self._refreshing:
+                    self._refreshing = True
+                    threading.Thread(target=self._refresh, daemon=True).start()
+                return self._value
+            self.misses += 1
+
+        with self._load_lock:
+            with self._lock:
+                if self._has_value:
+                    return self._value
+                generation = self._generation
+            value = self._compute()
+            self._store(value, generation)
+            return value
+
+    def invalidate(self) -> None:
+        """Mark the current value as stale without dropping it."""
+        with self._lock:
+            self._generation += 1
+            self._expires_at = 0.0
+
+    def clear(self) -> None:
+        """Drop the current value so the next call loads synchronously."""
+        with self._lock:
+            self._generation += 1
+            self._value = None
+            self._has_value = False
+            self._expires_at = 0.0
+
+    def _compute(self) -> Any:
+        started = time.perf_counter()
+        try:
+            return self._loader()
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.recomputes += 1
+                self.last_recompute_seconds = elapsed
+                self.total_recompute_seconds += elapsed
+
+    def _store(self, value: Any, generation: int) -> None:
+        with self._lock:
+            self._value = value
+            self._has_value = True
+            self._loaded_at = time.monotonic()
+            # A write that landed while we were computing keeps the value stale
+            if generation == self._generation:
+                self._expires_at = self._loaded_at + self.ttl
+            else:
+                self._expires_at = 0.0
+
+    def _refresh(self) -> None:
+        with self._lock:
+            generation = self._generation
+        try:
+            value = self._compute()
+        except Exception:
+            with self._lock:
+                self.recompute_errors += 1
+            logger.exception("Background cache recompute failed")
+        else:
+            self._store(value, generation)
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit, miss and recompute counters."""
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            age: Optional[float] = (
+                time.monotonic() - self._loaded_at if self._has_value else None
+            )
+            return {
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+                "recomputes": self.recomputes,
+                "recompute_errors": self.recompute_errors,
+                "last_recompute_seconds": self.last_recompute_seconds,
+                "avg_recompute_seconds": (
+                    self.total_recompute_seconds / self.recomputes if self.recomputes else 0.0
+                ),
+                "age_seconds": age,
+            }
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache with optional per-entry TTL.
+
+    Bounded by number of entries and, when sizeof is given, by the total
+    size of the values; the least recently used entries are evicted first.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof or (lambda value: 0)
+        self._lock = threading.Lock()
+        # key -> (value, expires_at or None, size)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Optional[float], int]]" = OrderedDict()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a value, or default if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at, _ = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value; ttl overrides the cache default for this entry."""
+        ttl = self.ttl if ttl is None else ttl
+        size = self._sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            expires_at = time.monotonic() + ttl if ttl is not None else None
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        """Drop a value if it is cached."""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        """Drop all values."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def stats(self) -> Dict[str, Any]:
+        """Get size, hit and eviction counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,375 @@
+"""
+Response compression middleware.
+
+Negotiates zstd, brotli or gzip from Accept-Encoding. zstd and brotli are
+only offered when the optional zstandard / brotli packages are installed.
+"""
+
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics
+from app.core.cache import LRUCache
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+class Codec:
+    """A content coding with a fixed level, for whole bodies and for streams."""
+
+    name = ""
+
+    def compress(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+    def stream(self) -> "StreamCompressor":
+        raise NotImplementedError
+
+
+class StreamCompressor:
+    """Compresses a streamed body chunk by chunk, flushing after each one."""
+
+    def chunk(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+    def finish(self) -> bytes:
+        raise NotImplementedError
+
+
+class _ZlibStream(StreamCompressor):
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class GzipCodec(Codec):
+    name = "gzip"
+
+    def __init__(self, level: int) -> None:
+        self.level = min(max(level, 1), 9)
+
+    def compress(self, data: bytes) -> bytes:
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        return compressor.compress(data) + compressor.flush()
+
+    def stream(self) -> StreamCompressor:
+        return _ZlibStream(self.level)
+
+
+class _BrotliStream(StreamCompressor):
+    def __init__(self, quality: int) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class BrotliCodec(Codec):
+    name = "br"
+
+    def __init__(self, quality: int) -> None:
+        self.quality = min(max(quality, 0), 11)
+
+    def compress(self, data: bytes) -> bytes:
+        return brotli.compress(data, quality=self.quality)
+
+    def stream(self) -> StreamCompressor:
+        return _BrotliStream(self.quality)
+
+
+class _ZstdStream(StreamCompressor):
+    def __init__(self, compressor: Any) -> None:
+        self._compressor = compressor.compressobj()
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class ZstdCodec(Codec):
+    name = "zstd"
+
+    def __init__(self, level: int) -> None:
+        self.level = min(max(level, 1), 19)
+        self._local = threading.local()
+
+    def _compressor(self) -> Any:
+        # ZstdCompressor objects are not thread-safe
+        compressor = getattr(self._local, "compressor", None)
+        if compressor is None:
+            compressor = self._local.compressor = zstandard.ZstdCompressor(level=self.level)
+        return compressor
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor().compress(data)
+
+    def stream(self) -> StreamCompressor:
+        return _ZstdStream(zstandard.ZstdCompressor(level=self.level))
+
+
+def available_codecs(gzip_level: int = 6, brotli_quality: int = 4, zstd_level: int = 3) -> List[Codec]:
+    """Get the codecs this process can use, most preferred first."""
+    codecs: List[Codec] = []
+    if zstandard is not None:
+        codecs.append(ZstdCodec(zstd_level))
+    if brotli is not None:
+        codecs.append(BrotliCodec(brotli_quality))
+    codecs.append(GzipCodec(gzip_level))
+    return codecs
+
+
+def parse_accept_encoding(value: str) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into {coding: q}."""
+    accepted: Dict[str, float] = {}
+    for part in value.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, number = param.strip().partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(number)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def negotiate(accept_encoding: str, codecs: List[Codec]) -> Optional[Codec]:
+    """Pick the codec with the highest q-value, preferring earlier codecs on ties."""
+    accepted = parse_accept_encoding(accept_encoding)
+    best: Optional[Codec] = None
+    best_q = 0.0
+    for codec in codecs:
+        q = accepted.get(codec.name, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = codec, q
+    return best
+
+
+class _Stats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.by_codec: Dict[str, Dict[str, float]] = {}
+        self.skipped_small = 0
+        self.skipped_type = 0
+
+    def record(
+        self,
+        codec: str,
+        bytes_in: int,
+        bytes_out: int,
+        seconds: float,
+        responses: int = 1,
+        cached: bool = False,
+    ) -> None:
+        with self._lock:
+            entry = self.by_codec.setdefault(codec, {
+                "responses": 0, "cached": 0, "bytes_in": 0, "bytes_out": 0, "seconds": 0.0,
+            })
+            entry["responses"] += responses
+            entry["cached"] += cached
+            entry["bytes_in"] += bytes_in
+            entry["bytes_out"] += bytes_out
+            entry["seconds"] += seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "codecs": {
+                    name: {
+                        **entry,
+                        "ratio": entry["bytes_out"] / entry["bytes_in"] if entry["bytes_in"] else 0.0,
+                    }
+                    for name, entry in self.by_codec.items()
+                },
+                "skipped_small": self.skipped_small,
+                "skipped_type": self.skipped_type,
+            }
+
+
+class CompressionMiddleware:
+    """
+    Compress responses according to Accept-Encoding.
+
+    Bodies under minimum_size and non-text content types are sent as is.
+    Streamed bodies are compressed chunk by chunk. Complete 200 responses
+    to GET requests that carry an ETag are kept compressed in an LRU cache
+    keyed by ETag, so hot payloads are compressed once. Compressed
+    responses get a weak ETag, which conditional requests still match.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        zstd_level: int = 3,
+        cache_max_entries: int = 1024,
+        cache_max_bytes: int = 32 * 1024 * 1024,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.codecs = available_codecs(gzip_level, brotli_quality, zstd_level)
+        self.cache = LRUCache(cache_max_entries, max_bytes=cache_max_bytes, sizeof=len)
+        self.stats = _Stats()
+        metrics.register("compression", self.snapshot)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        codec = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.codecs)
+        if codec is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingResponder(self, codec, scope, send)
+        await self.app(scope, receive, responder.send)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.stats.snapshot(),
+            "available": [codec.name for codec in self.codecs],
+            "minimum_size": self.minimum_size,
+            "cache": self.cache.stats(),
+        }
+
+
+class _CompressingResponder:
+    def __init__(self, middleware: CompressionMiddleware, codec: Codec, scope: Scope, send: Send) -> None:
+        self.middleware = middleware
+        self.codec = codec
+        self.scope = scope
+        self._send = send
+        self.start: Optional[Message] = None
+        self.passthrough = False
+        self.stream: Optional[StreamCompressor] = None
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        if self.passthrough:
+            await self._send(message)
+        elif self.stream is not None:
+            await self._send_stream_chunk(message)
+        elif not self._compressible():
+            self.passthrough = True
+            await self._send(self.start)
+            await self._send(message)
+        elif message.get("more_body", False):
+            self.stream = self.codec.stream()
+            headers = MutableHeaders(scope=self.start)
+            del headers["content-length"]
+            self._set_encoding_headers(headers)
+            await self._send(self.start)
+            await self._send_stream_chunk(message)
+        else:
+            await self._send_whole(message.get("body", b""))
+
+    def _compressible(self) -> bool:
+        headers = Headers(scope=self.start)
+        status = self.start["status"]
+        if status < 200 or status in (204, 304) or "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            self.middleware.stats.skipped_type += 1
+            return False
+        return True
+
+    def _set_encoding_headers(self, headers: MutableHeaders) -> None:
+        headers["Content-Encoding"] = self.codec.name
+        headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+
+    def _cache_key(self) -> Optional[Tuple[str, str, str, bytes]]:
+        headers = Headers(scope=self.start)
+        etag = headers.get("etag")
+        if (
+            self.scope["method"] != "GET"
+            or self.start["status"] != 200
+            or not etag
+            or "no-store" in headers.get("cache-control", "")
+        ):
+            return None
+        return (self.codec.name, etag, self.scope["path"], self.scope.get("query_string", b""))
+
+    async def _send_whole(self, body: bytes) -> None:
+        if len(body) < self.middleware.minimum_size:
+            self.middleware.stats.skipped_small += 1
+            await self._send(self.start)
+            await self._send({"type": "http.response.body", "body": body})
+            return
+
+        key = self._cache_key()
+        compressed = self.middleware.cache.get(key) if key else None
+        started = time.perf_counter()
+        cached = compressed is not None
+        if compressed is None:
+            compressed = self.codec.compress(body)
+            if key:
+                self.middleware.cache.set(key, compressed)
+        self.middleware.stats.record(
+            self.codec.name, len(body), len(compressed), time.perf_counter() - started, cached=cached
+        )
+
+        headers = MutableHeaders(scope=self.start)
+        headers["Content-Length"] = str(len(compressed))
+        self._set_encoding_headers(headers)
+        await self._send(self.start)
+        await self._send({"type": "http.response.body", "body": compressed})
+
+    async def _send_stream_chunk(self, message: Message) -> None:
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        started = time.perf_counter()
+        data = self.stream.chunk(body) if body else b""
+        if not more_body:
+            data += self.stream.finish()
+        self.middleware.stats.record(
+            self.codec.name, len(body), len(data), time.perf_counter() - started, responses=int(not more_body)
+        )
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
@@ -21,6 +21,24 @@ class Settings(BaseSettings):
     SECRET_KEY: str = secrets.token_urlsafe(32)
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Refresh tokens are rotated on every use; an unused one lapses after this
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    
+    # Password hashing (bcrypt runs in its own process pool)
+    # Pick rounds with scripts/calibrate_bcrypt.py; older hashes are upgraded on login
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    
+    # Login throttling (sliding window; a limit of 0 disables it)
+    LOGIN_RATE_LIMIT_WINDOW_SECONDS: int = 60
+    LOGIN_RATE_LIMIT_PER_IP: int = 20
+    LOGIN_RATE_LIMIT_PER_EMAIL: int = 10
+    LOGIN_RATE_LIMIT_GLOBAL: int = 300
+    # "memory" keeps counters per worker; "redis" shares them (needs the redis package)
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_REDIS_URL: str = "redis://localhost:6379/0"
+    RATE_LIMIT_MAX_KEYS: int = 100000
     
     # Cross-Origin Resource Sharing (CORS)
     CORS_ORIGINS: List[AnyHttpUrl] = []
@@ -57,6 +75,61 @@ class Settings(BaseSettings):
     WEBAUTHN_RP_NAME: str = "Crypto Toolkit"
     WEBAUTHN_RP_ORIGIN: str = "https://localhost:8000"
     
+    # Statistics
+    STATISTICS_CACHE_TTL_SECONDS: int = 30
+    ROLLUP_BATCH_SIZE: int = 50000
+    ROLLUP_SAFETY_LAG_SECONDS: int = 60
+    ROLLUP_MAX_POINTS: int = 10000
+    
+    # Search suggestions
+    SUGGEST_MAX_ENTRIES: int = 500000
+    SUGGEST_INDEX_REFRESH_SECONDS: int = 300
+    
+    # Response compression (zstd and brotli need the zstandard / brotli packages)
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    COMPRESSION_CACHE_MAX_ENTRIES: int = 1024
+    COMPRESSION_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    
+    # Bulk item import
+    ITEM_BULK_MAX_ROWS: int = 50000
+    ITEM_BULK_CHUNK_SIZE: int = 1000
+    
+    # Export
+    EXPORT_BATCH_SIZE: int = 1000
+    
+    # Item and category snapshot cache (per process)
+    ENTITY_CACHE_TTL_SECONDS: int = 60
+    ENTITY_CACHE_MAX_ITEMS: int = 10000
+    ENTITY_CACHE_MAX_CATEGORIES: int = 1000
+    ENTITY_CACHE_MAX_CATEGORY_LIST: int = 1000
+    
+    # Related items (co-bookmark similarity)
+    RELATED_TOP_K: int = 20
+    RELATED_MIN_CO_BOOKMARKS: int = 1
+    RELATED_INDEX_REFRESH_SECONDS: int = 600
+    
+    # Similar items (TF-IDF over item text)
+    SIMILAR_INDEX_DIR: str = "data/similar"  # Relative to the backend directory
+    SIMILAR_MAX_FEATURES: int = 50000
+    SIMILAR_MIN_DF: int = 2
+    SIMILAR_RELOAD_SECONDS: int = 60
+    
+    # Item views (write-behind counters)
+    VIEW_FLUSH_INTERVAL_SECONDS: int = 10
+    VIEW_BUFFER_MAX_PENDING: int = 10000
+    VIEW_BUFFER_MAX_KEYS: int = 100000
+    MOST_VIEWED_WINDOW_DAYS: int = 30
+    
+    # Authenticated principal cache (per process, never past the token's exp)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    
+    # Multi-get (?ids=)
+    MULTI_GET_MAX_IDS: int = 100
+    
     # File Upload
     UPLOAD_FOLDER: str = "uploads"
     MAX_CONTENT_LENGTH: int = 16 * 1024 * 1024  # 16MB
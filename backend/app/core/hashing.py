@@ -0,0 +1,195 @@
+"""
+Password hashing in a dedicated process pool.
+
+bcrypt is slow on purpose and holds the GIL while it runs, so hashing in
+the request threadpool lets a burst of logins starve every other endpoint.
+Here it runs in PASSWORD_HASH_WORKERS worker processes instead. At most
+PASSWORD_HASH_MAX_PENDING hashes may be queued or running; past that
+calls fail fast with PoolBusy, which the app turns into a 503 with a
+Retry-After header, rather than queueing without bound.
+"""
+
+import asyncio
+import atexit
+import math
+import threading
+import time
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.security import get_password_hash, verify_and_update_password, verify_password
+
+
+class PoolBusy(Exception):
+    """Raised when the hashing queue is full."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("Password hashing is busy, try again later")
+        self.retry_after = retry_after
+
+
+def _timed(fn: Callable[..., Any], *args: Any) -> Tuple[float, Any]:
+    # Runs in the worker process, so the time excludes waiting in the queue
+    started = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - started, result
+
+
+class HashPool:
+    """A size-limited process pool with a bounded queue, started on first use."""
+
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+
+        self.submitted = 0
+        self.rejected = 0
+        self.failed = 0
+        self.restarts = 0
+        self.completed = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.total_hash_seconds = 0.0
+
+    def _retry_after(self) -> int:
+        # Roughly how long the current queue takes to drain
+        average = self.total_hash_seconds / self.completed if self.completed else 0.25
+        return max(1, math.ceil(self._pending * average / self.workers))
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        # A worker died (OOM kill, segfault) and took the executor with it;
+        # drop it so the next call starts a fresh one
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+                self.restarts += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> "Future[Any]":
+        """
+        Queue fn(*args) in a worker process. Raises PoolBusy if the queue is
+        full, or if a worker died, in which case the pool is restarted.
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise PoolBusy(self._retry_after())
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            self._pending += 1
+            self.submitted += 1
+            executor = self._executor
+        started = time.perf_counter()
+        result: "Future[Any]" = Future()
+
+        def done(future: "Future[Any]") -> None:
+            elapsed = time.perf_counter() - started
+            error = CancelledError() if future.cancelled() else future.exception()
+            if isinstance(error, BrokenProcessPool):
+                self._discard(executor)
+                error = PoolBusy(1)
+            with self._lock:
+                self._pending -= 1
+                if error is not None:
+                    self.failed += 1
+                else:
+                    hash_seconds, value = future.result()
+                    self.completed += 1
+                    self.total_seconds += elapsed
+                    self.max_seconds = max(self.max_seconds, elapsed)
+                    self.total_hash_seconds += hash_seconds
+            if error is not None:
+                result.set_exception(error)
+            else:
+                result.set_result(value)
+
+        try:
+            executor.submit(_timed, fn, *args).add_done_callback(done)
+        except BrokenProcessPool:
+            with self._lock:
+                self._pending -= 1
+                self.failed += 1
+            self._discard(executor)
+            raise PoolBusy(1)
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+        return result
+
+    def call(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run fn(*args) in a worker process and wait for the result."""
+        return self.submit(fn, *args).result()
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run fn(*args) in a worker process without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def shutdown(self) -> None:
+        """Stop the worker processes; the next call starts new ones."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get queue depth, rejection and latency counters."""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+                "started": self._executor is not None,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "restarts": self.restarts,
+                "avg_seconds": self.total_seconds / self.completed if self.completed else 0.0,
+                "max_seconds": self.max_seconds,
+                "avg_hash_seconds": self.total_hash_seconds / self.completed if self.completed else 0.0,
+            }
+
+
+pool = HashPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
+# Scripts and tests hash without the app's shutdown hook
+atexit.register(pool.shutdown)
+
+
+def hash_password(password: str) -> str:
+    """Hash a password in the pool, blocking the calling thread."""
+    return pool.call(get_password_hash, password)
+
+
+def check_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the pool, blocking the calling thread."""
+    return pool.call(verify_password, plain_password, hashed_password)
+
+
+def check_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password in the pool, rehashing it if its cost is outdated."""
+    return pool.call(verify_and_update_password, plain_password, hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password in the pool."""
+    return await pool.run(get_password_hash, password)
+
+
+async def check_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the pool."""
+    return await pool.run(verify_password, plain_password, hashed_password)
+
+
+async def check_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password in the pool, rehashing it if its cost is outdated."""
+    return await pool.run(verify_and_update_password, plain_password, hashed_password)
+
+
+metrics.register("password_hashing", pool.stats)
@@ -0,0 +1,21 @@
+"""
+Registry of in-process metrics.
+
+Subsystems register a callable returning a dict of their current counters;
+the admin metrics endpoint collects them on demand. Values are per worker
+process.
+"""
+
+from typing import Any, Callable, Dict
+
+_providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+
+def register(name: str, provider: Callable[[], Dict[str, Any]]) -> None:
+    """Register (or replace) a named metrics provider."""
+    _providers[name] = provider
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    """Collect the current values of every registered provider."""
+    return {name: provider() for name, provider in sorted(_providers.items())}
@@ -0,0 +1,282 @@
+"""
+Sliding-window rate limiting.
+
+Each key keeps two counters: hits in the current fixed window and hits in
+the previous one. The sliding-window estimate weighs the previous window
+by how much of it still overlaps the last `window` seconds, which tracks
+a true sliding log closely at the cost of two integers per key.
+
+Counters live in process memory by default, expiring two windows after
+their last hit and bounded by RATE_LIMIT_MAX_KEYS. With several workers
+set RATE_LIMIT_BACKEND=redis (needs the redis package) so they share the
+counters. Rejected hits are not counted, so an attacker cannot keep
+someone else's account locked by hammering it once the limit is reached,
+and a hit is counted against all of its limits or, if any of them
+rejects it, against none.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core import metrics
+from app.core.config import settings
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# (key, limit, window seconds)
+Check = Tuple[str, int, int]
+
+
+class RateLimited(Exception):
+    """Raised when a limit is exhausted."""
+
+    def __init__(self, limit: str, retry_after: int) -> None:
+        super().__init__("Too many attempts, try again later")
+        self.limit = limit
+        self.retry_after = retry_after
+
+
+def _weight(now: float, window: int) -> float:
+    # How much of the previous window still overlaps the last `window` seconds
+    return 1.0 - (now % window) / window
+
+
+def _retry_after(now: float, limit: int, window: int, current: int, previous: int) -> int:
+    """Seconds until one more hit fits under the limit."""
+    elapsed = now % window
+    if current >= limit:
+        # Wait for the next window, until current weighs in at most limit - 1
+        overlap = (limit - 1) / current
+        wait = window - elapsed + (1.0 - overlap) * window
+    else:
+        overlap = (limit - 1 - current) / previous if previous else 1.0
+        wait = (1.0 - overlap) * window - elapsed
+    return max(1, math.ceil(wait))
+
+
+class MemoryBackend:
+    """Per-process counters in an LRU-ordered dict."""
+
+    def __init__(self, max_keys: int) -> None:
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        # key -> [window index, previous count, current count, expires at]
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self.expirations = 0
+        self.evictions = 0
+
+    def hit(self, checks: Sequence[Check], now: float) -> Tuple[Optional[int], int, int]:
+        """
+        Count a hit on every (key, limit, window) check, unless one of them
+        would exceed its limit. Returns (index of the rejecting check or
+        None, its current count, its previous count).
+        """
+        with self._lock:
+            entries = []
+            for i, (key, limit, window) in enumerate(checks):
+                index = int(now // window)
+                entry = self._entries.get(key)
+                if entry is None:
+                    entry = [index, 0, 0, 0.0]
+                    self._entries[key] = entry
+                else:
+                    self._entries.move_to_end(key)
+                    if entry[0] != index:
+                        # Roll over: the old current window is the previous one only if adjacent
+                        entry[1] = entry[2] if entry[0] == index - 1 else 0
+                        entry[2] = 0
+                        entry[0] = index
+                entry[3] = (index + 2) * window
+                if entry[1] * _weight(now, window) + entry[2] + 1 > limit:
+                    self._prune(now)
+                    return i, int(entry[2]), int(entry[1])
+                entries.append(entry)
+            for entry in entries:
+                entry[2] += 1
+            self._prune(now)
+        return None, 0, 0
+
+    def _prune(self, now: float) -> None:
+        # Least recently hit keys come first, so expired ones gather there
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry[3] > now:
+                break
+            del self._entries[key]
+            self.expirations += 1
+        while len(self._entries) > self.max_keys:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "keys": len(self._entries),
+                "max_keys": self.max_keys,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+            }
+
+
+class RedisBackend:
+    """Counters shared by every worker, kept in Redis with expiring keys."""
+
+    # Atomically: check every limit, and count the hit on all of them only if all allow it.
+    # KEYS holds (current, previous) window keys and ARGV (weight, limit, ttl) per check.
+    SCRIPT = """
+    local checks = #KEYS / 2
+    for i = 1, checks do
+        local current = tonumber(redis.call('GET', KEYS[2 * i - 1]) or '0')
+        local previous = tonumber(redis.call('GET', KEYS[2 * i]) or '0')
+        if previous * tonumber(ARGV[3 * i - 2]) + current + 1 > tonumber(ARGV[3 * i - 1]) then
+            return {i, current, previous}
+        end
+    end
+    for i = 1, checks do
+        redis.call('INCR', KEYS[2 * i - 1])
+        redis.call('EXPIRE', KEYS[2 * i - 1], ARGV[3 * i])
+    end
+    return {0, 0, 0}
+    """
+
+    def __init__(self, url: str, prefix: str = "rate_limit:") -> None:
+        if redis is None:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis needs the redis package")
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(self.SCRIPT)
+        self.errors = 0
+
+    def hit(self, checks: Sequence[Check], now: float) -> Tuple[Optional[int], int, int]:
+        """
+        Count a hit on every (key, limit, window) check, unless one of them
+        would exceed its limit. Returns (index of the rejecting check or
+        None, its current count, its previous count).
+        """
+        keys: List[str] = []
+        args: List[Any] = []
+        for key, limit, window in checks:
+            index = int(now // window)
+            keys += [f"{self.prefix}{key}:{index}", f"{self.prefix}{key}:{index - 1}"]
+            args += [_weight(now, window), limit, 2 * window]
+        try:
+            rejected, current, previous = self._script(keys=keys, args=args)
+        except redis.RedisError:
+            # Fail open: an unreachable Redis must not lock everyone out
+            logger.exception("Rate limit backend unavailable")
+            self.errors += 1
+            return None, 0, 0
+        return (int(rejected) - 1 if rejected else None), int(current), int(previous)
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(f"{self.prefix}*"):
+            self._client.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "redis", "errors": self.errors}
+
+
+class Limit:
+    """At most `limit` hits per `window` seconds for each key; 0 disables it."""
+
+    def __init__(self, name: str, limit: int, window: int) -> None:
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.allowed = 0
+        self.rejected = 0
+
+
+class RateLimiter:
+    """Checks hits against limits on a shared backend."""
+
+    def __init__(self, backend: Any) -> None:
+        self.backend = backend
+        self._limits: Dict[str, Limit] = {}
+        self._lock = threading.Lock()
+
+    def limit(self, name: str, limit: int, window: int) -> Limit:
+        """Define a limit, reported under name in the metrics."""
+        self._limits[name] = Limit(name, limit, window)
+        return self._limits[name]
+
+    def hit(self, *hits: Tuple[Limit, str]) -> None:
+        """
+        Count a hit on each (limit, key), or raise RateLimited for the first
+        exhausted limit without counting the hit on any of them.
+        """
+        hits = tuple((limit, key) for limit, key in hits if limit.limit > 0)
+        if not hits:
+            return
+        now = time.time()
+        rejected, current, previous = self.backend.hit(
+            [(f"{limit.name}:{key}", limit.limit, limit.window) for limit, key in hits], now
+        )
+        with self._lock:
+            if rejected is None:
+                for limit, _ in hits:
+                    limit.allowed += 1
+            else:
+                hits[rejected][0].rejected += 1
+        if rejected is not None:
+            limit = hits[rejected][0]
+            raise RateLimited(limit.name, _retry_after(now, limit.limit, limit.window, current, previous))
+
+    def stats(self) -> Dict[str, Any]:
+        """Get allowed and rejected hits per limit and the backend's counters."""
+        with self._lock:
+            limits = {
+                limit.name: {
+                    "limit": limit.limit,
+                    "window_seconds": limit.window,
+                    "allowed": limit.allowed,
+                    "rejected": limit.rejected,
+                }
+                for limit in self._limits.values()
+            }
+        return {**self.backend.stats(), "limits": limits}
+
+
+def make_backend(name: Optional[str] = None) -> Any:
+    """Create the configured counter backend."""
+    name = name or settings.RATE_LIMIT_BACKEND
+    if name == "redis":
+        return RedisBackend(settings.RATE_LIMIT_REDIS_URL)
+    if name == "memory":
+        return MemoryBackend(settings.RATE_LIMIT_MAX_KEYS)
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {name}")
+
+
+limiter = RateLimiter(make_backend())
+
+LOGIN_PER_IP = limiter.limit("login_ip", settings.LOGIN_RATE_LIMIT_PER_IP, settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS)
+LOGIN_PER_EMAIL = limiter.limit(
+    "login_email", settings.LOGIN_RATE_LIMIT_PER_EMAIL, settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS
+)
+LOGIN_GLOBAL = limiter.limit("login_global", settings.LOGIN_RATE_LIMIT_GLOBAL, settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS)
+
+
+def check_login(ip: Optional[str], email: Optional[str] = None) -> None:
+    """Count a login attempt from ip for email, or raise RateLimited."""
+    hits = [(LOGIN_PER_IP, ip or "unknown")]
+    if email:
+        hits.append((LOGIN_PER_EMAIL, email.strip().lower()))
+    hits.append((LOGIN_GLOBAL, ""))
+    limiter.hit(*hits)
+
+
+metrics.register("rate_limit", limiter.stats)
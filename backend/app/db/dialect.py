@@ -0,0 +1,12 @@
+from typing import Callable
+
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+
+def get_insert(db: Session) -> Callable:
+    """Get the dialect-specific insert() that supports ON CONFLICT clauses."""
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite_insert
+    return postgresql_insert
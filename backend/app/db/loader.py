@@ -0,0 +1,63 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+
+class Loader:
+    """
+    Batches and memoizes primary key lookups of one model for a session.
+
+    load_many() fetches every id not seen yet in a single WHERE id IN (...)
+    query; later load() / load_many() calls for those ids, found or not,
+    are answered from memory.
+    """
+
+    def __init__(self, db: Session, model: Any, options: Sequence[Any] = ()) -> None:
+        self.db = db
+        self.model = model
+        self.options = list(options)
+        self._memo: Dict[int, Optional[Any]] = {}
+
+    def load_many(self, ids: Iterable[int]) -> Dict[int, Any]:
+        """Get the found rows of ids, by id."""
+        ids = list(dict.fromkeys(ids))
+        missing = [id_ for id_ in ids if id_ not in self._memo]
+        if missing:
+            query = self.db.query(self.model).options(*self.options).filter(self.model.id.in_(missing))
+            found = {row.id: row for row in query}
+            for id_ in missing:
+                self._memo[id_] = found.get(id_)
+        return {id_: self._memo[id_] for id_ in ids if self._memo[id_] is not None}
+
+    def load(self, id_: int) -> Optional[Any]:
+        """Get one row by id, or None."""
+        return self.load_many([id_]).get(id_)
+
+    def prime(self, rows: Iterable[Any]) -> None:
+        """Remember rows loaded some other way."""
+        for row in rows:
+            self._memo[row.id] = row
+
+    def forget(self, id_: int) -> None:
+        """Drop an id, e.g. after deleting its row."""
+        self._memo.pop(id_, None)
+
+
+def get_loader(db: Session, model: Any, options: Sequence[Any] = ()) -> Loader:
+    """
+    Get the loader of a model for this session.
+
+    API sessions live for one request (see deps.get_db), so lookups are
+    coalesced and memoized per request. The loader is created with options
+    on first use and keeps them.
+    """
+    loaders: Dict[Any, Loader] = db.info.setdefault("loaders", {})
+    loader = loaders.get(model)
+    if loader is None:
+        loader = loaders[model] = Loader(db, model, options)
+    return loader
+
+
+def ordered(rows: Dict[int, Any], ids: Iterable[int]) -> List[Any]:
+    """Get rows in the order of ids, skipping ids that were not found."""
+    return [rows[id_] for id_ in dict.fromkeys(ids) if id_ in rows]
@@ -5,7 +5,7 @@ from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 
 engine = create_engine(
-    settings.SQLALCHEMY_DATABASE_URI,
+    str(settings.SQLALCHEMY_DATABASE_URI),
     pool_pre_ping=True,
     pool_recycle=3600,
     pool_size=5,
@@ -3,4 +3,9 @@ from app.models.category import Category
 from app.models.item import Item
 from app.models.bookmark import Bookmark
 from app.models.notification import Notification
-from app.models.webauthn import WebAuthnCredential 
\ No newline at end of file
+from app.models.webauthn import WebAuthnCredential 
+from app.models.counter import Counter
+from app.models.rollup import EngagementRollup, RollupWatermark
+from app.models.rendered_content import RenderedContent
+from app.models.item_view import ItemView
+from app.models.refresh_token import RefreshToken
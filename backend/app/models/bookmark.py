@@ -1,10 +1,17 @@
-from sqlalchemy import Column, ForeignKey, Integer
+from sqlalchemy import Column, ForeignKey, Index, Integer, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from app.models.base import BaseModel
 
 
 class Bookmark(BaseModel):
+    __table_args__ = (
+        # Keyset pagination of a user's bookmarks
+        Index("ix_bookmark_user_id_id", "user_id", "id"),
+        # One bookmark per user and item; batch adds rely on it for ON CONFLICT
+        UniqueConstraint("user_id", "item_id", name="uq_bookmark_user_item"),
+    )
+
     user_id = Column(Integer, ForeignKey("user.id"), nullable=False)
     item_id = Column(Integer, ForeignKey("item.id"), nullable=False)
     
@@ -0,0 +1,8 @@
+from sqlalchemy import Column, Integer, String
+
+from app.models.base import BaseModel
+
+
+class Counter(BaseModel):
+    key = Column(String, unique=True, index=True, nullable=False)
+    value = Column(Integer, default=0, nullable=False)
@@ -1,18 +1,88 @@
-from sqlalchemy import Column, ForeignKey, String, Text, Integer, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import DDL, Column, ForeignKey, Index, String, Text, Integer, Boolean, event
+from sqlalchemy.orm import deferred, relationship
 
 from app.models.base import BaseModel
 
 
 class Item(BaseModel):
+    __table_args__ = (
+        # Keyset pagination of item lists
+        Index("ix_item_name_id", "name", "id"),
+    )
+
     name = Column(String, index=True, nullable=False)
     description = Column(Text, nullable=True)
-    content = Column(Text, nullable=False)  # Markdown content
+    content = deferred(Column(Text, nullable=False))  # Markdown content, only loaded when needed
+    content_hash = Column(String(64), index=True, nullable=True)  # Key of the RenderedContent
     image = Column(String, nullable=True)
     category_id = Column(Integer, ForeignKey("category.id"), nullable=False)
     is_featured = Column(Boolean, default=False)
     difficulty = Column(String, nullable=True)  # e.g., "Beginner", "Intermediate", "Advanced"
-    
+    bookmark_count = Column(Integer, default=0, nullable=False, index=True)  # Maintained by bookmark service
+
     # Relationships
     category = relationship("Category", back_populates="items")
-    bookmarks = relationship("Bookmark", back_populates="item", cascade="all, delete-orphan") 
\ No newline at end of file
+    bookmarks = relationship("Bookmark", back_populates="item", cascade="all, delete-orphan")
+
+
+# Full-text search index, kept up to date by the database itself.
+# On PostgreSQL this is an unmapped tsvector column with a GIN index (see the
+# 0004 migration); on SQLite it is an external-content FTS5 table. Both are
+# also created by Base.metadata.create_all() so test databases get them.
+for statement in (
+    "ALTER TABLE item ADD COLUMN search_vector tsvector",
+    "CREATE INDEX ix_item_search_vector ON item USING gin (search_vector)",
+    """
+    CREATE OR REPLACE FUNCTION item_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.name, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(NEW.content, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER item_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, description, content ON item
+    FOR EACH ROW EXECUTE PROCEDURE item_search_vector_update()
+    """,
+):
+    event.listen(Item.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+
+for statement in (
+    """
+    CREATE VIRTUAL TABLE item_fts USING fts5(
+        name, description, content,
+        content='item', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER item_fts_insert AFTER INSERT ON item BEGIN
+        INSERT INTO item_fts(rowid, name, description, content)
+        VALUES (new.id, new.name, new.description, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER item_fts_delete AFTER DELETE ON item BEGIN
+        INSERT INTO item_fts(item_fts, rowid, name, description, content)
+        VALUES ('delete', old.id, old.name, old.description, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER item_fts_update AFTER UPDATE OF name, description, content ON item BEGIN
+        INSERT INTO item_fts(item_fts, rowid, name, description, content)
+        VALUES ('delete', old.id, old.name, old.description, old.content);
+        INSERT INTO item_fts(rowid, name, description, content)
+        VALUES (new.id, new.name, new.description, new.content);
+    END
+    """,
+):
+    event.listen(Item.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+
+event.listen(
+    Item.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS item_fts").execute_if(dialect="sqlite"),
+)
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Date, ForeignKey, Index, Integer, UniqueConstraint
+
+from app.models.base import BaseModel
+
+
+class ItemView(BaseModel):
+    __tablename__ = "item_view"
+    __table_args__ = (
+        UniqueConstraint("item_id", "day", name="uq_item_view_item_day"),
+        # Summing recent days per item for the most viewed sort
+        Index("ix_item_view_day_item", "day", "item_id"),
+    )
+
+    item_id = Column(Integer, ForeignKey("item.id", ondelete="CASCADE"), nullable=False)
+    day = Column(Date, nullable=False)  # UTC
+    views = Column(Integer, default=0, nullable=False)  # Flushed from the view counter buffers
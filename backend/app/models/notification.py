@@ -1,10 +1,15 @@
-from sqlalchemy import Column, ForeignKey, String, Text, Integer, Boolean
+from sqlalchemy import Column, ForeignKey, Index, String, Text, Integer, Boolean
 from sqlalchemy.orm import relationship
 
 from app.models.base import BaseModel
 
 
 class Notification(BaseModel):
+    __table_args__ = (
+        # Keyset pagination of a user's notifications, newest first
+        Index("ix_notification_user_created", "user_id", "created_at", "id"),
+    )
+
     user_id = Column(Integer, ForeignKey("user.id"), nullable=False)
     title = Column(String, nullable=False)
     content = Column(Text, nullable=False)
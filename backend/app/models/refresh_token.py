@@ -0,0 +1,18 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy.orm import relationship
+
+from app.models.base import BaseModel
+
+
+class RefreshToken(BaseModel):
+    __tablename__ = "refresh_token"
+
+    user_id = Column(Integer, ForeignKey("user.id", ondelete="CASCADE"), nullable=False, index=True)
+    token_hash = Column(String(64), unique=True, index=True, nullable=False)  # SHA-256 hex, never the token
+    family_id = Column(String(32), index=True, nullable=False)  # Shared by every rotation of one login
+    expires_at = Column(DateTime, nullable=False)
+    used_at = Column(DateTime, nullable=True)  # Set when rotated; using it again revokes the family
+    revoked_at = Column(DateTime, nullable=True)
+    
+    # Relationships
+    user = relationship("User", back_populates="refresh_tokens")
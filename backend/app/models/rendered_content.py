@@ -0,0 +1,12 @@
+from sqlalchemy import JSON, Column, String, Text
+
+from app.models.base import BaseModel
+
+
+class RenderedContent(BaseModel):
+    """Item content rendered to HTML, shared by all items with the same markdown."""
+    __tablename__ = "rendered_content"
+
+    content_hash = Column(String(64), unique=True, index=True, nullable=False)  # sha256 of the markdown
+    html = Column(Text, nullable=False)
+    toc = Column(JSON, nullable=False)  # Nested headings: level, id, name, children
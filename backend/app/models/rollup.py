@@ -0,0 +1,26 @@
+from sqlalchemy import Column, DateTime, Integer, String, UniqueConstraint
+
+from app.models.base import BaseModel
+
+
+class EngagementRollup(BaseModel):
+    __tablename__ = "engagement_rollup"
+    __table_args__ = (
+        UniqueConstraint(
+            "metric", "granularity", "dimension", "bucket",
+            name="uq_engagement_rollup_bucket",
+        ),
+    )
+
+    metric = Column(String, nullable=False)  # e.g., "signups", "bookmarks", "notifications"
+    granularity = Column(String, nullable=False)  # "minute", "hour" or "day"
+    dimension = Column(String, nullable=False, default="")  # e.g., notification type, "" for all
+    bucket = Column(DateTime, nullable=False)
+    total = Column(Integer, default=0, nullable=False)
+
+
+class RollupWatermark(BaseModel):
+    __tablename__ = "rollup_watermark"
+
+    metric = Column(String, unique=True, index=True, nullable=False)
+    last_id = Column(Integer, default=0, nullable=False)
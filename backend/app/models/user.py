@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, String, Enum
+from sqlalchemy import Boolean, Column, Integer, String, Enum
 from sqlalchemy.orm import relationship
 import enum
 
@@ -17,8 +17,10 @@ class User(BaseModel):
     role = Column(Enum(UserRole), default=UserRole.MEMBER, nullable=False)
     is_active = Column(Boolean, default=True)
     profile_image = Column(String, nullable=True)
+    unread_count = Column(Integer, default=0, nullable=False)  # Maintained by notification service
     
     # Relationships
     webauthn_credentials = relationship("WebAuthnCredential", back_populates="user", cascade="all, delete-orphan")
     bookmarks = relationship("Bookmark", back_populates="user", cascade="all, delete-orphan")
-    notifications = relationship("Notification", back_populates="user", cascade="all, delete-orphan") 
\ No newline at end of file
+    notifications = relationship("Notification", back_populates="user", cascade="all, delete-orphan")
+    refresh_tokens = relationship("RefreshToken", back_populates="user", cascade="all, delete-orphan") 
\ No newline at end of file
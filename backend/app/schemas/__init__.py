@@ -1,9 +1,15 @@
-from app.schemas.user import User, UserCreate, UserUpdate, UserInDB
-from app.schemas.category import Category, CategoryCreate, CategoryUpdate
-from app.schemas.item import Item, ItemCreate, ItemUpdate
-from app.schemas.bookmark import Bookmark, BookmarkCreate
+from app.schemas.user import User, UserCreate, UserUpdate, UserInDB, Principal
+from app.schemas.category import Category, CategoryCreate, CategoryUpdate, CategorySummary
+from app.schemas.item import (
+    Item, ItemCreate, ItemUpdate, ItemSummary, ItemRendered, TocEntry, BulkItemResult, BulkItemResponse, RelatedItem
+)
+from app.schemas.bookmark import (
+    Bookmark, BookmarkCreate, BookmarkSummary, BookmarkBatch, BookmarkBatchResult, BookmarkCheck, BookmarkCheckResult
+)
 from app.schemas.notification import Notification, NotificationCreate, NotificationUpdate
-from app.schemas.token import Token, TokenPayload
+from app.schemas.token import Token, TokenPayload, RefreshTokenRequest
+from app.schemas.statistics import TimeSeries, TimeSeriesPoint
+from app.schemas.suggest import Suggestion
 from app.schemas.webauthn import (
     WebAuthnCredential,
     WebAuthnRegistrationOptions,
@@ -1,8 +1,9 @@
-from typing import Optional
-from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, Field
 
 from app.schemas.base import BaseSchema
-from app.schemas.item import Item
+from app.schemas.item import Item, ItemSummary
 from app.schemas.user import User
 
 
@@ -17,9 +18,40 @@ class BookmarkCreate(BookmarkBase):
     item_id: int
 
 
+# Item ids to bookmark and un-bookmark in one request
+class BookmarkBatch(BaseModel):
+    add: List[int] = Field(default_factory=list, max_length=1000)
+    remove: List[int] = Field(default_factory=list, max_length=1000)
+
+
+class BookmarkBatchResult(BaseModel):
+    added: List[int]  # Newly bookmarked; ids that were already bookmarked are left out
+    removed: List[int]  # Bookmarks that existed and were removed
+    not_found: List[int]  # Ids in add that are not items
+
+
+class BookmarkCheck(BaseModel):
+    item_ids: List[int] = Field(max_length=1000)
+
+
+class BookmarkCheckResult(BaseModel):
+    bookmarked: List[int]
+
+
 # Additional properties to return via API
 class Bookmark(BaseSchema, BookmarkBase):
     item: Optional[Item] = None
     
+    class Config:
+        from_attributes = True
+
+
+# Lighter properties to return in list views, with the item summary
+class BookmarkSummary(BaseModel):
+    id: int
+    item_id: int
+    created_at: datetime
+    item: Optional[ItemSummary] = None
+    
     class Config:
         from_attributes = True 
\ No newline at end of file
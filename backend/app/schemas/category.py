@@ -23,4 +23,14 @@ class CategoryUpdate(CategoryBase):
 
 # Additional properties to return via API
 class Category(BaseSchema, CategoryBase):
-    pass 
\ No newline at end of file
+    pass
+
+
+# Lighter properties to return in list views, without the description
+class CategorySummary(BaseModel):
+    id: int
+    name: str
+    icon: Optional[str] = None
+    
+    class Config:
+        from_attributes = True 
\ No newline at end of file
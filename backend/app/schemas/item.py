@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
 
 from app.schemas.base import BaseSchema
@@ -31,6 +31,66 @@ class ItemUpdate(ItemBase):
 # Additional properties to return via API
 class Item(BaseSchema, ItemBase):
     category: Optional[Category] = None
+    bookmark_count: int = 0
+    search_rank: Optional[float] = None  # Only set for search results
+    search_snippet: Optional[str] = None  # Highlighted match, only set for search results
     
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+
+class TocEntry(BaseModel):
+    level: int
+    id: str
+    name: str
+    children: List["TocEntry"] = []
+
+
+# Item with its content rendered to sanitized HTML instead of markdown
+class ItemRendered(BaseSchema):
+    name: str
+    description: Optional[str] = None
+    content_html: str
+    toc: List[TocEntry] = []
+    image: Optional[str] = None
+    category_id: int
+    category: Optional[Category] = None
+    is_featured: Optional[bool] = False
+    difficulty: Optional[str] = None
+    bookmark_count: int = 0
+
+
+# Outcome of one row of a bulk import
+class BulkItemResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BulkItemResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkItemResult]
+
+
+# Lighter properties to return in list views, without the content
+class ItemSummary(BaseModel):
+    id: int
+    name: str
+    description: Optional[str] = None
+    image: Optional[str] = None
+    category_id: int
+    is_featured: Optional[bool] = False
+    difficulty: Optional[str] = None
+    bookmark_count: int = 0
+    search_rank: Optional[float] = None  # Only set for search results
+    search_snippet: Optional[str] = None  # Highlighted match, only set for search results
+    
+    class Config:
+        from_attributes = True
+
+
+# An item similar to another, with their cosine similarity
+class RelatedItem(BaseModel):
+    item: ItemSummary
+    score: float
@@ -0,0 +1,18 @@
+from datetime import datetime
+from typing import List
+
+from pydantic import BaseModel
+
+
+class TimeSeriesPoint(BaseModel):
+    bucket: datetime
+    count: int
+
+
+class TimeSeries(BaseModel):
+    metric: str
+    granularity: str
+    dimension: str = ""
+    start: datetime
+    end: datetime
+    points: List[TimeSeriesPoint]
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+class Suggestion(BaseModel):
+    kind: str  # "item" or "category"
+    id: int
+    name: str
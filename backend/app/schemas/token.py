@@ -5,9 +5,14 @@ from pydantic import BaseModel
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    refresh_token: Optional[str] = None
     webauthn_auth_options: Optional[dict] = None
 
 
 class TokenPayload(BaseModel):
     sub: str
-    exp: int 
\ No newline at end of file
+    exp: int
+
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
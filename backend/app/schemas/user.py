@@ -1,5 +1,5 @@
 from typing import Optional, List
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 
 from app.models.user import UserRole
 from app.schemas.base import BaseSchema
@@ -34,4 +34,9 @@ class User(BaseSchema, UserBase):
 
 # Additional properties stored in DB
 class UserInDB(User):
-    hashed_password: str 
\ No newline at end of file
+    hashed_password: str
+
+
+# Authenticated user as seen by request dependencies, shared between requests
+class Principal(User):
+    model_config = ConfigDict(frozen=True)
@@ -1,9 +1,22 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
+import datetime
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
 
+from sqlalchemy import delete as sql_delete, literal, select
+from sqlalchemy.orm import Session, load_only, selectinload
+
+from app.db.dialect import get_insert
 from app.models.bookmark import Bookmark
+from app.models.item import Item
 from app.models.user import User
 from app.schemas.bookmark import BookmarkCreate
+from app.services import counter as counter_service
+from app.services import related as related_service
+from app.services import item as item_service
+from app.services import pagination
+from app.services import statistics as statistics_service
+
+# Sort key of bookmark lists, used for cursor pagination
+ORDER_BY = (Bookmark.id,)
 
 
 def get_by_id(db: Session, bookmark_id: int) -> Optional[Bookmark]:
@@ -19,11 +32,91 @@ def get_by_user_and_item(db: Session, user_id: int, item_id: int) -> Optional[Bo
     ).first()
 
 
-def get_all_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[Bookmark]:
-    """Get all bookmarks for a user with pagination."""
-    return db.query(Bookmark).filter(
-        Bookmark.user_id == user_id
-    ).offset(skip).limit(limit).all()
+def get_all_by_user(
+    db: Session,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None,
+    item_columns: Optional[Sequence[str]] = None,
+) -> List[Bookmark]:
+    """
+    Get all bookmarks for a user, oldest first, with offset or cursor pagination.
+
+    Only the given bookmark columns are loaded; by default full rows are.
+    The bookmarked items are loaded in one extra query, as full rows or
+    with item_columns only. They are skipped when only some bookmark
+    columns are requested without item_columns.
+    """
+    query = db.query(Bookmark).filter(Bookmark.user_id == user_id)
+    if columns is not None:
+        names = dict.fromkeys([*columns, *(column.key for column in ORDER_BY)])
+        query = query.options(load_only(*[getattr(Bookmark, name) for name in names]))
+    if columns is None or item_columns is not None:
+        query = query.options(
+            selectinload(Bookmark.item).options(*item_service.load_options(item_columns))
+        )
+    query = pagination.keyset(query, ORDER_BY, cursor)
+    if not cursor:
+        query = query.offset(skip)
+    return query.limit(limit).all()
+
+
+def get_bookmarked_item_ids(db: Session, user_id: int, item_ids: Iterable[int]) -> List[int]:
+    """Get which of the given item ids a user has bookmarked."""
+    item_ids = set(item_ids)
+    if not item_ids:
+        return []
+    return sorted(db.scalars(
+        select(Bookmark.item_id).where(Bookmark.user_id == user_id, Bookmark.item_id.in_(item_ids))
+    ))
+
+
+def apply_batch(
+    db: Session, user_id: int, add: Iterable[int], remove: Iterable[int]
+) -> Tuple[List[int], List[int], List[int]]:
+    """
+    Bookmark and un-bookmark lists of items for a user in one transaction.
+
+    Idempotent: items that are already bookmarked, or not bookmarked, are
+    left alone. Returns (added, removed, not_found) item ids.
+    """
+    add, remove = set(add), set(remove)
+    existing: Set[int] = set()
+    added: List[int] = []
+    removed: List[int] = []
+    not_found: List[int] = []
+    if add:
+        existing = set(db.scalars(select(Item.id).where(Item.id.in_(add))))
+        not_found = sorted(add - existing)
+    if existing:
+        now = datetime.datetime.utcnow()
+        insert = get_insert(db)
+        stmt = insert(Bookmark).from_select(
+            ["user_id", "item_id", "created_at", "updated_at"],
+            select(literal(user_id), Item.id, literal(now), literal(now)).where(Item.id.in_(existing)),
+        ).on_conflict_do_nothing(
+            index_elements=["user_id", "item_id"],
+        ).returning(Bookmark.item_id)
+        added = sorted(db.scalars(stmt))
+    if remove:
+        stmt = sql_delete(Bookmark).where(
+            Bookmark.user_id == user_id, Bookmark.item_id.in_(remove)
+        ).returning(Bookmark.item_id)
+        removed = sorted(db.scalars(stmt))
+
+    counter_service.increment_bookmark_counts(db, added, 1)
+    counter_service.increment_bookmark_counts(db, removed, -1)
+    counter_service.increment(db, counter_service.BOOKMARKS_TOTAL, len(added) - len(removed))
+    db.commit()
+    if added or removed:
+        statistics_service.invalidate_cache()
+    for item_id in added:
+        related_service.add(user_id, item_id)
+    for item_id in removed:
+        related_service.remove(user_id, item_id)
+    return added, removed, not_found
 
 
 def create(db: Session, obj_in: BookmarkCreate, user: User) -> Bookmark:
@@ -33,13 +126,22 @@ def create(db: Session, obj_in: BookmarkCreate, user: User) -> Bookmark:
         item_id=obj_in.item_id,
     )
     db.add(db_obj)
+    counter_service.increment_item_bookmarks(db, obj_in.item_id, 1)
+    counter_service.increment(db, counter_service.BOOKMARKS_TOTAL, 1)
     db.commit()
+    statistics_service.invalidate_cache()
+    related_service.add(user.id, obj_in.item_id)
     db.refresh(db_obj)
     return db_obj
 
 
 def delete(db: Session, db_obj: Bookmark) -> Bookmark:
     """Delete a bookmark."""
+    user_id, item_id = db_obj.user_id, db_obj.item_id
     db.delete(db_obj)
+    counter_service.increment_item_bookmarks(db, item_id, -1)
+    counter_service.increment(db, counter_service.BOOKMARKS_TOTAL, -1)
     db.commit()
+    statistics_service.invalidate_cache()
+    related_service.remove(user_id, item_id)
     return db_obj 
\ No newline at end of file
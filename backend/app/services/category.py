@@ -1,8 +1,18 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from typing import Any, List, Optional, Sequence, Tuple
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session, load_only
 
 from app.models.category import Category
+from app.models.item import Item
 from app.schemas.category import CategoryCreate, CategoryUpdate
+from app.services import counter as counter_service
+from app.services import entity_cache
+from app.services import pagination
+from app.services import statistics as statistics_service
+from app.services import suggest as suggest_service
+
+# Sort key of category lists, used for cursor pagination
+ORDER_BY = (Category.name, Category.id)
 
 
 def get_by_id(db: Session, category_id: int) -> Optional[Category]:
@@ -15,9 +25,40 @@ def get_by_name(db: Session, name: str) -> Optional[Category]:
     return db.query(Category).filter(Category.name == name).first()
 
 
-def get_all(db: Session, skip: int = 0, limit: int = 100) -> List[Category]:
-    """Get all categories with pagination."""
-    return db.query(Category).order_by(Category.name).offset(skip).limit(limit).all()
+def get_all(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None,
+) -> List[Any]:
+    """
+    Get all categories with offset or cursor pagination.
+
+    Served as snapshots from the entity cache when it holds the category
+    list; otherwise queried, loading only the given columns.
+    """
+    categories = entity_cache.get_category_list(db, ORDER_BY)
+    if categories is not None:
+        rows = entity_cache.page(categories, ORDER_BY, skip=skip, limit=limit, cursor=cursor)
+        if rows is not None:
+            return rows
+    query = db.query(Category)
+    if columns is not None:
+        names = dict.fromkeys([*columns, *(column.key for column in ORDER_BY)])
+        query = query.options(load_only(*[getattr(Category, name) for name in names]))
+    query = pagination.keyset(query, ORDER_BY, cursor)
+    if not cursor:
+        query = query.offset(skip)
+    return query.limit(limit).all()
+
+
+def get_version(db: Session) -> Tuple[Any, int]:
+    """Get max(updated_at) and count of categories, from the entity cache when it holds the list."""
+    categories = entity_cache.get_category_list(db, ORDER_BY)
+    if categories is None:
+        return db.query(func.max(Category.updated_at), func.count(Category.id)).one()
+    return max((category.updated_at for category in categories), default=None), len(categories)
 
 
 def create(db: Session, obj_in: CategoryCreate) -> Category:
@@ -28,8 +69,12 @@ def create(db: Session, obj_in: CategoryCreate) -> Category:
         icon=obj_in.icon,
     )
     db.add(db_obj)
+    entity_cache.invalidate_categories(db, [])
+    counter_service.increment(db, counter_service.CATEGORIES_TOTAL, 1)
     db.commit()
+    statistics_service.invalidate_cache()
     db.refresh(db_obj)
+    suggest_service.add(suggest_service.CATEGORY, db_obj.id, db_obj.name)
     return db_obj
 
 
@@ -41,13 +86,31 @@ def update(db: Session, db_obj: Category, obj_in: CategoryUpdate) -> Category:
         setattr(db_obj, key, value)
     
     db.add(db_obj)
+    entity_cache.invalidate_categories(db, [db_obj.id])
     db.commit()
+    statistics_service.invalidate_cache()
     db.refresh(db_obj)
+    if "name" in update_data:
+        suggest_service.add(suggest_service.CATEGORY, db_obj.id, db_obj.name)
     return db_obj
 
 
 def delete(db: Session, db_obj: Category) -> Category:
     """Delete a category."""
+    # Items (and their bookmarks) go with the category, so take them out of the counters
+    featured, bookmarks = db.query(
+        func.sum(case((Item.is_featured == True, 1), else_=0)),
+        func.sum(Item.bookmark_count),
+    ).filter(Item.category_id == db_obj.id).one()
+    
     db.delete(db_obj)
+    entity_cache.invalidate_categories(db, [db_obj.id])
+    counter_service.increment(db, counter_service.CATEGORIES_TOTAL, -1)
+    counter_service.increment(db, counter_service.ITEMS_FEATURED, -(featured or 0))
+    counter_service.increment(db, counter_service.BOOKMARKS_TOTAL, -(bookmarks or 0))
+    counter_service.delete(db, counter_service.category_key(db_obj.id))
     db.commit()
+    statistics_service.invalidate_cache()
+    # The category's items were deleted with it
+    suggest_service.reset()
     return db_obj 
\ No newline at end of file
@@ -0,0 +1,206 @@
+import datetime
+from typing import Dict, List, Tuple
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from app.db.dialect import get_insert
+from app.models.bookmark import Bookmark
+from app.models.category import Category
+from app.models.counter import Counter
+from app.models.item import Item
+from app.models.notification import Notification
+from app.models.user import User, UserRole
+from app.services import entity_cache
+
+# Global counter keys
+USERS_ACTIVE = "users.active"
+CATEGORIES_TOTAL = "categories.total"
+ITEMS_FEATURED = "items.featured"
+BOOKMARKS_TOTAL = "bookmarks.total"
+NOTIFICATIONS_TOTAL = "notifications.total"
+NOTIFICATIONS_UNREAD = "notifications.unread"
+
+ROLE_PREFIX = "users.role."
+CATEGORY_PREFIX = "items.category."
+
+
+def role_key(role: UserRole) -> str:
+    """Get the counter key for the number of users with a role."""
+    return f"{ROLE_PREFIX}{UserRole(role).value}"
+
+
+def category_key(category_id: int) -> str:
+    """Get the counter key for the number of items in a category."""
+    return f"{CATEGORY_PREFIX}{category_id}"
+
+
+def increment(db: Session, key: str, delta: int = 1) -> None:
+    """
+    Add delta to a global counter.
+
+    The statement runs in the caller's transaction, so it commits or rolls
+    back together with the write that caused it.
+    """
+    if not delta:
+        return
+    now = datetime.datetime.utcnow()
+    insert = get_insert(db)
+    stmt = insert(Counter).values(
+        key=key, value=delta, created_at=now, updated_at=now
+    ).on_conflict_do_update(
+        index_elements=[Counter.key],
+        set_={"value": Counter.value + delta, "updated_at": now},
+    )
+    db.execute(stmt)
+
+
+def delete(db: Session, key: str) -> None:
+    """Remove a global counter."""
+    db.query(Counter).filter(Counter.key == key).delete(synchronize_session=False)
+
+
+def increment_item_bookmarks(db: Session, item_id: int, delta: int = 1) -> None:
+    """Add delta to an item's bookmark_count."""
+    if not delta:
+        return
+    db.query(Item).filter(Item.id == item_id).update(
+        {Item.bookmark_count: Item.bookmark_count + delta},
+        synchronize_session=False,
+    )
+    entity_cache.invalidate_items(db, [item_id])
+
+
+def increment_bookmark_counts(db: Session, item_ids: List[int], delta: int = 1) -> None:
+    """Add delta to the bookmark_count of several items at once."""
+    if not delta or not item_ids:
+        return
+    db.query(Item).filter(Item.id.in_(item_ids)).update(
+        {Item.bookmark_count: Item.bookmark_count + delta},
+        synchronize_session=False,
+    )
+    entity_cache.invalidate_items(db, item_ids)
+
+
+def increment_user_unread(db: Session, user_id: int, delta: int = 1) -> None:
+    """Add delta to a user's unread_count."""
+    if not delta:
+        return
+    db.query(User).filter(User.id == user_id).update(
+        {User.unread_count: User.unread_count + delta},
+        synchronize_session=False,
+    )
+
+
+def get(db: Session, key: str) -> int:
+    """Get the value of a global counter."""
+    value = db.query(Counter.value).filter(Counter.key == key).scalar()
+    return value or 0
+
+
+def get_all(db: Session) -> Dict[str, int]:
+    """Get every global counter as a dict."""
+    return {key: value for key, value in db.query(Counter.key, Counter.value).all()}
+
+
+def compute_expected(db: Session) -> Dict[str, int]:
+    """Recompute every global counter from the source tables."""
+    expected = {role_key(role): 0 for role in UserRole}
+    expected[USERS_ACTIVE] = 0
+
+    for role, active, count in db.query(
+        User.role, User.is_active, func.count(User.id)
+    ).group_by(User.role, User.is_active):
+        expected[role_key(role)] += count
+        if active:
+            expected[USERS_ACTIVE] += count
+
+    expected[CATEGORIES_TOTAL] = db.query(func.count(Category.id)).scalar() or 0
+    for category_id, count in db.query(
+        Category.id, func.count(Item.id)
+    ).outerjoin(Item, Item.category_id == Category.id).group_by(Category.id):
+        expected[category_key(category_id)] = count
+
+    expected[ITEMS_FEATURED] = db.query(func.count(Item.id)).filter(
+        Item.is_featured == True
+    ).scalar() or 0
+    expected[BOOKMARKS_TOTAL] = db.query(func.count(Bookmark.id)).scalar() or 0
+
+    total, unread = db.query(
+        func.count(Notification.id),
+        func.sum(case((Notification.is_read == False, 1), else_=0)),
+    ).one()
+    expected[NOTIFICATIONS_TOTAL] = total or 0
+    expected[NOTIFICATIONS_UNREAD] = unread or 0
+    return expected
+
+
+def _bookmark_count_subquery():
+    return select(func.count(Bookmark.id)).where(
+        Bookmark.item_id == Item.id
+    ).correlate(Item).scalar_subquery()
+
+
+def _unread_count_subquery():
+    return select(func.count(Notification.id)).where(
+        Notification.user_id == User.id,
+        Notification.is_read == False,
+    ).correlate(User).scalar_subquery()
+
+
+def check(db: Session) -> Dict[str, List[Tuple]]:
+    """
+    Compare stored counters with the source tables.
+
+    Returns the drifted global keys as (key, stored, expected) and the ids of
+    items and users whose per-row counters are off.
+    """
+    stored = get_all(db)
+    expected = compute_expected(db)
+    keys = sorted(set(stored) | set(expected))
+
+    return {
+        "counters": [
+            (key, stored.get(key, 0), expected.get(key, 0))
+            for key in keys
+            if stored.get(key, 0) != expected.get(key, 0)
+        ],
+        "items": [
+            (item_id, stored_count, expected_count)
+            for item_id, stored_count, expected_count in db.query(
+                Item.id, Item.bookmark_count, _bookmark_count_subquery()
+            ).filter(Item.bookmark_count != _bookmark_count_subquery())
+        ],
+        "users": [
+            (user_id, stored_count, expected_count)
+            for user_id, stored_count, expected_count in db.query(
+                User.id, User.unread_count, _unread_count_subquery()
+            ).filter(User.unread_count != _unread_count_subquery())
+        ],
+    }
+
+
+def rebuild(db: Session) -> Dict[str, int]:
+    """Rebuild every counter from the source tables in one transaction."""
+    db.query(Item).filter(
+        Item.bookmark_count != _bookmark_count_subquery()
+    ).update(
+        {Item.bookmark_count: _bookmark_count_subquery()},
+        synchronize_session=False,
+    )
+    db.query(User).filter(
+        User.unread_count != _unread_count_subquery()
+    ).update(
+        {User.unread_count: _unread_count_subquery()},
+        synchronize_session=False,
+    )
+
+    expected = compute_expected(db)
+    db.query(Counter).delete(synchronize_session=False)
+    now = datetime.datetime.utcnow()
+    db.add_all(
+        Counter(key=key, value=value, created_at=now, updated_at=now)
+        for key, value in expected.items()
+    )
+    db.commit()
+    return expected
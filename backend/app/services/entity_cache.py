@@ -0,0 +1,187 @@
+"""
+Per-process read-through cache of item and category snapshots.
+
+Entries are frozen schema instances, never live ORM objects, so they can
+be shared between requests and threads. Services mark what they change
+with invalidate_* before committing; the entries are dropped once the
+session commits, so a reader can never cache the row a write is about to
+replace. Other worker processes see a write after at most the TTL.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+from pydantic import ConfigDict
+from sqlalchemy import event
+from sqlalchemy.orm import Session, joinedload, undefer
+
+from app.core import metrics
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.models.category import Category
+from app.models.item import Item
+from app.schemas.category import Category as CategorySchema
+from app.schemas.item import Item as ItemSchema
+from app.services import pagination
+
+CATEGORY_LIST = "list"
+
+
+class CategorySnapshot(CategorySchema):
+    model_config = ConfigDict(frozen=True)
+
+
+class ItemSnapshot(ItemSchema):
+    model_config = ConfigDict(frozen=True)
+
+    category: Optional[CategorySnapshot] = None
+
+
+class _EntityCache:
+    """An LRUCache that ignores stores racing with an invalidation."""
+
+    def __init__(self, max_entries: int, ttl: float) -> None:
+        self.cache = LRUCache(max_entries, ttl=ttl)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.invalidations = 0
+
+    def get_or_load(self, key: Hashable, load: Callable[[], Any]) -> Any:
+        value = self.cache.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            generation = self._generation
+        value = load()
+        if value is not None:
+            with self._lock:
+                if generation == self._generation:
+                    self.cache.set(key, value)
+        return value
+
+    def invalidate(self, keys: Iterable[Hashable]) -> None:
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self.cache.delete(key)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self.cache.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.cache.stats(), "ttl_seconds": self.cache.ttl, "invalidations": self.invalidations}
+
+
+_items = _EntityCache(settings.ENTITY_CACHE_MAX_ITEMS, settings.ENTITY_CACHE_TTL_SECONDS)
+_categories = _EntityCache(settings.ENTITY_CACHE_MAX_CATEGORIES, settings.ENTITY_CACHE_TTL_SECONDS)
+
+
+def get_item(db: Session, item_id: int) -> Optional[ItemSnapshot]:
+    """Get a snapshot of an item and its category, or None if there is no such item."""
+    def load() -> Optional[ItemSnapshot]:
+        item = db.query(Item).options(
+            undefer(Item.content), joinedload(Item.category)
+        ).filter(Item.id == item_id).first()
+        return ItemSnapshot.model_validate(item) if item else None
+
+    return _items.get_or_load(item_id, load)
+
+
+def get_category(db: Session, category_id: int) -> Optional[CategorySnapshot]:
+    """Get a snapshot of a category, or None if there is no such category."""
+    def load() -> Optional[CategorySnapshot]:
+        category = db.query(Category).filter(Category.id == category_id).first()
+        return CategorySnapshot.model_validate(category) if category else None
+
+    return _categories.get_or_load(category_id, load)
+
+
+def get_category_list(db: Session, order_by: Sequence[Any]) -> Optional[Tuple[CategorySnapshot, ...]]:
+    """
+    Get snapshots of every category sorted by order_by, or None when there
+    are more than ENTITY_CACHE_MAX_CATEGORY_LIST and the list is not cached.
+    """
+    def load() -> Any:
+        limit = settings.ENTITY_CACHE_MAX_CATEGORY_LIST
+        categories = db.query(Category).order_by(*order_by).limit(limit + 1).all()
+        # Too long a list is cached as False, so it is not counted again on every call
+        if len(categories) > limit:
+            return False
+        return tuple(CategorySnapshot.model_validate(category) for category in categories)
+
+    categories = _categories.get_or_load(CATEGORY_LIST, load)
+    return None if categories is False else categories
+
+
+def page(
+    rows: Sequence[Any],
+    order_by: Sequence[Any],
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> Optional[List[Any]]:
+    """
+    Get one page of a cached sorted list, like pagination.keyset would.
+    Returns None when the cursor's row is no longer in the list, so the
+    caller can fall back to the database.
+    """
+    start = skip
+    if cursor:
+        values = pagination.decode_cursor(cursor, order_by)
+        keys = [column.key for column in order_by]
+        start = next(
+            (i + 1 for i, row in enumerate(rows) if [getattr(row, key) for key in keys] == values),
+            None,
+        )
+        if start is None:
+            return None
+    return list(rows[start:start + limit])
+
+
+def invalidate_items(db: Session, item_ids: Iterable[int]) -> None:
+    """Drop cached items once the session commits."""
+    db.info.setdefault("entity_cache_items", set()).update(item_ids)
+
+
+def invalidate_categories(db: Session, category_ids: Iterable[int]) -> None:
+    """
+    Drop cached categories and the category list once the session commits.
+    Items embed their category, so changing one drops all cached items too.
+    """
+    db.info.setdefault("entity_cache_categories", set()).update([*category_ids, CATEGORY_LIST])
+
+
+def clear() -> None:
+    """Drop everything cached in this process."""
+    _items.clear()
+    _categories.clear()
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    item_ids = session.info.pop("entity_cache_items", None)
+    category_keys = session.info.pop("entity_cache_categories", None)
+    if item_ids:
+        _items.invalidate(item_ids)
+    if category_keys:
+        _categories.invalidate(category_keys)
+        if category_keys - {CATEGORY_LIST}:
+            _items.clear()
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop("entity_cache_items", None)
+    session.info.pop("entity_cache_categories", None)
+
+
+def stats() -> Dict[str, Any]:
+    """Get the hit ratio, size and eviction counters of both caches."""
+    return {"items": _items.stats(), "categories": _categories.stats()}
+
+
+metrics.register("entity_cache", stats)
@@ -0,0 +1,110 @@
+import csv
+import datetime
+import enum
+import io
+import json
+from typing import Any, Dict, Iterator, List, Sequence
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.bookmark import Bookmark
+from app.models.item import Item
+from app.models.notification import Notification
+from app.models.user import User
+
+
+class ExportTable(str, enum.Enum):
+    ITEMS = "items"
+    USERS = "users"
+    BOOKMARKS = "bookmarks"
+    NOTIFICATIONS = "notifications"
+
+
+class ExportFormat(str, enum.Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+# Exported columns per table; never includes secrets such as password hashes
+COLUMNS: Dict[ExportTable, List[Any]] = {
+    ExportTable.ITEMS: [
+        Item.id, Item.name, Item.description, Item.content, Item.image, Item.category_id,
+        Item.is_featured, Item.difficulty, Item.bookmark_count, Item.created_at, Item.updated_at,
+    ],
+    ExportTable.USERS: [
+        User.id, User.email, User.full_name, User.role, User.is_active, User.profile_image,
+        User.created_at, User.updated_at,
+    ],
+    ExportTable.BOOKMARKS: [
+        Bookmark.id, Bookmark.user_id, Bookmark.item_id, Bookmark.created_at,
+    ],
+    ExportTable.NOTIFICATIONS: [
+        Notification.id, Notification.user_id, Notification.title, Notification.content,
+        Notification.notification_type, Notification.is_read, Notification.created_at,
+    ],
+}
+
+
+def _value(value: Any) -> Any:
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def iter_batches(table: ExportTable, batch_size: int) -> Iterator[Sequence[Any]]:
+    """
+    Stream the rows of a table in id order, one batch of column tuples at a time.
+
+    Uses a server-side cursor, so memory use is bounded by batch_size
+    whatever the table size. Opens its own session because the response
+    body is produced after the request's session may have been closed.
+    """
+    db = SessionLocal()
+    try:
+        columns = COLUMNS[table]
+        stmt = select(*columns).order_by(columns[0]).execution_options(yield_per=batch_size)
+        for batch in db.execute(stmt).partitions():
+            yield batch
+    finally:
+        db.close()
+
+
+def stream_ndjson(table: ExportTable, batch_size: int) -> Iterator[bytes]:
+    """Encode a table as newline-delimited JSON, one chunk per batch."""
+    names = [column.key for column in COLUMNS[table]]
+    for batch in iter_batches(table, batch_size):
+        yield "".join(
+            json.dumps(dict(zip(names, map(_value, row))), ensure_ascii=False) + "\n"
+            for row in batch
+        ).encode()
+
+
+def stream_csv(table: ExportTable, batch_size: int) -> Iterator[bytes]:
+    """Encode a table as CSV with a header row, one chunk per batch."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.key for column in COLUMNS[table]])
+    # The header goes out before the first query returns
+    yield buffer.getvalue().encode()
+    for batch in iter_batches(table, batch_size):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([map(_value, row) for row in batch])
+        yield buffer.getvalue().encode()
+
+
+def stream(table: ExportTable, export_format: ExportFormat, batch_size: int = 0) -> Iterator[bytes]:
+    """Stream a table export in the given format."""
+    batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+    if export_format == ExportFormat.CSV:
+        return stream_csv(table, batch_size)
+    return stream_ndjson(table, batch_size)
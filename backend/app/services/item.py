@@ -1,14 +1,64 @@
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from collections import Counter
+from typing import List, Optional, Dict, Any, Sequence, Tuple
 
+from pydantic import ValidationError
+from sqlalchemy import func, insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, joinedload, load_only, undefer
+
+from app.db.loader import get_loader, ordered
+from app.models.category import Category
 from app.models.item import Item
 from app.schemas.item import ItemCreate, ItemUpdate
+from app.services import counter as counter_service
+from app.services import entity_cache
+from app.services import pagination
+from app.services import render as render_service
+from app.services import search as search_service
+from app.services import similar as similar_service
+from app.services import statistics as statistics_service
+from app.services import suggest as suggest_service
+from app.services import view_counter
+from app.utils.markdown import content_hash, render_markdown
+
+# Sort key of item lists, used for cursor pagination
+ORDER_BY = (Item.name, Item.id)
+
+# Sort options of item lists
+SORT_NAME = "name"
+SORT_MOST_VIEWED = "most_viewed"
+SORT_PATTERN = f"^({SORT_NAME}|{SORT_MOST_VIEWED})$"
+
+
+def load_options(columns: Optional[Sequence[str]] = None) -> List[Any]:
+    """
+    Get loader options for the given item columns, or for the full row
+    including the deferred content when columns is None.
+
+    Full rows are serialized with their category, so it is joined in
+    rather than lazy-loaded once per item.
+    """
+    if columns is None:
+        return [undefer(Item.content), joinedload(Item.category)]
+    # Sort key columns are needed to build the next cursor
+    names = dict.fromkeys([*columns, *(column.key for column in ORDER_BY)])
+    return [load_only(*[getattr(Item, name) for name in names])]
 
 
 def get_by_id(db: Session, item_id: int) -> Optional[Item]:
-    """Get an item by ID."""
-    return db.query(Item).filter(Item.id == item_id).first()
+    """Get an item by ID, memoized for the rest of the request."""
+    return get_loader(db, Item, load_options()).load(item_id)
+
+
+def get_by_ids(db: Session, item_ids: Sequence[int], columns: Optional[Sequence[str]] = None) -> List[Item]:
+    """
+    Get the items with the given IDs in one query, in that order, skipping missing ones.
+    Only the given columns are loaded; by default the full row is, through the request's loader.
+    """
+    if columns is None:
+        return ordered(get_loader(db, Item, load_options()).load_many(item_ids), item_ids)
+    rows = db.query(Item).options(*load_options(columns)).filter(Item.id.in_(item_ids))
+    return ordered({row.id: row for row in rows}, item_ids)
 
 
 def get_all(
@@ -19,31 +69,98 @@ def get_all(
     search: Optional[str] = None,
     is_featured: Optional[bool] = None,
     difficulty: Optional[str] = None,
+    cursor: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None,
+    sort: str = SORT_NAME,
 ) -> List[Item]:
-    """Get all items with filtering and pagination."""
-    query = db.query(Item)
+    """
+    Get all items with filtering and pagination.
+
+    Pass the cursor of the previous page instead of skip to page by keyset.
+    Search results are ordered by relevance and only support skip.
+    sort=most_viewed orders by views over the last MOST_VIEWED_WINDOW_DAYS
+    days and also only supports skip.
+    Only the given columns are loaded; by default the full row is.
+    """
+    if search:
+        if cursor:
+            raise pagination.InvalidCursor("Cursor pagination is not supported with search")
+        return search_items(
+            db,
+            search_text=search,
+            skip=skip,
+            limit=limit,
+            category_id=category_id,
+            is_featured=is_featured,
+            difficulty=difficulty,
+            columns=columns,
+        )
+    
+    query = db.query(Item).options(*load_options(columns))
     
     # Apply filters
     if category_id:
         query = query.filter(Item.category_id == category_id)
     
-    if search:
-        query = query.filter(
-            or_(
-                Item.name.ilike(f"%{search}%"),
-                Item.description.ilike(f"%{search}%"),
-                Item.content.ilike(f"%{search}%"),
-            )
-        )
-    
     if is_featured is not None:
         query = query.filter(Item.is_featured == is_featured)
         
     if difficulty:
         query = query.filter(Item.difficulty == difficulty)
     
+    if sort == SORT_MOST_VIEWED:
+        if cursor:
+            raise pagination.InvalidCursor("Cursor pagination is not supported with sort=most_viewed")
+        views = view_counter.recent_views()
+        query = query.outerjoin(views, views.c.item_id == Item.id)
+        query = query.order_by(func.coalesce(views.c.views, 0).desc(), Item.id)
+        return query.offset(skip).limit(limit).all()
+    
     # Apply pagination and return results
-    return query.order_by(Item.name).offset(skip).limit(limit).all()
+    query = pagination.keyset(query, ORDER_BY, cursor)
+    if not cursor:
+        query = query.offset(skip)
+    return query.limit(limit).all()
+
+
+def search_items(
+    db: Session,
+    search_text: str,
+    skip: int = 0,
+    limit: int = 100,
+    category_id: Optional[int] = None,
+    is_featured: Optional[bool] = None,
+    difficulty: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None,
+) -> List[Item]:
+    """Full-text search items, most relevant first, with search_rank and search_snippet set."""
+    hits = search_service.search_items(
+        db,
+        search_text,
+        skip=skip,
+        limit=limit,
+        category_id=category_id,
+        is_featured=is_featured,
+        difficulty=difficulty,
+    )
+    if not hits:
+        return []
+    
+    items = {
+        item.id: item
+        for item in db.query(Item)
+        .options(*load_options(columns))
+        .filter(Item.id.in_([hit.item_id for hit in hits]))
+    }
+    results = []
+    for hit in hits:
+        item = items.get(hit.item_id)
+        if item is None:
+            continue
+        item.search_rank = hit.rank
+        item.search_snippet = hit.snippet
+        results.append(item)
+    return results
 
 
 def create(db: Session, obj_in: ItemCreate) -> Item:
@@ -52,32 +169,152 @@ def create(db: Session, obj_in: ItemCreate) -> Item:
         name=obj_in.name,
         description=obj_in.description,
         content=obj_in.content,
+        content_hash=render_service.ensure_rendered(db, obj_in.content),
         image=obj_in.image,
         category_id=obj_in.category_id,
         is_featured=obj_in.is_featured,
         difficulty=obj_in.difficulty,
     )
     db.add(db_obj)
+    counter_service.increment(db, counter_service.category_key(obj_in.category_id), 1)
+    if obj_in.is_featured:
+        counter_service.increment(db, counter_service.ITEMS_FEATURED, 1)
     db.commit()
+    statistics_service.invalidate_cache()
     db.refresh(db_obj)
+    suggest_service.add(suggest_service.ITEM, db_obj.id, db_obj.name)
+    similar_service.update(db_obj.id, db_obj.name, db_obj.description, db_obj.content)
     return db_obj
 
 
+def _validation_error(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+        for error in e.errors()
+    )
+
+
+def bulk_create(db: Session, rows: List[Any], chunk_size: int = 1000) -> List[Dict[str, Any]]:
+    """
+    Create many items at once.
+
+    Every row is validated as an ItemCreate and all category ids are
+    checked in one query. Valid rows are inserted with one executemany
+    INSERT ... RETURNING per chunk of chunk_size rows, each chunk in its own
+    transaction (chunk_size 0 means one transaction for everything).
+    Returns one {"index", "id", "error"} result per row, in input order.
+
+    Each chunk's distinct contents that have not been rendered before are
+    rendered and stored in the chunk's transaction.
+    """
+    results: List[Dict[str, Any]] = [{"index": i, "id": None, "error": None} for i in range(len(rows))]
+    valid: List[Tuple[int, ItemCreate]] = []
+    for i, row in enumerate(rows):
+        try:
+            valid.append((i, ItemCreate.model_validate(row)))
+        except ValidationError as e:
+            results[i]["error"] = _validation_error(e)
+
+    category_ids = {obj_in.category_id for _, obj_in in valid}
+    existing = {
+        category_id
+        for category_id, in db.query(Category.id).filter(Category.id.in_(category_ids))
+    } if category_ids else set()
+    for i, obj_in in valid:
+        if obj_in.category_id not in existing:
+            results[i]["error"] = "Category not found"
+    valid = [(i, obj_in) for i, obj_in in valid if obj_in.category_id in existing]
+
+    chunk_size = chunk_size or len(valid) or 1
+    stmt = insert(Item).returning(Item.id, sort_by_parameter_order=True)
+    created = 0
+    for start in range(0, len(valid), chunk_size):
+        chunk = valid[start:start + chunk_size]
+        contents = {content_hash(obj_in.content): obj_in.content for _, obj_in in chunk}
+        values = [
+            {
+                "name": obj_in.name,
+                "description": obj_in.description,
+                "content": obj_in.content,
+                "content_hash": content_hash(obj_in.content),
+                "image": obj_in.image,
+                "category_id": obj_in.category_id,
+                "is_featured": obj_in.is_featured,
+                "difficulty": obj_in.difficulty,
+            }
+            for _, obj_in in chunk
+        ]
+        try:
+            render_service.store(db, {
+                key: render_markdown(contents[key]) for key in render_service.missing(db, contents)
+            })
+            ids = db.scalars(stmt, values).all()
+            per_category = Counter(obj_in.category_id for _, obj_in in chunk)
+            for category_id, count in per_category.items():
+                counter_service.increment(db, counter_service.category_key(category_id), count)
+            counter_service.increment(
+                db, counter_service.ITEMS_FEATURED, sum(1 for _, obj_in in chunk if obj_in.is_featured)
+            )
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            for i, _ in chunk:
+                results[i]["error"] = f"Database error: {e.__class__.__name__}"
+            continue
+        for (i, _), item_id in zip(chunk, ids):
+            results[i]["id"] = item_id
+        similar_service.update_many([
+            (item_id, obj_in.name, obj_in.description, obj_in.content)
+            for (_, obj_in), item_id in zip(chunk, ids)
+        ])
+        created += len(chunk)
+
+    if created:
+        statistics_service.invalidate_cache()
+        # Rebuilding is cheaper than inserting thousands of names one by one
+        suggest_service.reset()
+    return results
+
+
 def update(db: Session, db_obj: Item, obj_in: ItemUpdate) -> Item:
     """Update an item."""
     update_data = obj_in.model_dump(exclude_unset=True)
+    old_category_id, old_featured = db_obj.category_id, bool(db_obj.is_featured)
     
     for key, value in update_data.items():
         setattr(db_obj, key, value)
+    if "content" in update_data:
+        db_obj.content_hash = render_service.ensure_rendered(db, db_obj.content)
     
     db.add(db_obj)
+    entity_cache.invalidate_items(db, [db_obj.id])
+    if db_obj.category_id != old_category_id:
+        counter_service.increment(db, counter_service.category_key(old_category_id), -1)
+        counter_service.increment(db, counter_service.category_key(db_obj.category_id), 1)
+    if bool(db_obj.is_featured) != old_featured:
+        counter_service.increment(db, counter_service.ITEMS_FEATURED, -1 if old_featured else 1)
     db.commit()
+    statistics_service.invalidate_cache()
     db.refresh(db_obj)
+    if "name" in update_data:
+        suggest_service.add(suggest_service.ITEM, db_obj.id, db_obj.name)
+    if update_data.keys() & {"name", "description", "content"}:
+        similar_service.update(db_obj.id, db_obj.name, db_obj.description, db_obj.content)
     return db_obj
 
 
 def delete(db: Session, db_obj: Item) -> Item:
     """Delete an item."""
+    item_id = db_obj.id
     db.delete(db_obj)
+    get_loader(db, Item, load_options()).forget(item_id)
+    entity_cache.invalidate_items(db, [item_id])
+    counter_service.increment(db, counter_service.category_key(db_obj.category_id), -1)
+    if db_obj.is_featured:
+        counter_service.increment(db, counter_service.ITEMS_FEATURED, -1)
+    counter_service.increment(db, counter_service.BOOKMARKS_TOTAL, -db_obj.bookmark_count)
     db.commit()
+    statistics_service.invalidate_cache()
+    suggest_service.remove(suggest_service.ITEM, item_id)
+    similar_service.remove(item_id)
     return db_obj 
\ No newline at end of file
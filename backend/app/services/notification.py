@@ -2,7 +2,14 @@ from typing import List, Optional
 from sqlalchemy.orm import Session
 
 from app.models.notification import Notification
+from app.models.user import User
 from app.schemas.notification import NotificationCreate, NotificationUpdate
+from app.services import counter as counter_service
+from app.services import pagination
+from app.services import statistics as statistics_service
+
+# Sort key of notification lists (newest first), used for cursor pagination
+ORDER_BY = (Notification.created_at, Notification.id)
 
 
 def get_by_id(db: Session, notification_id: int) -> Optional[Notification]:
@@ -10,14 +17,29 @@ def get_by_id(db: Session, notification_id: int) -> Optional[Notification]:
     return db.query(Notification).filter(Notification.id == notification_id).first()
 
 
-def get_all_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100, unread_only: bool = False) -> List[Notification]:
-    """Get all notifications for a user with pagination."""
+def get_all_by_user(
+    db: Session,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    unread_only: bool = False,
+    cursor: Optional[str] = None,
+) -> List[Notification]:
+    """Get all notifications for a user, newest first, with offset or cursor pagination."""
     query = db.query(Notification).filter(Notification.user_id == user_id)
     
     if unread_only:
         query = query.filter(Notification.is_read == False)
     
-    return query.order_by(Notification.created_at.desc()).offset(skip).limit(limit).all()
+    query = pagination.keyset(query, ORDER_BY, cursor, descending=True)
+    if not cursor:
+        query = query.offset(skip)
+    return query.limit(limit).all()
+
+
+def get_unread_count(db: Session, user_id: int) -> int:
+    """Get the number of unread notifications for a user."""
+    return db.query(User.unread_count).filter(User.id == user_id).scalar() or 0
 
 
 def create(db: Session, obj_in: NotificationCreate) -> Notification:
@@ -30,7 +52,11 @@ def create(db: Session, obj_in: NotificationCreate) -> Notification:
         is_read=False,
     )
     db.add(db_obj)
+    counter_service.increment_user_unread(db, obj_in.user_id, 1)
+    counter_service.increment(db, counter_service.NOTIFICATIONS_TOTAL, 1)
+    counter_service.increment(db, counter_service.NOTIFICATIONS_UNREAD, 1)
     db.commit()
+    statistics_service.invalidate_cache()
     db.refresh(db_obj)
     return db_obj
 
@@ -38,21 +64,27 @@ def create(db: Session, obj_in: NotificationCreate) -> Notification:
 def update(db: Session, db_obj: Notification, obj_in: NotificationUpdate) -> Notification:
     """Update a notification."""
     update_data = obj_in.model_dump(exclude_unset=True)
+    was_unread_for = None if db_obj.is_read else db_obj.user_id
     
     for key, value in update_data.items():
         setattr(db_obj, key, value)
     
     db.add(db_obj)
+    _move_unread(db, was_unread_for, None if db_obj.is_read else db_obj.user_id)
     db.commit()
+    statistics_service.invalidate_cache()
     db.refresh(db_obj)
     return db_obj
 
 
 def mark_as_read(db: Session, db_obj: Notification) -> Notification:
     """Mark a notification as read."""
+    if not db_obj.is_read:
+        _move_unread(db, db_obj.user_id, None)
     db_obj.is_read = True
     db.add(db_obj)
     db.commit()
+    statistics_service.invalidate_cache()
     db.refresh(db_obj)
     return db_obj
 
@@ -63,12 +95,33 @@ def mark_all_as_read(db: Session, user_id: int) -> int:
         Notification.user_id == user_id,
         Notification.is_read == False
     ).update({"is_read": True})
+    counter_service.increment_user_unread(db, user_id, -result)
+    counter_service.increment(db, counter_service.NOTIFICATIONS_UNREAD, -result)
     db.commit()
+    statistics_service.invalidate_cache()
     return result
 
 
 def delete(db: Session, db_obj: Notification) -> Notification:
     """Delete a notification."""
     db.delete(db_obj)
+    if not db_obj.is_read:
+        _move_unread(db, db_obj.user_id, None)
+    counter_service.increment(db, counter_service.NOTIFICATIONS_TOTAL, -1)
     db.commit()
-    return db_obj 
\ No newline at end of file
+    statistics_service.invalidate_cache()
+    return db_obj 
+
+
+def _move_unread(db: Session, from_user_id: Optional[int], to_user_id: Optional[int]) -> None:
+    """Move one unread notification between users' unread counters."""
+    if from_user_id == to_user_id:
+        return
+    if from_user_id is not None:
+        counter_service.increment_user_unread(db, from_user_id, -1)
+    if to_user_id is not None:
+        counter_service.increment_user_unread(db, to_user_id, 1)
+    if from_user_id is None or to_user_id is None:
+        counter_service.increment(
+            db, counter_service.NOTIFICATIONS_UNREAD, 1 if from_user_id is None else -1
+        )
@@ -0,0 +1,70 @@
+import base64
+import datetime
+import json
+from typing import Any, List, Optional, Sequence
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded or used."""
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort key of the last row of a page as an opaque cursor."""
+    payload = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    """Decode a cursor back into typed values for the given sort columns."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("wrong number of values")
+        return [
+            datetime.datetime.fromisoformat(value)
+            if column.type.python_type is datetime.datetime
+            else column.type.python_type(value)
+            for column, value in zip(columns, values)
+        ]
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+
+
+def keyset(
+    query: Query,
+    columns: Sequence[Any],
+    cursor: Optional[str] = None,
+    descending: bool = False,
+) -> Query:
+    """
+    Order a query by columns and, given a cursor, start right after it.
+
+    The last column must be unique (normally the primary key) so that the
+    ordering is total. With an index on the columns, every page costs the
+    same as the first one.
+    """
+    if cursor:
+        after = tuple_(*columns)
+        values = tuple_(*decode_cursor(cursor, columns))
+        query = query.filter(after < values if descending else after > values)
+    return query.order_by(*[column.desc() if descending else column for column in columns])
+
+
+def next_cursor(rows: Sequence[Any], limit: int, columns: Sequence[Any]) -> Optional[str]:
+    """Get the cursor for the page after rows, or None if this was the last page."""
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor([getattr(last, column.key) for column in columns])
@@ -0,0 +1,134 @@
+"""
+Per-process cache of authenticated principals.
+
+Maps the SHA-256 digest of a bearer token to a frozen Principal snapshot
+of its user, so a repeated token is neither decoded nor looked up again.
+An entry never outlives the token's exp, nor PRINCIPAL_CACHE_TTL_SECONDS.
+
+user_service marks users it changes or deletes with invalidate_user; their
+entries are dropped once the session commits. Every invalidation bumps a
+generation number and records it for the user, and entries loaded at an
+older generation are ignored, so a principal loaded while a write was
+committing is never served. The record is kept for the TTL only: by then
+every entry loaded before the invalidation has expired. Other worker
+processes see a change after at most the TTL.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.schemas.user import Principal
+
+_cache = LRUCache(settings.PRINCIPAL_CACHE_MAX_ENTRIES, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS)
+_lock = threading.Lock()
+# Bumped by every invalidation; entries keep the generation they were loaded at
+_generation = 0
+# user id -> (generation of their last invalidation, monotonic time of it), oldest first
+_invalidated: "OrderedDict[int, Tuple[int, float]]" = OrderedDict()
+_invalidations = 0
+
+
+def token_digest(token: str) -> bytes:
+    """Get the cache key of a bearer token."""
+    return hashlib.sha256(token.encode()).digest()
+
+
+def _is_current(user_id: int, generation: int) -> bool:
+    last = _invalidated.get(user_id)
+    return last is None or last[0] <= generation
+
+
+def get(token: str) -> Optional[Principal]:
+    """Get the cached principal of a token, or None."""
+    entry = _cache.get(token_digest(token))
+    if entry is None:
+        return None
+    generation, principal = entry
+    if not _is_current(principal.id, generation):
+        return None
+    return principal
+
+
+def load(token: str, user_id: int, expires_at: float, loader: Callable[[], Any]) -> Optional[Principal]:
+    """
+    Load the principal of a token for user_id with loader, which returns
+    the user or None, and cache it. expires_at is the token's exp as a
+    Unix timestamp. Returns None if the user does not exist.
+    """
+    with _lock:
+        generation = _generation
+    started = time.monotonic()
+    user = loader()
+    if user is None:
+        return None
+    principal = Principal.model_validate(user)
+    ttl = min(settings.PRINCIPAL_CACHE_TTL_SECONDS, expires_at - time.time())
+    if ttl > 0:
+        with _lock:
+            # A load slower than the TTL may have outlived the record of an invalidation
+            if _is_current(user_id, generation) and time.monotonic() - started < settings.PRINCIPAL_CACHE_TTL_SECONDS:
+                _cache.set(token_digest(token), (generation, principal), ttl=ttl)
+    return principal
+
+
+def invalidate_user(db: Session, user_id: int) -> None:
+    """Drop the cached principals of a user once the session commits."""
+    db.info.setdefault("principal_cache_users", set()).add(user_id)
+
+
+def invalidate(user_ids: Iterable[int]) -> None:
+    """Drop the cached principals of users now."""
+    global _generation, _invalidations
+    now = time.monotonic()
+    with _lock:
+        _generation += 1
+        for user_id in user_ids:
+            _invalidated[user_id] = (_generation, now)
+            _invalidated.move_to_end(user_id)
+            _invalidations += 1
+        # Entries loaded before an invalidation older than the TTL have expired
+        while _invalidated:
+            user_id, (_, invalidated_at) = next(iter(_invalidated.items()))
+            if now - invalidated_at < settings.PRINCIPAL_CACHE_TTL_SECONDS:
+                break
+            del _invalidated[user_id]
+
+
+def clear() -> None:
+    """Drop every cached principal."""
+    with _lock:
+        _cache.clear()
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    user_ids = session.info.pop("principal_cache_users", None)
+    if user_ids:
+        invalidate(user_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop("principal_cache_users", None)
+
+
+def stats() -> Dict[str, Any]:
+    """Get the hit ratio, size and invalidation counters."""
+    return {
+        **_cache.stats(),
+        "ttl_seconds": _cache.ttl,
+        "invalidations": _invalidations,
+        "invalidated_users": len(_invalidated),
+    }
+
+
+metrics.register("principal_cache", stats)
@@ -0,0 +1,124 @@
+"""
+Rotating refresh tokens.
+
+A refresh token is an opaque random string; only its SHA-256 is stored,
+so a leaked table grants nothing. Every login starts a family, and every
+refresh marks the presented token used and issues its successor in the
+same family. A used token coming back means it was copied: the whole
+family is revoked, logging out both the thief and the owner.
+"""
+
+import datetime
+import hashlib
+import logging
+import secrets
+import uuid
+from typing import Optional, Tuple
+
+from sqlalchemy import delete, or_, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+def hash_token(token: str) -> str:
+    """Get the stored form of a refresh token."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _add(db: Session, user_id: int, family_id: str) -> str:
+    token = secrets.token_urlsafe(32)
+    db.add(RefreshToken(
+        user_id=user_id,
+        token_hash=hash_token(token),
+        family_id=family_id,
+        expires_at=datetime.datetime.utcnow() + datetime.timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    return token
+
+
+def issue(db: Session, user_id: int) -> str:
+    """Start a new token family for a user who just logged in and return its first token."""
+    token = _add(db, user_id, uuid.uuid4().hex)
+    db.commit()
+    return token
+
+
+def rotate(db: Session, token: str) -> Optional[Tuple[int, str]]:
+    """
+    Exchange a refresh token for its successor.
+    Returns (user_id, new token), or None if the token is unknown, expired,
+    revoked or its user is inactive. Presenting an already used token
+    revokes its whole family.
+    """
+    row = db.query(RefreshToken, User.is_active).join(User, User.id == RefreshToken.user_id).filter(
+        RefreshToken.token_hash == hash_token(token)
+    ).first()
+    if row is None:
+        return None
+    db_obj, is_active = row
+    now = datetime.datetime.utcnow()
+    if db_obj.revoked_at is not None or db_obj.expires_at <= now or not is_active:
+        return None
+
+    # Claim the token; losing the race to a concurrent refresh counts as reuse
+    claimed = db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == db_obj.id, RefreshToken.used_at.is_(None))
+        .values(used_at=now)
+    ).rowcount
+    if not claimed:
+        logger.warning("Refresh token reused, revoking family %s of user %s", db_obj.family_id, db_obj.user_id)
+        _revoke_family(db, db_obj.family_id, now)
+        db.commit()
+        return None
+
+    # Read before committing, which would expire db_obj and cost a reload
+    user_id = db_obj.user_id
+    new_token = _add(db, user_id, db_obj.family_id)
+    db.commit()
+    return user_id, new_token
+
+
+def _revoke_family(db: Session, family_id: str, now: datetime.datetime) -> None:
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+    )
+
+
+def revoke(db: Session, token: str) -> bool:
+    """Revoke the family of a refresh token, e.g. on logout. Returns False if the token is unknown."""
+    db_obj = db.query(RefreshToken).filter(RefreshToken.token_hash == hash_token(token)).first()
+    if db_obj is None:
+        return False
+    _revoke_family(db, db_obj.family_id, datetime.datetime.utcnow())
+    db.commit()
+    return True
+
+
+def revoke_user(db: Session, user_id: int) -> None:
+    """Revoke every refresh token of a user; the caller commits."""
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.datetime.utcnow())
+    )
+
+
+def purge(db: Session) -> int:
+    """Delete expired and revoked tokens. Returns how many were deleted."""
+    # Used tokens are kept until they expire so their reuse is still caught
+    deleted = db.execute(
+        delete(RefreshToken).where(or_(
+            RefreshToken.expires_at <= datetime.datetime.utcnow(),
+            RefreshToken.revoked_at.is_not(None),
+        ))
+    ).rowcount
+    db.commit()
+    return deleted
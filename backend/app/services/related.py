@@ -0,0 +1,292 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.bookmark import Bookmark
+
+logger = logging.getLogger(__name__)
+
+
+class CoBookmarkIndex:
+    """
+    Item-to-item cosine similarity over who bookmarked what.
+
+    Keeps the item x item co-bookmark count matrix C = X.T @ X, where X is
+    the binary user x item bookmark matrix, indexed by item id. The cosine
+    similarity of items i and j is C[i, j] / sqrt(C[i, i] * C[j, j]).
+
+    Each item's top-k neighbours are precomputed. C is built as a CSR
+    matrix; a bookmark change copies only the rows it touches into dicts,
+    updates their counts and marks the rows whose scores moved, which are
+    recomputed on their next lookup.
+    """
+
+    def __init__(self, top_k: int, min_count: int = 1) -> None:
+        self.top_k = top_k
+        self.min_count = min_count
+        self._lock = threading.RLock()
+        self._counts = sparse.csr_matrix((0, 0), dtype=np.int32)
+        # Rows of counts changed since the build: item id -> {item id: count}
+        self._changed: Dict[int, Dict[int, int]] = {}
+        # The diagonal of counts: how many users bookmarked each item
+        self._totals = np.zeros(0, dtype=np.int64)
+        self._bookmarks = sparse.csr_matrix((0, 0), dtype=np.int32)
+        self._users = np.zeros(0, dtype=np.int64)
+        self._user_items: Dict[int, Set[int]] = {}
+        # item id -> (neighbour ids, scores), most similar first
+        self._neighbours: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self._dirty: Set[int] = set()
+        self.recomputed_rows = 0
+
+    @classmethod
+    def build(cls, pairs: np.ndarray, top_k: int, min_count: int = 1) -> "CoBookmarkIndex":
+        """Build the index from an (n, 2) array of (user_id, item_id) bookmarks."""
+        index = cls(top_k, min_count)
+        if not len(pairs):
+            return index
+        users, rows = np.unique(pairs[:, 0], return_inverse=True)
+        item_ids = pairs[:, 1]
+        size = int(item_ids.max()) + 1
+        bookmarks = sparse.csr_matrix(
+            (np.ones(len(pairs), dtype=np.int32), (rows, item_ids)), shape=(len(users), size)
+        )
+        counts = (bookmarks.T @ bookmarks).tocsr()
+
+        # Cosine similarity of every stored pair at once
+        totals = counts.diagonal().astype(np.int64)
+        norms = np.sqrt(totals.astype(np.float64))
+        row_ids = np.repeat(np.arange(size), np.diff(counts.indptr))
+        scores = counts.data / (norms[row_ids] * norms[counts.indices])
+        for item_id in np.flatnonzero(np.diff(counts.indptr)):
+            start, end = counts.indptr[item_id], counts.indptr[item_id + 1]
+            index._neighbours[int(item_id)] = index._top(
+                int(item_id), counts.indices[start:end], counts.data[start:end], scores[start:end]
+            )
+
+        index._counts, index._totals = counts, totals
+        index._bookmarks, index._users = bookmarks, users
+        return index
+
+    def _top(self, item_id: int, columns: np.ndarray, counts: np.ndarray, scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        keep = (columns != item_id) & (counts >= self.min_count)
+        columns, scores = columns[keep], scores[keep]
+        # Highest score first, lower id first on ties
+        order = np.lexsort((columns, -scores))[:self.top_k]
+        return columns[order], scores[order]
+
+    def _base_row(self, item_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        if item_id >= self._counts.shape[0]:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int32)
+        start, end = self._counts.indptr[item_id], self._counts.indptr[item_id + 1]
+        return self._counts.indices[start:end], self._counts.data[start:end]
+
+    def _row(self, item_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        changed = self._changed.get(item_id)
+        if changed is None:
+            return self._base_row(item_id)
+        return np.fromiter(changed.keys(), dtype=np.int64), np.fromiter(changed.values(), dtype=np.int64)
+
+    def _increment(self, item_id: int, other: int, delta: int) -> None:
+        row = self._changed.get(item_id)
+        if row is None:
+            columns, counts = self._base_row(item_id)
+            row = self._changed[item_id] = dict(zip(columns.tolist(), counts.tolist()))
+        count = row.get(other, 0) + delta
+        if count:
+            row[other] = count
+        else:
+            del row[other]
+
+    def _items_of(self, user_id: int) -> Set[int]:
+        items = self._user_items.get(user_id)
+        if items is None:
+            i = int(np.searchsorted(self._users, user_id))
+            items = set()
+            if i < len(self._users) and self._users[i] == user_id:
+                start, end = self._bookmarks.indptr[i], self._bookmarks.indptr[i + 1]
+                items = set(self._bookmarks.indices[start:end].tolist())
+            self._user_items[user_id] = items
+        return items
+
+    def _recompute(self, item_id: int) -> None:
+        columns, counts = self._row(item_id)
+        own = self._totals[item_id] if item_id < len(self._totals) else 0
+        scores = np.zeros(len(counts))
+        if own:
+            scores = counts / (np.sqrt(own) * np.sqrt(self._totals[columns]))
+        self._neighbours[item_id] = self._top(item_id, columns, counts, scores)
+        self.recomputed_rows += 1
+
+    def _mark(self, item_id: int) -> None:
+        # The item's bookmark count is in every score of its row and column
+        self._dirty.add(item_id)
+        self._dirty.update(self._row(item_id)[0].tolist())
+
+    def add(self, user_id: int, item_id: int) -> None:
+        """Count a new bookmark."""
+        with self._lock:
+            items = self._items_of(user_id)
+            if item_id in items:
+                return
+            if item_id >= len(self._totals):
+                self._totals = np.concatenate([
+                    self._totals, np.zeros(max(item_id + 1, 2 * len(self._totals)) - len(self._totals), dtype=np.int64)
+                ])
+            for other in items:
+                self._increment(item_id, other, 1)
+                self._increment(other, item_id, 1)
+            self._increment(item_id, item_id, 1)
+            self._totals[item_id] += 1
+            items.add(item_id)
+            self._mark(item_id)
+
+    def remove(self, user_id: int, item_id: int) -> None:
+        """Uncount a deleted bookmark."""
+        with self._lock:
+            items = self._items_of(user_id)
+            if item_id not in items:
+                return
+            items.discard(item_id)
+            self._mark(item_id)
+            for other in items:
+                self._increment(item_id, other, -1)
+                self._increment(other, item_id, -1)
+            self._increment(item_id, item_id, -1)
+            self._totals[item_id] -= 1
+
+    def related(self, item_id: int, limit: int) -> List[Tuple[int, float]]:
+        """Get up to limit (item_id, score) neighbours of an item, most similar first."""
+        with self._lock:
+            if item_id in self._dirty:
+                self._dirty.discard(item_id)
+                self._recompute(item_id)
+            if item_id not in self._neighbours:
+                return []
+            columns, scores = self._neighbours[item_id]
+            return list(zip(columns[:limit].tolist(), scores[:limit].tolist()))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "items": len(self._neighbours),
+                "bookmarks": int(self._totals.sum()),
+                "changed_rows": len(self._changed),
+                "dirty_rows": len(self._dirty),
+                "recomputed_rows": self.recomputed_rows,
+                "top_k": self.top_k,
+            }
+
+
+_lock = threading.Lock()
+_index: Optional[CoBookmarkIndex] = None
+_building = False
+# (user id, item id, added) bookmark changes made while a build runs, replayed onto its index
+_pending: List[Tuple[int, int, bool]] = []
+_loaded_at = 0.0
+_build_seconds = 0.0
+
+
+def _build(db: Session) -> CoBookmarkIndex:
+    pairs = np.array(db.query(Bookmark.user_id, Bookmark.item_id).all(), dtype=np.int64).reshape(-1, 2)
+    return CoBookmarkIndex.build(pairs, settings.RELATED_TOP_K, settings.RELATED_MIN_CO_BOOKMARKS)
+
+
+def _build_in_background() -> None:
+    global _index, _building, _loaded_at, _build_seconds
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        index = _build(db)
+        with _lock:
+            # add and remove are no-ops for bookmarks the build already saw
+            for user_id, item_id, added in _pending:
+                if added:
+                    index.add(user_id, item_id)
+                else:
+                    index.remove(user_id, item_id)
+            _index = index
+            _build_seconds = time.perf_counter() - started
+            _loaded_at = time.monotonic()
+    except Exception:
+        logger.exception("Building the related items index failed")
+    finally:
+        db.close()
+        with _lock:
+            _building = False
+            _pending.clear()
+
+
+def _get_index() -> Optional[CoBookmarkIndex]:
+    """
+    Get the index, building it in a background thread on first use and
+    returning None until it is ready.
+
+    Bookmarks made through this process update it in place. It is also
+    rebuilt in the background every RELATED_INDEX_REFRESH_SECONDS, the old
+    index serving lookups meanwhile, to pick up bookmarks made by other
+    workers and bookmarks deleted along with items or users.
+    """
+    global _building
+    index = _index
+    if index is not None and time.monotonic() - _loaded_at < settings.RELATED_INDEX_REFRESH_SECONDS:
+        return index
+    with _lock:
+        if not _building and (_index is None or time.monotonic() - _loaded_at >= settings.RELATED_INDEX_REFRESH_SECONDS):
+            _building = True
+            threading.Thread(target=_build_in_background, name="related-index-build", daemon=True).start()
+        return _index
+
+
+def related(db: Session, item_id: int, limit: int = 10) -> List[Tuple[int, float]]:
+    """Get the (item_id, score) pairs of the items most often bookmarked with an item."""
+    index = _get_index()
+    return index.related(item_id, limit) if index is not None else []
+
+
+def _record(user_id: int, item_id: int, added: bool) -> None:
+    with _lock:
+        if _building:
+            _pending.append((user_id, item_id, added))
+        index = _index
+    if index is not None:
+        if added:
+            index.add(user_id, item_id)
+        else:
+            index.remove(user_id, item_id)
+
+
+def add(user_id: int, item_id: int) -> None:
+    """Count a committed bookmark in the loaded index and in one being built."""
+    _record(user_id, item_id, True)
+
+
+def remove(user_id: int, item_id: int) -> None:
+    """Uncount a deleted bookmark in the loaded index and in one being built."""
+    _record(user_id, item_id, False)
+
+
+def reset() -> None:
+    """Discard the index so the next lookup rebuilds it."""
+    global _index
+    with _lock:
+        _index = None
+
+
+def stats() -> Dict[str, Any]:
+    index = _index
+    result = index.stats() if index is not None else {"items": 0}
+    result["loaded"] = index is not None
+    result["building"] = _building
+    result["build_seconds"] = _build_seconds
+    return result
+
+
+metrics.register("related_index", stats)
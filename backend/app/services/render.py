@@ -0,0 +1,69 @@
+from typing import Dict, Iterable, Optional, Set, Union
+
+from sqlalchemy.orm import Session
+
+from app.db.dialect import get_insert
+from app.models.item import Item
+from app.models.rendered_content import RenderedContent
+from app.utils.markdown import RenderedMarkdown, content_hash, render_markdown
+
+
+def get_by_hash(db: Session, key: str) -> Optional[RenderedContent]:
+    """Get rendered content by its content hash."""
+    return db.query(RenderedContent).filter(RenderedContent.content_hash == key).first()
+
+
+def store(db: Session, rendered: Dict[str, RenderedMarkdown]) -> None:
+    """Store rendered content by content hash, keeping rows that already exist."""
+    if not rendered:
+        return
+    insert = get_insert(db)
+    db.execute(
+        insert(RenderedContent)
+        .values([
+            {"content_hash": key, "html": result.html, "toc": result.toc}
+            for key, result in rendered.items()
+        ])
+        .on_conflict_do_nothing(index_elements=["content_hash"])
+    )
+
+
+def missing(db: Session, keys: Iterable[str]) -> Set[str]:
+    """Get the content hashes that have not been rendered yet."""
+    keys = set(keys)
+    if not keys:
+        return keys
+    existing = db.query(RenderedContent.content_hash).filter(RenderedContent.content_hash.in_(keys))
+    return keys - {key for key, in existing}
+
+
+def ensure_rendered(db: Session, content: str) -> str:
+    """
+    Render markdown unless identical content was rendered before.
+    Returns the content hash to store on the item; the caller commits.
+    """
+    key = content_hash(content)
+    if missing(db, [key]):
+        store(db, {key: render_markdown(content)})
+    return key
+
+
+def get_for_content(db: Session, content: str) -> Union[RenderedContent, RenderedMarkdown]:
+    """
+    Get the rendered form of markdown content. Content item_service stored
+    is rendered already; anything else (e.g. written before the 0006
+    migration, until scripts/render_content.py runs) is rendered on the
+    fly without storing it.
+    """
+    rendered = get_by_hash(db, content_hash(content))
+    return rendered if rendered is not None else render_markdown(content)
+
+
+def prune(db: Session) -> int:
+    """Delete rendered content no item refers to any more. Returns the number of rows deleted."""
+    used = db.query(Item.content_hash).filter(Item.content_hash.isnot(None))
+    deleted = db.query(RenderedContent).filter(
+        RenderedContent.content_hash.notin_(used)
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
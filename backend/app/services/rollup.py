@@ -0,0 +1,223 @@
+import datetime
+import enum
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.dialect import get_insert
+from app.models.bookmark import Bookmark
+from app.models.item import Item
+from app.models.notification import Notification
+from app.models.rollup import EngagementRollup, RollupWatermark
+from app.models.user import User
+
+
+class Metric(str, enum.Enum):
+    SIGNUPS = "signups"
+    ITEMS = "items"
+    BOOKMARKS = "bookmarks"
+    NOTIFICATIONS = "notifications"
+
+
+class Granularity(str, enum.Enum):
+    MINUTE = "minute"
+    HOUR = "hour"
+    DAY = "day"
+
+
+# Source table and optional breakdown column for each metric
+SOURCES = {
+    Metric.SIGNUPS: (User, None),
+    Metric.ITEMS: (Item, None),
+    Metric.BOOKMARKS: (Bookmark, None),
+    Metric.NOTIFICATIONS: (Notification, Notification.notification_type),
+}
+
+# Stored dimension of the all-rows total, and of rows whose breakdown value is NULL or empty
+TOTAL_DIMENSION = ""
+EMPTY_DIMENSION = "(none)"
+
+BUCKET_WIDTHS = {
+    Granularity.MINUTE: datetime.timedelta(minutes=1),
+    Granularity.HOUR: datetime.timedelta(hours=1),
+    Granularity.DAY: datetime.timedelta(days=1),
+}
+
+_SQLITE_FORMATS = {
+    Granularity.MINUTE: "%Y-%m-%d %H:%M:00",
+    Granularity.HOUR: "%Y-%m-%d %H:00:00",
+    Granularity.DAY: "%Y-%m-%d 00:00:00",
+}
+
+
+def truncate(dt: datetime.datetime, granularity: Granularity) -> datetime.datetime:
+    """Truncate a datetime to the start of its bucket."""
+    if granularity == Granularity.MINUTE:
+        return dt.replace(second=0, microsecond=0)
+    if granularity == Granularity.HOUR:
+        return dt.replace(minute=0, second=0, microsecond=0)
+    return dt.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _bucket_expression(db: Session, column, granularity: Granularity):
+    if db.get_bind().dialect.name == "sqlite":
+        return func.strftime(_SQLITE_FORMATS[granularity], column)
+    return func.date_trunc(granularity.value, column)
+
+
+def _as_datetime(value) -> datetime.datetime:
+    if isinstance(value, str):
+        return datetime.datetime.fromisoformat(value)
+    return value
+
+
+def _get_watermark(db: Session, metric: Metric) -> RollupWatermark:
+    watermark = db.query(RollupWatermark).filter(
+        RollupWatermark.metric == metric.value
+    ).with_for_update().first()
+    if not watermark:
+        watermark = RollupWatermark(metric=metric.value, last_id=0)
+        db.add(watermark)
+        db.flush()
+    return watermark
+
+
+def _aggregate(
+    db: Session, metric: Metric, lower_id: int, upper_id: int
+) -> List[Dict]:
+    """Count the rows in (lower_id, upper_id] per bucket for every granularity."""
+    model, dimension_column = SOURCES[metric]
+    now = datetime.datetime.utcnow()
+    values = []
+
+    for granularity in Granularity:
+        bucket = _bucket_expression(db, model.created_at, granularity)
+        columns = [bucket, func.count(model.id)]
+        if dimension_column is not None:
+            columns.append(dimension_column)
+
+        query = db.query(*columns).filter(
+            model.id > lower_id,
+            model.id <= upper_id,
+            model.created_at.isnot(None),
+        ).group_by(bucket)
+        if dimension_column is not None:
+            query = query.group_by(dimension_column)
+
+        # (bucket, dimension) -> count, None standing for the bucket's total
+        totals: Dict[Tuple[datetime.datetime, Optional[str]], int] = {}
+        for row in query:
+            bucket_start = _as_datetime(row[0])
+            totals[(bucket_start, None)] = totals.get((bucket_start, None), 0) + row[1]
+            if dimension_column is not None:
+                # NULL and "" are separate groups that share one stored dimension
+                key = (bucket_start, row[2] or EMPTY_DIMENSION)
+                totals[key] = totals.get(key, 0) + row[1]
+
+        values.extend(
+            {
+                "metric": metric.value,
+                "granularity": granularity.value,
+                "dimension": TOTAL_DIMENSION if dimension is None else dimension,
+                "bucket": bucket_start,
+                "total": total,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for (bucket_start, dimension), total in totals.items()
+        )
+    return values
+
+
+def _upsert(db: Session, values: List[Dict]) -> None:
+    if not values:
+        return
+    insert = get_insert(db)
+    stmt = insert(EngagementRollup).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            EngagementRollup.metric,
+            EngagementRollup.granularity,
+            EngagementRollup.dimension,
+            EngagementRollup.bucket,
+        ],
+        set_={
+            "total": EngagementRollup.total + stmt.excluded.total,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    db.execute(stmt)
+
+
+def run_metric(db: Session, metric: Metric, batch_size: Optional[int] = None) -> int:
+    """
+    Fold new rows of one source table into the rollup buckets.
+
+    Only rows above the metric's high-water mark are read, in batches of
+    batch_size rows, each batch committed together with the advanced
+    watermark. Rows younger than ROLLUP_SAFETY_LAG_SECONDS are left for the
+    next run so that slow transactions holding lower ids are not skipped.
+    Returns the number of id values consumed.
+    """
+    model, _ = SOURCES[metric]
+    batch_size = batch_size or settings.ROLLUP_BATCH_SIZE
+    cutoff = datetime.datetime.utcnow() - datetime.timedelta(
+        seconds=settings.ROLLUP_SAFETY_LAG_SECONDS
+    )
+    consumed = 0
+
+    while True:
+        watermark = _get_watermark(db, metric)
+        lower_id = watermark.last_id
+        window = db.query(model.id).filter(
+            model.id > lower_id,
+            model.created_at <= cutoff,
+        ).order_by(model.id).limit(batch_size).subquery()
+        upper_id = db.query(func.max(window.c.id)).scalar()
+        if upper_id is None:
+            db.commit()
+            return consumed
+
+        _upsert(db, _aggregate(db, metric, lower_id, upper_id))
+        watermark.last_id = upper_id
+        db.add(watermark)
+        db.commit()
+        consumed += upper_id - lower_id
+
+
+def run(db: Session) -> Dict[str, int]:
+    """Bring every metric's rollups up to date."""
+    return {metric.value: run_metric(db, metric) for metric in Metric}
+
+
+def get_series(
+    db: Session,
+    metric: Metric,
+    granularity: Granularity,
+    start: datetime.datetime,
+    end: datetime.datetime,
+    dimension: str = TOTAL_DIMENSION,
+) -> List[Tuple[datetime.datetime, int]]:
+    """Get the non-empty buckets of a metric in [start, end) from the rollups."""
+    return db.query(
+        EngagementRollup.bucket, EngagementRollup.total
+    ).filter(
+        EngagementRollup.metric == metric.value,
+        EngagementRollup.granularity == granularity.value,
+        EngagementRollup.dimension == dimension,
+        EngagementRollup.bucket >= truncate(start, granularity),
+        EngagementRollup.bucket < end,
+    ).order_by(EngagementRollup.bucket).all()
+
+
+def get_dimensions(db: Session, metric: Metric) -> List[str]:
+    """Get the breakdown values recorded for a metric."""
+    return [
+        dimension for (dimension,) in db.query(EngagementRollup.dimension).filter(
+            EngagementRollup.metric == metric.value,
+            EngagementRollup.granularity == Granularity.DAY.value,
+            EngagementRollup.dimension != TOTAL_DIMENSION,
+        ).distinct().order_by(EngagementRollup.dimension)
+    ]
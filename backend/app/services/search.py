@@ -0,0 +1,153 @@
+import html
+import re
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+SNIPPET_START = "<mark>"
+SNIPPET_STOP = "</mark>"
+# Private-use characters the database highlights with; item text never contains them
+_SENTINEL_START = "\ue000"
+_SENTINEL_STOP = "\ue001"
+_HEADLINE_OPTIONS = f"StartSel={_SENTINEL_START}, StopSel={_SENTINEL_STOP}, MaxFragments=2, MaxWords=20, MinWords=5"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class SearchHit(NamedTuple):
+    item_id: int
+    rank: float
+    snippet: Optional[str]
+
+
+def _highlight(snippet: Optional[str]) -> Optional[str]:
+    """Escape raw item text in a snippet and turn the sentinels into <mark> tags."""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(_SENTINEL_START, SNIPPET_START).replace(_SENTINEL_STOP, SNIPPET_STOP)
+
+
+def _filters(
+    params: Dict[str, Any],
+    category_id: Optional[int],
+    is_featured: Optional[bool],
+    difficulty: Optional[str],
+) -> str:
+    clauses = []
+    if category_id:
+        clauses.append("item.category_id = :category_id")
+        params["category_id"] = category_id
+    if is_featured is not None:
+        clauses.append("item.is_featured = :is_featured")
+        params["is_featured"] = is_featured
+    if difficulty:
+        clauses.append("item.difficulty = :difficulty")
+        params["difficulty"] = difficulty
+    return "".join(f" AND {clause}" for clause in clauses)
+
+
+def _fts5_query(search: str) -> Optional[str]:
+    """Turn free text into an FTS5 query: every word must match, the last as a prefix."""
+    tokens = _TOKEN_RE.findall(search)
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def _tsquery(search: str) -> Optional[str]:
+    """Turn free text into a to_tsquery query meaning the same as _fts5_query."""
+    tokens = _TOKEN_RE.findall(search)
+    if not tokens:
+        return None
+    terms = [f"'{token}'" for token in tokens]
+    terms[-1] += ":*"
+    return " & ".join(terms)
+
+
+def _search_postgresql(db: Session, search: str, skip: int, limit: int, **filters) -> List[SearchHit]:
+    query = _tsquery(search)
+    if not query:
+        return []
+    params: Dict[str, Any] = {"query": query, "skip": skip, "limit": limit, "options": _HEADLINE_OPTIONS}
+    where = _filters(params, **filters)
+    # Rank and page on the GIN index first, then build headlines for the page only
+    stmt = text(f"""
+        WITH q AS (SELECT to_tsquery('english', :query) AS query),
+        ranked AS (
+            SELECT item.id, ts_rank_cd(item.search_vector, q.query) AS rank
+            FROM item, q
+            WHERE item.search_vector @@ q.query{where}
+            ORDER BY rank DESC, item.id
+            LIMIT :limit OFFSET :skip
+        )
+        SELECT ranked.id, ranked.rank,
+            ts_headline(
+                'english',
+                coalesce(item.description, '') || ' ' || item.content,
+                q.query,
+                :options
+            ) AS snippet
+        FROM ranked JOIN item ON item.id = ranked.id, q
+        ORDER BY ranked.rank DESC, ranked.id
+    """)
+    return [SearchHit(item_id, rank, _highlight(snippet)) for item_id, rank, snippet in db.execute(stmt, params)]
+
+
+def _search_sqlite(db: Session, search: str, skip: int, limit: int, **filters) -> List[SearchHit]:
+    query = _fts5_query(search)
+    if not query:
+        return []
+    params: Dict[str, Any] = {"query": query, "skip": skip, "limit": limit}
+    where = _filters(params, **filters)
+    # bm25() is lower-is-better; weight name over description over content.
+    # Only join the item table when a filter needs it.
+    source = "item_fts JOIN item ON item.id = item_fts.rowid" if where else "item_fts"
+    ranked = db.execute(text(f"""
+        SELECT item_fts.rowid, -bm25(item_fts, 10.0, 4.0, 1.0) AS rank
+        FROM {source}
+        WHERE item_fts MATCH :query{where}
+        ORDER BY rank DESC, item_fts.rowid
+        LIMIT :limit OFFSET :skip
+    """), params).all()
+    if not ranked:
+        return []
+    
+    # Build snippets for the page only
+    ids = [row[0] for row in ranked]
+    snippets = dict(db.execute(
+        text("""
+            SELECT rowid, snippet(item_fts, -1, :start, :stop, '…', 20)
+            FROM item_fts
+            WHERE item_fts MATCH :query AND rowid IN :ids
+        """).bindparams(bindparam("ids", expanding=True)),
+        {"query": query, "ids": ids, "start": _SENTINEL_START, "stop": _SENTINEL_STOP},
+    ).all())
+    return [SearchHit(item_id, rank, _highlight(snippets.get(item_id))) for item_id, rank in ranked]
+
+
+def search_items(
+    db: Session,
+    search: str,
+    skip: int = 0,
+    limit: int = 100,
+    category_id: Optional[int] = None,
+    is_featured: Optional[bool] = None,
+    difficulty: Optional[str] = None,
+) -> List[SearchHit]:
+    """
+    Full-text search over item name, description and content.
+
+    Returns one page of hits ordered by relevance, each with an HTML-escaped
+    snippet whose matches are wrapped in <mark>. Uses the tsvector/GIN index on PostgreSQL and FTS5 on SQLite.
+    """
+    filters = {
+        "category_id": category_id,
+        "is_featured": is_featured,
+        "difficulty": difficulty,
+    }
+    if db.get_bind().dialect.name == "sqlite":
+        return _search_sqlite(db, search, skip, limit, **filters)
+    return _search_postgresql(db, search, skip, limit, **filters)
@@ -0,0 +1,427 @@
+"""
+Content similarity of items over TF-IDF vectors of their text.
+
+The index is built by scripts/build_similar_index.py and saved as .npy
+files under SIMILAR_INDEX_DIR that every worker maps into memory
+read-only, so they share one copy in the page cache instead of each
+building its own. Workers that find no saved index wait in a background
+thread on a lock file there, returning no matches meanwhile: the first
+to get it builds and saves the index, and the others map that version.
+Items written through a worker are re-vectorized into that worker's
+overlay, which takes precedence over the saved rows until the next build.
+"""
+
+import json
+import logging
+import math
+import os
+import re
+import shutil
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.item import Item
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not on Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# A relative SIMILAR_INDEX_DIR is taken from here rather than the working directory
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]{2,}")
+STOP_WORDS = frozenset("""
+    a an and are as at be but by can do for from has have how if in into is it its
+    may more most not of on or so such than that the their them then there these
+    they this to was we what when which who will with you your
+""".split())
+
+CURRENT = "CURRENT"
+BUILD_LOCK = "build.lock"
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens, dropping stop words and markdown syntax."""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+def document(name: Optional[str], description: Optional[str], content: Optional[str]) -> str:
+    """Get the text of an item that is vectorized."""
+    return "\n".join(part for part in (name, description, content) if part)
+
+
+class TfidfIndex:
+    """
+    L2-normalized TF-IDF rows (sublinear tf, smoothed idf) of items, in
+    item id order, with the vocabulary and idf needed to vectorize
+    new documents and free-text queries the same way.
+    """
+
+    def __init__(
+        self,
+        vocabulary: Dict[str, int],
+        idf: np.ndarray,
+        matrix: sparse.csr_matrix,
+        item_ids: np.ndarray,
+        built_at: float,
+        version: Optional[str] = None,
+    ) -> None:
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.matrix = matrix
+        self.item_ids = item_ids
+        self.built_at = built_at
+        self.version = version
+        self._lock = threading.Lock()
+        # item id -> (time of the write, text, row), text and row None if deleted
+        self._overlay: Dict[int, Tuple[float, Optional[str], Optional[sparse.csr_matrix]]] = {}
+
+    @classmethod
+    def build(cls, documents: Iterable[Tuple[int, str]], max_features: int, min_df: int = 1) -> "TfidfIndex":
+        """Build an index from (item_id, text) pairs."""
+        built_at = time.time()
+        item_ids: List[int] = []
+        tokens: List[List[str]] = []
+        df: Counter = Counter()
+        for item_id, text in documents:
+            doc_tokens = tokenize(text)
+            item_ids.append(item_id)
+            tokens.append(doc_tokens)
+            df.update(set(doc_tokens))
+
+        # The max_features most common terms, in alphabetical order
+        terms = sorted(sorted(
+            (term for term, count in df.items() if count >= min_df),
+            key=lambda term: (-df[term], term),
+        )[:max_features])
+        vocabulary = {term: i for i, term in enumerate(terms)}
+        n_docs = len(item_ids)
+        idf = np.array([math.log((1 + n_docs) / (1 + df[term])) + 1 for term in terms], dtype=np.float32)
+
+        rows: List[int] = []
+        columns: List[int] = []
+        for row, doc_tokens in enumerate(tokens):
+            ids = [vocabulary[token] for token in doc_tokens if token in vocabulary]
+            rows.extend([row] * len(ids))
+            columns.extend(ids)
+        order = np.argsort(item_ids, kind="stable")
+        counts = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (np.array(rows, dtype=np.int64), np.array(columns, dtype=np.int64))),
+            shape=(n_docs, len(vocabulary)),
+        )[order]
+        return cls(vocabulary, idf, _weigh(counts, idf), np.array(item_ids, dtype=np.int64)[order], built_at)
+
+    def save(self, directory: str) -> None:
+        """Save the index as a new version under directory and make it current."""
+        self.version = f"{self.built_at:.6f}-{os.getpid()}"
+        version = os.path.join(directory, self.version)
+        os.makedirs(version)
+        np.save(os.path.join(version, "data.npy"), self.matrix.data.astype(np.float32))
+        # scipy uses int32 indices when they fit; matching that lets it map them without a copy
+        index_dtype = np.int32 if self.matrix.nnz < 2 ** 31 else np.int64
+        np.save(os.path.join(version, "indices.npy"), self.matrix.indices.astype(index_dtype))
+        np.save(os.path.join(version, "indptr.npy"), self.matrix.indptr.astype(index_dtype))
+        np.save(os.path.join(version, "item_ids.npy"), self.item_ids)
+        np.save(os.path.join(version, "idf.npy"), self.idf)
+        with open(os.path.join(version, "vocabulary.json"), "w") as f:
+            json.dump({"built_at": self.built_at, "terms": sorted(self.vocabulary, key=self.vocabulary.get)}, f)
+
+        # Workers that have an older version mapped keep reading it until they reload
+        pointer = os.path.join(directory, f"{CURRENT}.{os.getpid()}")
+        with open(pointer, "w") as f:
+            f.write(self.version)
+        os.replace(pointer, os.path.join(directory, CURRENT))
+
+        # Keep the previous version for workers that have not reloaded yet
+        versions = sorted(
+            (name for name in os.listdir(directory) if os.path.isdir(os.path.join(directory, name))),
+            key=lambda name: float(name.split("-")[0]),
+        )
+        for name in versions[:-2]:
+            shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+    @classmethod
+    def load(cls, directory: str, name: str) -> Optional["TfidfIndex"]:
+        """Map a saved version into memory, or return None if it is gone."""
+        version = os.path.join(directory, name)
+        try:
+            with open(os.path.join(version, "vocabulary.json")) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        def array(name: str) -> np.ndarray:
+            return np.load(os.path.join(version, f"{name}.npy"), mmap_mode="r")
+
+        vocabulary = {term: i for i, term in enumerate(meta["terms"])}
+        item_ids = array("item_ids")
+        matrix = sparse.csr_matrix(
+            (array("data"), array("indices"), array("indptr")),
+            shape=(len(item_ids), len(vocabulary)),
+            copy=False,
+        )
+        return cls(vocabulary, array("idf"), matrix, item_ids, meta["built_at"], name)
+
+    def vectorize(self, text: str) -> sparse.csr_matrix:
+        """Get the 1 x V TF-IDF row of a text; words outside the vocabulary are ignored."""
+        counts = Counter(self.vocabulary[token] for token in tokenize(text) if token in self.vocabulary)
+        columns = np.array(sorted(counts), dtype=np.int32)
+        row = sparse.csr_matrix(
+            (np.array([counts[column] for column in columns], dtype=np.float32), columns, [0, len(columns)]),
+            shape=(1, len(self.vocabulary)),
+        )
+        return _weigh(row, self.idf)
+
+    def set(self, item_id: int, text: str, written_at: Optional[float] = None) -> None:
+        """Re-vectorize one item after a write."""
+        row = self.vectorize(text)
+        with self._lock:
+            self._overlay[item_id] = (written_at or time.time(), text, row)
+
+    def remove(self, item_id: int, written_at: Optional[float] = None) -> None:
+        """Drop an item after it is deleted."""
+        with self._lock:
+            self._overlay[item_id] = (written_at or time.time(), None, None)
+
+    def adopt(self, previous: "TfidfIndex") -> None:
+        """Re-apply the writes to a previous index made after this one was built."""
+        with previous._lock:
+            writes = [(item_id, entry) for item_id, entry in previous._overlay.items() if entry[0] > self.built_at]
+        for item_id, (written_at, text, _) in writes:
+            if text is None:
+                self.remove(item_id, written_at)
+            else:
+                self.set(item_id, text, written_at)
+
+    def vector(self, item_id: int) -> Optional[sparse.csr_matrix]:
+        """Get the current row of an item, or None if it is not indexed."""
+        with self._lock:
+            if item_id in self._overlay:
+                return self._overlay[item_id][2]
+        i = int(np.searchsorted(self.item_ids, item_id))
+        if i < len(self.item_ids) and self.item_ids[i] == item_id:
+            return self.matrix[i]
+        return None
+
+    def nearest(self, vector: sparse.csr_matrix, limit: int, exclude: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Get the limit items with the highest cosine similarity to a row, best first."""
+        if not vector.nnz:
+            return []
+        with self._lock:
+            overlay = dict(self._overlay)
+        query = vector.toarray().ravel()
+        scores = self.matrix @ query
+        ids = self.item_ids
+        if overlay:
+            # Saved rows of rewritten or deleted items no longer count
+            stale = np.isin(ids, np.fromiter(overlay, dtype=np.int64))
+            scores = np.where(stale, 0.0, scores)
+            extra = [(item_id, row) for item_id, (_, _, row) in overlay.items() if row is not None and row.nnz]
+            if extra:
+                extra_scores = sparse.vstack([row for _, row in extra]) @ query
+                ids = np.concatenate([ids, np.array([item_id for item_id, _ in extra], dtype=np.int64)])
+                scores = np.concatenate([scores, extra_scores])
+        if exclude is not None:
+            scores = np.where(ids == exclude, 0.0, scores)
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        order = candidates[np.lexsort((ids[candidates], -scores[candidates]))]
+        return [(int(ids[i]), float(scores[i])) for i in order]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            overlay = len(self._overlay)
+        return {
+            "documents": len(self.item_ids),
+            "terms": len(self.vocabulary),
+            "nnz": int(self.matrix.nnz),
+            "overlay": overlay,
+            "built_at": self.built_at,
+        }
+
+
+def _weigh(counts: sparse.csr_matrix, idf: np.ndarray) -> sparse.csr_matrix:
+    """Turn term counts into L2-normalized sublinear TF-IDF weights."""
+    weights = counts.tocsr().astype(np.float32)
+    weights.data = (1 + np.log(weights.data)) * idf[weights.indices]
+    norms = np.sqrt(np.asarray(weights.multiply(weights).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.csr_matrix(sparse.diags(1 / norms) @ weights, dtype=np.float32)
+
+
+def iter_documents(db: Session, batch_size: int = 1000) -> Iterable[Tuple[int, str]]:
+    """Stream (item_id, text) of every item."""
+    query = db.query(Item.id, Item.name, Item.description, Item.content).execution_options(yield_per=batch_size)
+    for item_id, name, description, content in query:
+        yield item_id, document(name, description, content)
+
+
+def index_dir() -> str:
+    """Get the absolute directory the index is saved under."""
+    return os.path.join(BACKEND_DIR, settings.SIMILAR_INDEX_DIR)
+
+
+@contextmanager
+def build_lock(directory: str) -> Iterator[None]:
+    """Hold the lock that lets one process at a time build into directory."""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, BUILD_LOCK), "w") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+
+def build(db: Session) -> TfidfIndex:
+    """Build the index from the database and save it for every worker."""
+    index = TfidfIndex.build(iter_documents(db), settings.SIMILAR_MAX_FEATURES, settings.SIMILAR_MIN_DF)
+    os.makedirs(index_dir(), exist_ok=True)
+    index.save(index_dir())
+    return index
+
+
+_lock = threading.Lock()
+_index: Optional[TfidfIndex] = None
+_building = False
+_checked_at = 0.0
+_lookups = 0
+_lookup_seconds = 0.0
+
+
+def current_version(directory: str) -> Optional[str]:
+    """Get the name of the current saved version under directory, if any."""
+    try:
+        with open(os.path.join(directory, CURRENT)) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def _build_in_background() -> None:
+    global _index, _building
+    index = None
+    try:
+        with build_lock(index_dir()):
+            # Another process may have built it while this one waited
+            version = current_version(index_dir())
+            index = TfidfIndex.load(index_dir(), version) if version else None
+            if index is None:
+                db = SessionLocal()
+                try:
+                    index = build(db)
+                finally:
+                    db.close()
+    except Exception:
+        logger.exception("Building the similar items index failed")
+    with _lock:
+        # A version another worker saved meanwhile may have been mapped already
+        if index is not None and _index is None:
+            _index = index
+        _building = False
+
+
+def _get_index() -> Optional[TfidfIndex]:
+    """
+    Get the index, mapping the saved one on first use. Every
+    SIMILAR_RELOAD_SECONDS the saved index is checked, and a newer build
+    replaces this worker's copy. Returns None while there is no saved
+    index yet, after starting a build in the background, or waiting for
+    another process's build.
+    """
+    global _index, _building, _checked_at
+    index = _index
+    if index is not None and time.monotonic() - _checked_at < settings.SIMILAR_RELOAD_SECONDS:
+        return index
+    with _lock:
+        if _index is None or time.monotonic() - _checked_at >= settings.SIMILAR_RELOAD_SECONDS:
+            version = current_version(index_dir())
+            if _index is None or (version and version != _index.version):
+                loaded = TfidfIndex.load(index_dir(), version) if version else None
+                if loaded is not None:
+                    if _index is not None:
+                        loaded.adopt(_index)
+                    _index = loaded
+                elif _index is None and not _building:
+                    _building = True
+                    threading.Thread(target=_build_in_background, name="similar-index-build", daemon=True).start()
+            _checked_at = time.monotonic()
+        return _index
+
+
+def similar_to_item(db: Session, item_id: int, limit: int = 10) -> List[Tuple[int, float]]:
+    """Get the (item_id, score) pairs of the items whose text is most like an item's."""
+    global _lookups, _lookup_seconds
+    index = _get_index()
+    if index is None:
+        return []
+    started = time.perf_counter()
+    vector = index.vector(item_id)
+    if vector is None:
+        # Created since the build, by another worker
+        item = db.query(Item.name, Item.description, Item.content).filter(Item.id == item_id).first()
+        if item is None:
+            return []
+        vector = index.vectorize(document(*item))
+    results = index.nearest(vector, limit, exclude=item_id)
+    _lookups += 1
+    _lookup_seconds += time.perf_counter() - started
+    return results
+
+
+def similar_to_text(db: Session, text: str, limit: int = 10) -> List[Tuple[int, float]]:
+    """Get the (item_id, score) pairs of the items whose text is most like a free-text query."""
+    global _lookups, _lookup_seconds
+    index = _get_index()
+    if index is None:
+        return []
+    started = time.perf_counter()
+    results = index.nearest(index.vectorize(text), limit)
+    _lookups += 1
+    _lookup_seconds += time.perf_counter() - started
+    return results
+
+
+def update(item_id: int, name: Optional[str], description: Optional[str], content: Optional[str]) -> None:
+    """Re-vectorize a new or changed item if the index is loaded."""
+    if _index is not None:
+        _index.set(item_id, document(name, description, content))
+
+
+def update_many(items: Sequence[Tuple[int, Optional[str], Optional[str], Optional[str]]]) -> None:
+    """Vectorize (item_id, name, description, content) of several new items if the index is loaded."""
+    if _index is not None:
+        for item_id, name, description, content in items:
+            _index.set(item_id, document(name, description, content))
+
+
+def remove(item_id: int) -> None:
+    """Drop a deleted item if the index is loaded."""
+    if _index is not None:
+        _index.remove(item_id)
+
+
+def stats() -> Dict[str, Any]:
+    index = _index
+    result = index.stats() if index is not None else {"documents": 0}
+    result["loaded"] = index is not None
+    result["building"] = _building
+    result["lookups"] = _lookups
+    result["avg_lookup_milliseconds"] = _lookup_seconds / _lookups * 1e3 if _lookups else 0.0
+    return result
+
+
+metrics.register("similar_index", stats)
@@ -0,0 +1,96 @@
+from typing import Any, Dict, List
+
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.cache import SWRCache
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.item import Item
+from app.models.user import UserRole
+from app.services import counter as counter_service
+
+
+def get_user_statistics(counters: Dict[str, int]) -> Dict[str, int]:
+    """Build user figures from the role and active counters."""
+    admin_count = counters.get(counter_service.role_key(UserRole.ADMIN), 0)
+    member_count = counters.get(counter_service.role_key(UserRole.MEMBER), 0)
+    return {
+        "total_users": admin_count + member_count,
+        "total_active_users": counters.get(counter_service.USERS_ACTIVE, 0),
+        "admin_count": admin_count,
+        "member_count": member_count,
+    }
+
+
+def get_content_statistics(counters: Dict[str, int]) -> Dict[str, int]:
+    """Build category and item figures from the content counters."""
+    total_items = sum(
+        value for key, value in counters.items()
+        if key.startswith(counter_service.CATEGORY_PREFIX)
+    )
+    return {
+        "total_categories": counters.get(counter_service.CATEGORIES_TOTAL, 0),
+        "total_items": total_items,
+        "featured_items": counters.get(counter_service.ITEMS_FEATURED, 0),
+    }
+
+
+def get_engagement_statistics(counters: Dict[str, int]) -> Dict[str, int]:
+    """Build bookmark and notification figures from the engagement counters."""
+    return {
+        "total_bookmarks": counters.get(counter_service.BOOKMARKS_TOTAL, 0),
+        "total_notifications": counters.get(counter_service.NOTIFICATIONS_TOTAL, 0),
+        "unread_notifications": counters.get(counter_service.NOTIFICATIONS_UNREAD, 0),
+    }
+
+
+def get_top_bookmarked_items(db: Session, limit: int = 5) -> List[Dict[str, Any]]:
+    """Get the most bookmarked items using the indexed bookmark_count column."""
+    rows = db.query(
+        Item.id, Item.name, Item.bookmark_count
+    ).filter(
+        Item.bookmark_count > 0
+    ).order_by(
+        Item.bookmark_count.desc(), Item.id
+    ).limit(limit).all()
+
+    return [
+        {"id": item_id, "name": name, "bookmark_count": count}
+        for item_id, name, count in rows
+    ]
+
+
+def get_statistics(db: Session) -> Dict[str, Any]:
+    """Build the full statistics payload from the counter tables."""
+    counters = counter_service.get_all(db)
+    return {
+        "user_statistics": get_user_statistics(counters),
+        "content_statistics": get_content_statistics(counters),
+        "engagement_statistics": get_engagement_statistics(counters),
+        "top_bookmarked_items": get_top_bookmarked_items(db),
+    }
+
+
+def _load_statistics() -> Dict[str, Any]:
+    db = SessionLocal()
+    try:
+        return get_statistics(db)
+    finally:
+        db.close()
+
+
+# Per-process cache. Writes in this process invalidate it right away; writes
+# made by other workers show up within STATISTICS_CACHE_TTL_SECONDS.
+_cache = SWRCache(_load_statistics, ttl=settings.STATISTICS_CACHE_TTL_SECONDS)
+metrics.register("statistics_cache", _cache.stats)
+
+
+def get_cached_statistics() -> Dict[str, Any]:
+    """Get the statistics payload from the cache."""
+    return _cache.get()
+
+
+def invalidate_cache() -> None:
+    """Mark the cached statistics as stale after a write."""
+    _cache.invalidate()
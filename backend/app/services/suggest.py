@@ -0,0 +1,228 @@
+import bisect
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.models.category import Category
+from app.models.item import Item
+
+ITEM = "item"
+CATEGORY = "category"
+
+# Approximate per-entry overhead: the (key, id) tuple plus its list slot
+_ENTRY_OVERHEAD = sys.getsizeof(("", 0)) + 8
+
+
+def normalize(text: str) -> str:
+    """Normalize text for prefix matching."""
+    return " ".join(text.casefold().split())
+
+
+class PrefixIndex:
+    """
+    In-memory prefix index over names, kept as sorted lists searched with bisect.
+
+    Every name is indexed under its full normalized form and under each
+    word-start suffix, so "Bitcoin Wallet" matches both "bit" and "wal".
+    Once max_entries is reached, new names only get their full-name key,
+    and names are dropped entirely when even that does not fit.
+
+    Keys are bucketed by kind, by full name or suffix, and by the length of
+    the normalized name, each bucket a sorted list. A lookup walks the
+    buckets in rank order, so it finds the best matches exactly while only
+    reading as many entries as it returns.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._lock = threading.RLock()
+        # (kind, is suffix) -> name length -> sorted [(key, id)]
+        self._buckets: Dict[Tuple[str, bool], Dict[int, List[Tuple[str, int]]]] = {}
+        self._names: Dict[Tuple[str, int], str] = {}
+        self._keys: Dict[Tuple[str, int], List[str]] = {}
+        self._entries = 0
+        self._bytes = 0
+        self.dropped = 0
+
+    @staticmethod
+    def _keys_for(name: str) -> List[str]:
+        normalized = normalize(name)
+        words = normalized.split(" ")
+        return [" ".join(words[i:]) for i in range(len(words))] if normalized else []
+
+    def add(self, kind: str, doc_id: int, name: str) -> None:
+        """Index a name, replacing any previous name for the same document."""
+        with self._lock:
+            self.remove(kind, doc_id)
+            keys = self._keys_for(name)
+            room = self.max_entries - self._entries
+            if room <= 0 or not keys:
+                self.dropped += 1
+                return
+            keys = keys[:room]
+            length = len(keys[0])
+            for i, key in enumerate(keys):
+                bucket = self._buckets.setdefault((kind, i > 0), {}).setdefault(length, [])
+                bisect.insort(bucket, (key, doc_id))
+                self._bytes += sys.getsizeof(key) + _ENTRY_OVERHEAD
+            self._entries += len(keys)
+            self._names[(kind, doc_id)] = name
+            self._keys[(kind, doc_id)] = keys
+
+    def remove(self, kind: str, doc_id: int) -> None:
+        """Remove a document from the index."""
+        with self._lock:
+            keys = self._keys.pop((kind, doc_id), None)
+            if keys is None:
+                return
+            del self._names[(kind, doc_id)]
+            length = len(keys[0])
+            for i, key in enumerate(keys):
+                buckets = self._buckets[(kind, i > 0)]
+                bucket = buckets[length]
+                j = bisect.bisect_left(bucket, (key, doc_id))
+                if j < len(bucket) and bucket[j] == (key, doc_id):
+                    del bucket[j]
+                    self._entries -= 1
+                    self._bytes -= sys.getsizeof(key) + _ENTRY_OVERHEAD
+                if not bucket:
+                    del buckets[length]
+
+    def lookup(self, prefix: str, limit: int = 10, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get up to limit completions for a prefix.
+
+        Names that start with the prefix come before names that only have a
+        later word starting with it; shorter names win ties, then the
+        matching text in alphabetical order.
+        """
+        prefix = normalize(prefix)
+        if not prefix or limit <= 0:
+            return []
+        results: List[Dict[str, Any]] = []
+        seen = set()
+        with self._lock:
+            kinds = sorted({k for k, _ in self._buckets if not kind or k == kind})
+            for suffix in (False, True):
+                groups = [(k, self._buckets.get((k, suffix), {})) for k in kinds]
+                lengths = sorted({length for _, buckets in groups for length in buckets if length >= len(prefix)})
+                for length in lengths:
+                    # Only the first few matches of each bucket can make the cut
+                    wanted = limit - len(results)
+                    matches = []
+                    for k, buckets in groups:
+                        bucket = buckets.get(length, [])
+                        taken = set()
+                        i = bisect.bisect_left(bucket, (prefix,))
+                        while i < len(bucket) and len(taken) < wanted:
+                            key, doc_id = bucket[i]
+                            if not key.startswith(prefix):
+                                break
+                            i += 1
+                            doc = (k, doc_id)
+                            if doc not in seen and doc not in taken:
+                                taken.add(doc)
+                                matches.append((key, k, doc_id))
+                    matches.sort()
+                    for _, k, doc_id in matches:
+                        if (k, doc_id) in seen:
+                            continue
+                        seen.add((k, doc_id))
+                        results.append({"kind": k, "id": doc_id, "name": self._names[(k, doc_id)]})
+                        if len(results) == limit:
+                            return results
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lists = [bucket for buckets in self._buckets.values() for bucket in buckets.values()]
+            return {
+                "entries": self._entries,
+                "documents": len(self._names),
+                "max_entries": self.max_entries,
+                "dropped": self.dropped,
+                "buckets": len(lists),
+                "approx_bytes": self._bytes + sum(sys.getsizeof(bucket) for bucket in lists),
+            }
+
+
+_lock = threading.Lock()
+_index: Optional[PrefixIndex] = None
+_loaded_at = 0.0
+_lookups = 0
+_lookup_seconds = 0.0
+
+
+def _build(db: Session) -> PrefixIndex:
+    index = PrefixIndex(settings.SUGGEST_MAX_ENTRIES)
+    for category_id, name in db.query(Category.id, Category.name):
+        index.add(CATEGORY, category_id, name)
+    for item_id, name in db.query(Item.id, Item.name):
+        index.add(ITEM, item_id, name)
+    return index
+
+
+def _get_index(db: Session) -> PrefixIndex:
+    """
+    Get the index, loading it on first use.
+
+    Writes made through this process update the index in place. It is also
+    rebuilt every SUGGEST_INDEX_REFRESH_SECONDS to pick up writes made by
+    other workers.
+    """
+    global _index, _loaded_at
+    index = _index
+    if index is not None and time.monotonic() - _loaded_at < settings.SUGGEST_INDEX_REFRESH_SECONDS:
+        return index
+    with _lock:
+        if _index is None or time.monotonic() - _loaded_at >= settings.SUGGEST_INDEX_REFRESH_SECONDS:
+            _index = _build(db)
+            _loaded_at = time.monotonic()
+        return _index
+
+
+def suggest(db: Session, prefix: str, limit: int = 10, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Get the top completions for a prefix over item and category names."""
+    global _lookups, _lookup_seconds
+    index = _get_index(db)
+    started = time.perf_counter()
+    results = index.lookup(prefix, limit=limit, kind=kind)
+    _lookups += 1
+    _lookup_seconds += time.perf_counter() - started
+    return results
+
+
+def add(kind: str, doc_id: int, name: str) -> None:
+    """Index a new or renamed item or category if the index is loaded."""
+    if _index is not None:
+        _index.add(kind, doc_id, name)
+
+
+def remove(kind: str, doc_id: int) -> None:
+    """Drop an item or category from the index if it is loaded."""
+    if _index is not None:
+        _index.remove(kind, doc_id)
+
+
+def reset() -> None:
+    """Discard the index so the next lookup rebuilds it."""
+    global _index
+    with _lock:
+        _index = None
+
+
+def stats() -> Dict[str, Any]:
+    index = _index
+    result = index.stats() if index is not None else {"entries": 0, "documents": 0}
+    result["loaded"] = index is not None
+    result["lookups"] = _lookups
+    result["avg_lookup_microseconds"] = _lookup_seconds / _lookups * 1e6 if _lookups else 0.0
+    return result
+
+
+metrics.register("suggest_index", stats)
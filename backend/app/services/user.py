@@ -1,9 +1,21 @@
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Sequence
+from sqlalchemy import case, func
 from sqlalchemy.orm import Session
 
-from app.core.security import get_password_hash, verify_password
+from app.core.hashing import check_and_update_password, hash_password
+from app.db.loader import get_loader, ordered
+from app.models.bookmark import Bookmark
+from app.models.notification import Notification
 from app.models.user import User, UserRole
 from app.schemas.user import UserCreate, UserUpdate
+from app.services import counter as counter_service
+from app.services import pagination
+from app.services import principal_cache
+from app.services import refresh_token as refresh_token_service
+from app.services import statistics as statistics_service
+
+# Sort key of user lists, used for cursor pagination
+ORDER_BY = (User.id,)
 
 
 def get_by_email(db: Session, email: str) -> Optional[User]:
@@ -12,26 +24,41 @@ def get_by_email(db: Session, email: str) -> Optional[User]:
 
 
 def get_by_id(db: Session, user_id: int) -> Optional[User]:
-    """Get a user by ID."""
-    return db.query(User).filter(User.id == user_id).first()
+    """Get a user by ID, memoized for the rest of the request."""
+    return get_loader(db, User).load(user_id)
+
+
+def get_by_ids(db: Session, user_ids: Sequence[int]) -> List[User]:
+    """Get the users with the given IDs in one query, in that order, skipping missing ones."""
+    return ordered(get_loader(db, User).load_many(user_ids), user_ids)
 
 
-def get_all(db: Session, skip: int = 0, limit: int = 100) -> List[User]:
-    """Get all users with pagination."""
-    return db.query(User).offset(skip).limit(limit).all()
+def get_all(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[User]:
+    """Get all users with offset or cursor pagination."""
+    query = pagination.keyset(db.query(User), ORDER_BY, cursor)
+    if not cursor:
+        query = query.offset(skip)
+    return query.limit(limit).all()
 
 
-def create(db: Session, obj_in: UserCreate) -> User:
-    """Create a new user."""
+def create(db: Session, obj_in: UserCreate, hashed_password: Optional[str] = None) -> User:
+    """
+    Create a new user.
+    Pass hashed_password when the password was already hashed, e.g. with
+    hashing.hash_password_async, to skip hashing it again here.
+    """
     db_obj = User(
         email=obj_in.email,
-        hashed_password=get_password_hash(obj_in.password),
+        hashed_password=hashed_password or hash_password(obj_in.password),
         full_name=obj_in.full_name,
         role=obj_in.role,
         is_active=True,
     )
     db.add(db_obj)
+    counter_service.increment(db, counter_service.role_key(db_obj.role), 1)
+    counter_service.increment(db, counter_service.USERS_ACTIVE, 1)
     db.commit()
+    statistics_service.invalidate_cache()
     db.refresh(db_obj)
     return db_obj
 
@@ -41,35 +68,83 @@ def update(db: Session, db_obj: User, obj_in: UserUpdate) -> User:
     update_data = obj_in.model_dump(exclude_unset=True)
     
     if "password" in update_data and update_data["password"]:
-        update_data["hashed_password"] = get_password_hash(update_data["password"])
+        update_data["hashed_password"] = hash_password(update_data["password"])
         del update_data["password"]
     
+    old_role, old_active = db_obj.role, bool(db_obj.is_active)
+    
     for key, value in update_data.items():
         setattr(db_obj, key, value)
     
     db.add(db_obj)
+    # Cached principals carry the profile too, so any change drops them
+    principal_cache.invalidate_user(db, db_obj.id)
+    if "hashed_password" in update_data:
+        # A new password logs out every other device
+        refresh_token_service.revoke_user(db, db_obj.id)
+    if db_obj.role != old_role:
+        counter_service.increment(db, counter_service.role_key(old_role), -1)
+        counter_service.increment(db, counter_service.role_key(db_obj.role), 1)
+    if bool(db_obj.is_active) != old_active:
+        counter_service.increment(db, counter_service.USERS_ACTIVE, -1 if old_active else 1)
     db.commit()
+    statistics_service.invalidate_cache()
     db.refresh(db_obj)
     return db_obj
 
 
 def delete(db: Session, db_obj: User) -> User:
     """Delete a user."""
+    # Bookmarks and notifications go with the user, so take them out of the counters
+    bookmarked_items = [
+        item_id for (item_id,) in db.query(Bookmark.item_id).filter(Bookmark.user_id == db_obj.id)
+    ]
+    notifications, unread = db.query(
+        func.count(Notification.id),
+        func.sum(case((Notification.is_read == False, 1), else_=0)),
+    ).filter(Notification.user_id == db_obj.id).one()
+    
     db.delete(db_obj)
+    get_loader(db, User).forget(db_obj.id)
+    principal_cache.invalidate_user(db, db_obj.id)
+    counter_service.increment_bookmark_counts(db, bookmarked_items, -1)
+    counter_service.increment(db, counter_service.BOOKMARKS_TOTAL, -len(bookmarked_items))
+    counter_service.increment(db, counter_service.NOTIFICATIONS_TOTAL, -(notifications or 0))
+    counter_service.increment(db, counter_service.NOTIFICATIONS_UNREAD, -(unread or 0))
+    counter_service.increment(db, counter_service.role_key(db_obj.role), -1)
+    if db_obj.is_active:
+        counter_service.increment(db, counter_service.USERS_ACTIVE, -1)
     db.commit()
+    statistics_service.invalidate_cache()
     return db_obj
 
 
 def authenticate(db: Session, email: str, password: str) -> Optional[User]:
-    """Authenticate a user."""
+    """
+    Authenticate a user.
+    A password hashed with an outdated scheme or cost is rehashed with
+    the current BCRYPT_ROUNDS.
+    """
     user = get_by_email(db, email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = check_and_update_password(password, user.hashed_password)
+    if not valid:
         return None
+    if new_hash:
+        rehash(db, user, new_hash)
     return user
 
 
+def rehash(db: Session, db_obj: User, hashed_password: str) -> User:
+    """Store a new hash of a user's unchanged password."""
+    db_obj.hashed_password = hashed_password
+    db.add(db_obj)
+    principal_cache.invalidate_user(db, db_obj.id)
+    db.commit()
+    return db_obj
+
+
 def is_admin(user: User) -> bool:
     """Check if a user is an admin."""
     return user.role == UserRole.ADMIN
@@ -0,0 +1,241 @@
+"""
+Write-behind counting of item views.
+
+Views are added up in memory per (item, UTC day) and written to the
+item_view table in one batched upsert every VIEW_FLUSH_INTERVAL_SECONDS,
+or as soon as VIEW_BUFFER_MAX_PENDING views are waiting. A crash loses at
+most what was buffered since the last flush; a clean shutdown flushes
+everything. Each worker has its own buffer and the upserts add up.
+"""
+
+import datetime
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Subquery
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.dialect import get_insert
+from app.db.session import SessionLocal
+from app.models.item import Item
+from app.models.item_view import ItemView
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple[int, datetime.date]
+
+
+class ViewBuffer:
+    """
+    Per-process buffer of view increments, flushed by a background thread.
+
+    If flushing fails the increments are put back, as long as the buffer
+    stays under max_keys; beyond that they are dropped and counted.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float,
+        max_pending: int,
+        max_keys: int,
+        batch_size: int = 1000,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ) -> None:
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_keys = max_keys
+        self.batch_size = batch_size
+        self._session_factory = session_factory
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: Dict[Key, int] = {}
+        self._pending_views = 0
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+        self.recorded = 0
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.flushed_views = 0
+        self.flush_errors = 0
+        self.dropped_views = 0
+        self.last_flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+        self.total_flush_seconds = 0.0
+
+    def record(self, item_id: int, day: Optional[datetime.date] = None) -> None:
+        """Count one view of an item."""
+        key = (item_id, day or datetime.datetime.utcnow().date())
+        with self._lock:
+            if key not in self._pending and len(self._pending) >= self.max_keys:
+                self.dropped_views += 1
+                return
+            self._pending[key] = self._pending.get(key, 0) + 1
+            self._pending_views += 1
+            self.recorded += 1
+            full = self._pending_views >= self.max_pending
+        if full:
+            if self._thread is not None:
+                self._wake.set()
+            else:
+                self.flush()
+
+    def flush(self) -> int:
+        """Write out the buffered views. Returns the number of views written."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._pending_views = 0
+            if not pending:
+                return 0
+
+            started = time.perf_counter()
+            db = self._session_factory()
+            try:
+                written = self._upsert(db, pending)
+                db.commit()
+            except SQLAlchemyError:
+                db.rollback()
+                logger.exception("Flushing %d item view counters failed", len(pending))
+                self._requeue(pending)
+                with self._lock:
+                    self.flush_errors += 1
+                return 0
+            finally:
+                db.close()
+
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.flushes += 1
+                self.flushed_rows += len(pending)
+                self.flushed_views += written
+                self.last_flush_seconds = elapsed
+                self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+                self.total_flush_seconds += elapsed
+            return written
+
+    def _upsert(self, db: Session, pending: Dict[Key, int]) -> int:
+        # Views of items deleted since they were counted would break the foreign key
+        item_ids = {item_id for item_id, _ in pending}
+        existing = set(db.scalars(select(Item.id).where(Item.id.in_(item_ids))))
+        now = datetime.datetime.utcnow()
+        # A fixed order keeps concurrent flushes from deadlocking on the same rows
+        values: List[Dict[str, Any]] = [
+            {"item_id": item_id, "day": day, "views": views, "created_at": now, "updated_at": now}
+            for (item_id, day), views in sorted(pending.items())
+            if item_id in existing
+        ]
+        insert = get_insert(db)
+        for start in range(0, len(values), self.batch_size):
+            stmt = insert(ItemView).values(values[start:start + self.batch_size])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[ItemView.item_id, ItemView.day],
+                set_={
+                    "views": ItemView.views + stmt.excluded.views,
+                    "updated_at": stmt.excluded.updated_at,
+                },
+            )
+            db.execute(stmt)
+        return sum(row["views"] for row in values)
+
+    def _requeue(self, pending: Dict[Key, int]) -> None:
+        with self._lock:
+            for key, views in pending.items():
+                if key in self._pending or len(self._pending) < self.max_keys:
+                    self._pending[key] = self._pending.get(key, 0) + views
+                    self._pending_views += views
+                else:
+                    self.dropped_views += views
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Item view flusher failed")
+
+    def start(self) -> None:
+        """Start flushing in the background."""
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="view-counter-flush", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background flusher and write out what is left."""
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stopping = True
+            self._wake.set()
+            thread.join()
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get buffer depth and flush counters."""
+        with self._lock:
+            return {
+                "pending_keys": len(self._pending),
+                "pending_views": self._pending_views,
+                "max_pending": self.max_pending,
+                "recorded": self.recorded,
+                "flushes": self.flushes,
+                "flushed_rows": self.flushed_rows,
+                "flushed_views": self.flushed_views,
+                "flush_errors": self.flush_errors,
+                "dropped_views": self.dropped_views,
+                "last_flush_seconds": self.last_flush_seconds,
+                "max_flush_seconds": self.max_flush_seconds,
+                "avg_flush_seconds": self.total_flush_seconds / self.flushes if self.flushes else 0.0,
+                "running": self._thread is not None,
+            }
+
+
+buffer = ViewBuffer(
+    flush_interval=settings.VIEW_FLUSH_INTERVAL_SECONDS,
+    max_pending=settings.VIEW_BUFFER_MAX_PENDING,
+    max_keys=settings.VIEW_BUFFER_MAX_KEYS,
+)
+
+
+def record(item_id: int) -> None:
+    """Count one view of an item."""
+    buffer.record(item_id)
+
+
+def flush() -> int:
+    """Write out the buffered views now."""
+    return buffer.flush()
+
+
+def start() -> None:
+    """Start the background flusher."""
+    buffer.start()
+
+
+def stop() -> None:
+    """Stop the background flusher and write out the buffered views."""
+    buffer.stop()
+
+
+def recent_views(days: Optional[int] = None) -> Subquery:
+    """Get a subquery of (item_id, views) summed over the last days UTC days, today included."""
+    days = days or settings.MOST_VIEWED_WINDOW_DAYS
+    since = datetime.datetime.utcnow().date() - datetime.timedelta(days=days - 1)
+    return (
+        select(ItemView.item_id, func.sum(ItemView.views).label("views"))
+        .where(ItemView.day >= since)
+        .group_by(ItemView.item_id)
+        .subquery()
+    )
+
+
+metrics.register("view_counter", buffer.stats)
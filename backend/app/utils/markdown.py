@@ -0,0 +1,62 @@
+import hashlib
+from typing import Any, Dict, List, NamedTuple
+
+import bleach
+import markdown
+
+ALLOWED_TAGS = set(bleach.sanitizer.ALLOWED_TAGS) | {
+    "p", "pre", "hr", "br", "div", "span", "img",
+    "h1", "h2", "h3", "h4", "h5", "h6",
+    "table", "thead", "tbody", "tr", "th", "td",
+    "dl", "dt", "dd", "sup", "sub", "del",
+}
+ALLOWED_ATTRIBUTES = {
+    **bleach.sanitizer.ALLOWED_ATTRIBUTES,
+    "img": ["src", "alt", "title"],
+    "code": ["class"],
+    "div": ["class"],
+    "sup": ["id"],
+    "li": ["id"],
+    **{f"h{level}": ["id"] for level in range(1, 7)},
+}
+ALLOWED_PROTOCOLS = ["http", "https", "mailto"]
+
+
+class RenderedMarkdown(NamedTuple):
+    html: str
+    toc: List[Dict[str, Any]]
+
+
+def content_hash(content: str) -> str:
+    """Get the key rendered content is stored under."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _toc_entries(tokens: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "level": token["level"],
+            "id": token["id"],
+            "name": token["name"],
+            "children": _toc_entries(token["children"]),
+        }
+        for token in tokens
+    ]
+
+
+def render_markdown(content: str) -> RenderedMarkdown:
+    """
+    Render markdown to sanitized HTML and extract its table of contents.
+
+    Headings get ids that the table of contents entries link to. Raw HTML
+    in the markdown is escaped unless it is in the allow-list.
+    """
+    md = markdown.Markdown(extensions=["extra", "sane_lists", "toc"])
+    html = md.convert(content)
+    html = bleach.clean(
+        html,
+        tags=ALLOWED_TAGS,
+        attributes=ALLOWED_ATTRIBUTES,
+        protocols=ALLOWED_PROTOCOLS,
+    )
+    return RenderedMarkdown(html, _toc_entries(md.toc_tokens))
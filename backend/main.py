@@ -5,10 +5,15 @@ MIT License
 """
 
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.api.api_v1.api import api_router
+from app.core import hashing, rate_limit
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.services import view_counter
+from app.services.pagination import NEXT_CURSOR_HEADER, InvalidCursor
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -26,8 +31,60 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+# Compress responses
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    zstd_level=settings.COMPRESSION_ZSTD_LEVEL,
+    cache_max_entries=settings.COMPRESSION_CACHE_MAX_ENTRIES,
+    cache_max_bytes=settings.COMPRESSION_CACHE_MAX_BYTES,
+)
+
+
+@app.exception_handler(InvalidCursor)
+def invalid_cursor_handler(request: Request, exc: InvalidCursor) -> JSONResponse:
+    return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exc)})
+
+
+@app.exception_handler(hashing.PoolBusy)
+def hashing_busy_handler(request: Request, exc: hashing.PoolBusy) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.exception_handler(rate_limit.RateLimited)
+def rate_limited_handler(request: Request, exc: rate_limit.RateLimited) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.on_event("startup")
+def start_view_counter() -> None:
+    view_counter.start()
+
+
+@app.on_event("shutdown")
+def stop_view_counter() -> None:
+    # Write out buffered item views before the process exits
+    view_counter.stop()
+
+
+@app.on_event("shutdown")
+def stop_hashing_pool() -> None:
+    hashing.pool.shutdown()
+
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -0,0 +1,142 @@
+"""
+Crypto Toolkit - A comprehensive educational platform for cryptocurrencies
+Copyright (c) 2025 xPOURY4
+MIT License
+
+Measure the CPU cost of response compression against the bytes it saves.
+
+Compresses item list payloads with every available codec at several
+levels and reports the compressed size, the time per response and the
+throughput. Payloads are synthetic item pages by default; pass --from-db
+to use the first pages of GET /items/ from the configured database.
+
+    python -m scripts.benchmark_compression [--page-sizes 10 100] [--repeat 20]
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+from app.core.compression import BrotliCodec, Codec, GzipCodec, ZstdCodec, brotli, zstandard
+
+LEVELS = {
+    "gzip": [1, 6, 9],
+    "br": [1, 4, 6, 9],
+    "zstd": [1, 3, 9, 19],
+}
+
+WORDS = (
+    "bitcoin ethereum wallet private key seed phrase exchange custody validator stake "
+    "consensus block chain hash mining fee transaction address signature multisig ledger "
+    "liquidity pool token smart contract gas layer rollup bridge oracle halving node"
+).split()
+
+
+def synthetic_page(rng: random.Random, size: int) -> bytes:
+    """An item list page shaped like GET /items/ with markdown content."""
+    def sentence() -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))).capitalize() + "."
+
+    def markdown() -> str:
+        sections = []
+        for i in range(rng.randint(3, 8)):
+            paragraphs = "\n\n".join(" ".join(sentence() for _ in range(rng.randint(2, 6))) for _ in range(3))
+            sections.append(f"## Section {i + 1}\n\n{paragraphs}\n\n- {sentence()}\n- {sentence()}")
+        return "\n\n".join(sections)
+
+    items = [
+        {
+            "id": i,
+            "name": " ".join(rng.choice(WORDS) for _ in range(3)).title(),
+            "description": sentence(),
+            "content": markdown(),
+            "image": None,
+            "category_id": rng.randint(1, 10),
+            "is_featured": rng.random() < 0.1,
+            "difficulty": rng.choice(["Beginner", "Intermediate", "Advanced"]),
+            "bookmark_count": rng.randint(0, 500),
+            "created_at": "2025-01-01T00:00:00",
+            "updated_at": "2025-01-01T00:00:00",
+            "category": {"id": 1, "name": "Basics", "description": None, "icon": None},
+        }
+        for i in range(size)
+    ]
+    return json.dumps(items).encode()
+
+
+def db_page(size: int) -> bytes:
+    """The first page of GET /items/ from the configured database."""
+    from fastapi.encoders import jsonable_encoder
+
+    from app.db.session import SessionLocal
+    from app.schemas.item import Item
+    from app.services import item as item_service
+
+    db = SessionLocal()
+    try:
+        items = item_service.get_all(db, limit=size)
+        return json.dumps(jsonable_encoder([Item.model_validate(item) for item in items])).encode()
+    finally:
+        db.close()
+
+
+def codecs() -> List[Codec]:
+    result: List[Codec] = [GzipCodec(level) for level in LEVELS["gzip"]]
+    if brotli is not None:
+        result += [BrotliCodec(level) for level in LEVELS["br"]]
+    if zstandard is not None:
+        result += [ZstdCodec(level) for level in LEVELS["zstd"]]
+    return result
+
+
+def measure(codec: Codec, payload: bytes, repeat: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        compressed = codec.compress(payload)
+        timings.append(time.perf_counter() - started)
+    seconds = statistics.median(timings)
+    return {
+        "bytes": len(compressed),
+        "ms": seconds * 1000,
+        "mb_per_s": len(payload) / seconds / 1e6 if seconds else float("inf"),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[10, 100], help="items per page")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per codec (median is reported)")
+    parser.add_argument("--from-db", action="store_true", help="use items from the configured database")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    if brotli is None:
+        print("brotli not installed, skipping br")
+    if zstandard is None:
+        print("zstandard not installed, skipping zstd")
+
+    for size in args.page_sizes:
+        payload = db_page(size) if args.from_db else synthetic_page(rng, size)
+        print(f"\n{size} items, {len(payload):,} bytes uncompressed")
+        print(f"{'codec':<8}{'level':>6}{'bytes':>12}{'saved':>8}{'ms':>10}{'MB/s':>10}{'ms/KB saved':>13}")
+        for codec in codecs():
+            result = measure(codec, payload, args.repeat)
+            saved = len(payload) - result["bytes"]
+            level = getattr(codec, "level", getattr(codec, "quality", ""))
+            print(
+                f"{codec.name:<8}{level:>6}{result['bytes']:>12,}{saved / len(payload):>8.0%}"
+                f"{result['ms']:>10.2f}{result['mb_per_s']:>10.1f}"
+                f"{result['ms'] / (saved / 1024) if saved > 0 else float('inf'):>13.4f}"
+            )
+    print("\nA precompressed cache hit costs a dict lookup instead of the ms column.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
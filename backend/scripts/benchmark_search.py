@@ -0,0 +1,175 @@
+"""
+Crypto Toolkit - A comprehensive educational platform for cryptocurrencies
+Copyright (c) 2025 xPOURY4
+MIT License
+
+Compare the old ILIKE item search with the full-text index.
+
+Builds a synthetic catalog in a scratch database and times both the
+ILIKE '%term%' query that item_service.get_all used to run and
+item_service.search_items. Defaults to a throwaway SQLite file; pass
+--database-url to run against an empty PostgreSQL database instead.
+
+    python -m scripts.benchmark_search --items 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Callable, List
+
+from sqlalchemy import create_engine, insert, or_
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import Base
+from app.models.category import Category
+from app.models.item import Item
+from app.services import item as item_service
+
+# Topic terms and the share of items that mention each, so that queries
+# have realistic selectivity instead of matching nearly every row.
+TOPICS = {
+    "multisig": 0.002,
+    "halving": 0.005,
+    "custody": 0.01,
+    "validator": 0.02,
+    "consensus": 0.03,
+    "liquidity": 0.01,
+    "cold": 0.02,
+    "wallet": 0.05,
+}
+
+QUERIES = [
+    "multisig",
+    "halving",
+    "liquidity",
+    "wallet",
+    "cold wallet",
+    "validator consensus",
+    "custody multisig",
+    "nonexistentterm",
+]
+
+
+def make_vocabulary(rng: random.Random, size: int = 20000):
+    """Filler words with a Zipf-like frequency distribution."""
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = ["".join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(size)]
+    cumulative, total = [], 0.0
+    for rank in range(1, size + 1):
+        total += 1.0 / rank
+        cumulative.append(total)
+    return words, cumulative
+
+
+def make_text(rng: random.Random, vocabulary, words: int) -> str:
+    filler, cumulative = vocabulary
+    tokens = rng.choices(filler, cum_weights=cumulative, k=words)
+    for term, share in TOPICS.items():
+        if rng.random() < share:
+            tokens[rng.randrange(words)] = term
+    return " ".join(tokens)
+
+
+def make_content(rng: random.Random, vocabulary, words: int) -> str:
+    paragraphs = [make_text(rng, vocabulary, 60) for _ in range(max(1, words // 60))]
+    return "# " + make_text(rng, vocabulary, 4) + "\n\n" + "\n\n".join(paragraphs)
+
+
+def populate(session_factory, items: int, words: int, batch: int = 5000) -> None:
+    rng = random.Random(42)
+    vocabulary = make_vocabulary(rng)
+    db = session_factory()
+    try:
+        categories = [Category(name=f"Category {i}") for i in range(10)]
+        db.add_all(categories)
+        db.commit()
+        category_ids = [category.id for category in categories]
+
+        for start in range(0, items, batch):
+            rows = [
+                {
+                    "name": make_text(rng, vocabulary, 3).title(),
+                    "description": make_text(rng, vocabulary, 15),
+                    "content": make_content(rng, vocabulary, words),
+                    "category_id": rng.choice(category_ids),
+                    "is_featured": rng.random() < 0.1,
+                    "bookmark_count": 0,
+                }
+                for _ in range(start, min(start + batch, items))
+            ]
+            db.execute(insert(Item), rows)
+            db.commit()
+    finally:
+        db.close()
+
+
+def ilike_search(db, term: str, limit: int = 20) -> List[Item]:
+    return db.query(Item).filter(
+        or_(
+            Item.name.ilike(f"%{term}%"),
+            Item.description.ilike(f"%{term}%"),
+            Item.content.ilike(f"%{term}%"),
+        )
+    ).order_by(Item.name).limit(limit).all()
+
+
+def fts_search(db, term: str, limit: int = 20) -> List[Item]:
+    return item_service.search_items(db, term, limit=limit)
+
+
+def timed(fn: Callable, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--words", type=int, default=180, help="words of markdown per item")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    scratch = None
+    url = args.database_url
+    if not url:
+        scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        scratch.close()
+        url = f"sqlite:///{scratch.name}"
+
+    engine = create_engine(url)
+    session_factory = sessionmaker(bind=engine)
+    try:
+        Base.metadata.create_all(engine)
+        started = time.perf_counter()
+        populate(session_factory, args.items, args.words)
+        print(f"Loaded {args.items} items in {time.perf_counter() - started:.1f}s ({engine.dialect.name})")
+
+        db = session_factory()
+        print(f"{'query':<22}{'ilike ms':>10}{'fts ms':>10}{'speedup':>10}")
+        total_ilike = total_fts = 0.0
+        for term in QUERIES:
+            ilike = timed(lambda: ilike_search(db, term), args.repeat)
+            fts = timed(lambda: fts_search(db, term), args.repeat)
+            total_ilike += ilike
+            total_fts += fts
+            print(f"{term:<22}{ilike * 1000:>10.1f}{fts * 1000:>10.1f}{ilike / fts:>9.1f}x")
+        print(f"{'total':<22}{total_ilike * 1000:>10.1f}{total_fts * 1000:>10.1f}{total_ilike / total_fts:>9.1f}x")
+        db.close()
+    finally:
+        engine.dispose()
+        if scratch:
+            os.unlink(scratch.name)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""
+Crypto Toolkit - A comprehensive educational platform for cryptocurrencies
+Copyright (c) 2025 xPOURY4
+MIT License
+
+Build the TF-IDF index behind GET /items/{id}/similar and /items/similar.
+
+Vectorizes the name, description and content of every item and saves the
+index under SIMILAR_INDEX_DIR as a new version. Running workers map the
+new version within SIMILAR_RELOAD_SECONDS; run this periodically (e.g.
+nightly, or after a bulk import) so the workers' overlays stay small.
+
+Usage (from the backend directory):
+    python -m scripts.build_similar_index [--max-features 50000] [--min-df 2]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services import similar as similar_service
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-features", type=int, default=settings.SIMILAR_MAX_FEATURES, help="vocabulary size")
+    parser.add_argument("--min-df", type=int, default=settings.SIMILAR_MIN_DF, help="minimum documents per term")
+    parser.add_argument("--directory", default=similar_service.index_dir(), help="where to save the index")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        # Waits for a worker that is building the first index
+        with similar_service.build_lock(args.directory):
+            index = similar_service.TfidfIndex.build(
+                similar_service.iter_documents(db), args.max_features, args.min_df
+            )
+            index.save(args.directory)
+        stats = index.stats()
+        print(
+            f"Indexed {stats['documents']} items, {stats['terms']} terms, {stats['nnz']} weights "
+            f"in {time.perf_counter() - started:.1f}s as {os.path.join(args.directory, index.version)}"
+        )
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
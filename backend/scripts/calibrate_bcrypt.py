@@ -0,0 +1,80 @@
+"""
+Crypto Toolkit - A comprehensive educational platform for cryptocurrencies
+Copyright (c) 2025 xPOURY4
+MIT License
+
+Recommend a bcrypt cost (BCRYPT_ROUNDS) for a target login latency.
+
+Times bcrypt hashes on this machine at increasing rounds, each round
+doubling the work, and recommends the highest rounds whose median hash
+time stays within --target-ms. Also shows how many logins per second the
+hashing pool sustains at each cost with PASSWORD_HASH_WORKERS workers.
+Run it on the hardware that serves logins.
+
+Changing BCRYPT_ROUNDS needs no migration: existing hashes still verify
+and are rehashed with the new cost on their owner's next login.
+
+Usage (from the backend directory):
+    python -m scripts.calibrate_bcrypt [--target-ms 250] [--min-rounds 10] [--max-rounds 16]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from typing import List, Optional
+
+from passlib.hash import bcrypt
+
+from app.core.config import settings
+
+
+def time_hash(rounds: int, repeat: int) -> List[float]:
+    """Seconds taken by each of repeat hashes at the given rounds."""
+    hasher = bcrypt.using(rounds=rounds)
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        hasher.hash("calibration password")
+        times.append(time.perf_counter() - started)
+    return times
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target-ms", type=float, default=250.0, help="acceptable hash time per login")
+    parser.add_argument("--min-rounds", type=int, default=10, help="lowest rounds to try (bcrypt allows 4)")
+    parser.add_argument("--max-rounds", type=int, default=16, help="highest rounds to try (bcrypt allows 31)")
+    parser.add_argument("--repeat", type=int, default=5, help="hashes timed per rounds value")
+    parser.add_argument("--workers", type=int, default=settings.PASSWORD_HASH_WORKERS, help="hashing pool size")
+    args = parser.parse_args()
+
+    if not 4 <= args.min_rounds <= args.max_rounds <= 31:
+        parser.error("need 4 <= --min-rounds <= --max-rounds <= 31")
+
+    target = args.target_ms / 1000
+    recommended: Optional[int] = None
+    print(f"{'rounds':>6}  {'median ms':>10}  {'max ms':>8}  {'logins/s':>9}")
+    for rounds in range(args.min_rounds, args.max_rounds + 1):
+        times = time_hash(rounds, args.repeat)
+        median = statistics.median(times)
+        marker = "  (current)" if rounds == settings.BCRYPT_ROUNDS else ""
+        print(
+            f"{rounds:>6}  {median * 1000:>10.1f}  {max(times) * 1000:>8.1f}  "
+            f"{args.workers / median:>9.1f}{marker}"
+        )
+        if median <= target:
+            recommended = rounds
+        elif median > 2 * target:
+            # Every further round doubles the time, so stop early
+            break
+
+    if recommended is None:
+        print(f"\nEven {args.min_rounds} rounds take longer than {args.target_ms:.0f} ms on this machine")
+        return 1
+    print(f"\nRecommended: BCRYPT_ROUNDS={recommended} (current: {settings.BCRYPT_ROUNDS})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Crypto Toolkit - A comprehensive educational platform for cryptocurrencies
+Copyright (c) 2025 xPOURY4
+MIT License
+
+Guard against N+1 loading in list endpoints.
+
+Loads and serializes each list the way its endpoint does, once with a
+small page and once with a large one, and fails if the number of SQL
+statements differs. Run it against a database with some data in it: a
+list with no more rows in the large page than in the small one is
+skipped, and if every list is skipped the check fails.
+
+Usage (from the backend directory):
+    python -m scripts.check_query_counts [--small 1] [--large 50]
+"""
+
+import argparse
+import sys
+from typing import Any, Callable, List, Tuple, Type
+
+from pydantic import BaseModel
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.api.fields import schema_columns
+from app.db.query_counter import count_queries
+from app.db.session import SessionLocal
+from app.models.bookmark import Bookmark as BookmarkModel
+from app.models.item import Item as ItemModel
+from app.models.notification import Notification as NotificationModel
+from app.schemas.bookmark import Bookmark, BookmarkSummary
+from app.schemas.category import Category
+from app.schemas.item import Item, ItemSummary
+from app.schemas.notification import Notification
+from app.schemas.user import User
+from app.services import bookmark as bookmark_service
+from app.services import category as category_service
+from app.services import item as item_service
+from app.services import notification as notification_service
+from app.services import user as user_service
+
+Loader = Callable[[Session, int], List[Any]]
+
+
+def _busiest_user(db: Session, model: Any) -> int:
+    """Get the user with the most rows in a table, so pages fill up."""
+    row = db.query(model.user_id).group_by(model.user_id).order_by(func.count().desc()).first()
+    return row[0] if row else 0
+
+
+def _bookmarks(db: Session, limit: int, **kwargs: Any) -> List[Any]:
+    return bookmark_service.get_all_by_user(db, _busiest_user(db, BookmarkModel), limit=limit, **kwargs)
+
+
+def _notifications(db: Session, limit: int) -> List[Any]:
+    return notification_service.get_all_by_user(db, _busiest_user(db, NotificationModel), limit=limit)
+
+
+CHECKS: List[Tuple[str, Loader, Type[BaseModel]]] = [
+    ("items", lambda db, limit: item_service.get_all(db, limit=limit), Item),
+    (
+        "items?view=summary",
+        lambda db, limit: item_service.get_all(
+            db, limit=limit, columns=schema_columns(ItemSummary, ItemModel)
+        ),
+        ItemSummary,
+    ),
+    ("bookmarks", _bookmarks, Bookmark),
+    (
+        "bookmarks?view=summary",
+        lambda db, limit: _bookmarks(
+            db,
+            limit,
+            columns=schema_columns(BookmarkSummary, BookmarkModel),
+            item_columns=schema_columns(ItemSummary, ItemModel),
+        ),
+        BookmarkSummary,
+    ),
+    ("categories", lambda db, limit: category_service.get_all(db, limit=limit), Category),
+    ("notifications", _notifications, Notification),
+    ("users", lambda db, limit: user_service.get_all(db, limit=limit), User),
+]
+
+
+def measure(loader: Loader, schema: Type[BaseModel], limit: int) -> Tuple[int, int]:
+    """Load and serialize one page in a fresh session. Returns (rows, statements)."""
+    db = SessionLocal()
+    try:
+        with count_queries() as counter:
+            rows = loader(db, limit)
+            for row in rows:
+                schema.model_validate(row)
+        return len(rows), counter.count
+    finally:
+        db.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--small", type=int, default=1, help="small page size")
+    parser.add_argument("--large", type=int, default=50, help="large page size")
+    args = parser.parse_args()
+
+    failed = 0
+    measured = 0
+    for name, loader, schema in CHECKS:
+        small_rows, small_count = measure(loader, schema, args.small)
+        large_rows, large_count = measure(loader, schema, args.large)
+        if large_rows <= small_rows:
+            status = "SKIP (not enough rows)"
+        elif large_count > small_count:
+            status = "FAIL"
+            failed += 1
+            measured += 1
+        else:
+            status = "ok"
+            measured += 1
+        print(
+            f"{name:<24} {small_rows:>4} rows: {small_count:>3} queries"
+            f"   {large_rows:>4} rows: {large_count:>3} queries   {status}"
+        )
+    if not measured:
+        print(f"\nNothing measured: no list has more than {args.small} rows")
+        return 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
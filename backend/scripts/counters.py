@@ -0,0 +1,60 @@
+"""
+Crypto Toolkit - A comprehensive educational platform for cryptocurrencies
+Copyright (c) 2025 xPOURY4
+MIT License
+
+Check or rebuild the denormalized counters.
+
+Usage (from the backend directory):
+    python -m scripts.counters check
+    python -m scripts.counters rebuild
+"""
+
+import argparse
+import sys
+
+from app.db.session import SessionLocal
+from app.services import counter as counter_service
+
+
+def check() -> int:
+    """Report counter drift. Returns a non-zero exit code if anything drifted."""
+    db = SessionLocal()
+    try:
+        drift = counter_service.check(db)
+    finally:
+        db.close()
+
+    for key, stored, expected in drift["counters"]:
+        print(f"counter {key}: stored={stored} expected={expected}")
+    for item_id, stored, expected in drift["items"]:
+        print(f"item {item_id} bookmark_count: stored={stored} expected={expected}")
+    for user_id, stored, expected in drift["users"]:
+        print(f"user {user_id} unread_count: stored={stored} expected={expected}")
+
+    drifted = sum(len(rows) for rows in drift.values())
+    print(f"{drifted} drifted counter(s)")
+    return 1 if drifted else 0
+
+
+def rebuild() -> int:
+    """Rebuild every counter from the source tables."""
+    db = SessionLocal()
+    try:
+        counters = counter_service.rebuild(db)
+    finally:
+        db.close()
+
+    print(f"Rebuilt {len(counters)} global counter(s)")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check or rebuild denormalized counters")
+    parser.add_argument("command", choices=["check", "rebuild"])
+    args = parser.parse_args()
+    return check() if args.command == "check" else rebuild()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
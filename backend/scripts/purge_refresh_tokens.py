@@ -0,0 +1,35 @@
+"""
+Crypto Toolkit - A comprehensive educational platform for cryptocurrencies
+Copyright (c) 2025 xPOURY4
+MIT License
+
+Delete expired and revoked refresh tokens.
+
+Every refresh leaves its used token behind until it expires, so reuse
+can still be detected; run this daily to keep the table small.
+
+Usage (from the backend directory):
+    python -m scripts.purge_refresh_tokens
+"""
+
+import argparse
+import sys
+
+from app.db.session import SessionLocal
+from app.services import refresh_token as refresh_token_service
+
+
+def main() -> int:
+    argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter).parse_args()
+    db = SessionLocal()
+    try:
+        deleted = refresh_token_service.purge(db)
+    finally:
+        db.close()
+
+    print(f"Deleted {deleted} refresh token(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
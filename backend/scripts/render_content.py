@@ -0,0 +1,95 @@
+"""
+Crypto Toolkit - A comprehensive educational platform for cryptocurrencies
+Copyright (c) 2025 xPOURY4
+MIT License
+
+Render item content to HTML in bulk.
+
+Renders every item whose content has not been rendered yet, e.g. after
+the 0006 migration. Each distinct content is rendered once, in a pool of
+worker processes. With --force everything is rendered again, e.g. after
+changing the renderer; --prune deletes rendered content no item uses.
+
+Usage (from the backend directory):
+    python -m scripts.render_content [--workers N] [--batch-size 500] [--force] [--prune]
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Set
+
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.item import Item
+from app.models.rendered_content import RenderedContent
+from app.services import render as render_service
+from app.utils.markdown import content_hash, render_markdown
+
+
+def render_batch(db: Session, pool: ProcessPoolExecutor, items: Dict[int, str], force: bool, done: Set[str]) -> int:
+    """
+    Render and store the content of a batch of items, skipping content in
+    done and adding what was rendered to it. Returns the number of renders.
+    """
+    hashes = {item_id: content_hash(content) for item_id, content in items.items()}
+    todo = set(hashes.values()) if force else render_service.missing(db, hashes.values())
+    todo -= done
+    contents = {hashes[item_id]: content for item_id, content in items.items() if hashes[item_id] in todo}
+    if force and contents:
+        db.query(RenderedContent).filter(
+            RenderedContent.content_hash.in_(contents)
+        ).delete(synchronize_session=False)
+
+    keys = list(contents)
+    results = pool.map(render_markdown, [contents[key] for key in keys], chunksize=16)
+    render_service.store(db, dict(zip(keys, results)))
+    done.update(keys)
+    db.bulk_update_mappings(Item, [
+        {"id": item_id, "content_hash": key} for item_id, key in hashes.items()
+    ])
+    db.commit()
+    return len(keys)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="render processes")
+    parser.add_argument("--batch-size", type=int, default=500, help="items per batch")
+    parser.add_argument("--force", action="store_true", help="render all content again")
+    parser.add_argument("--prune", action="store_true", help="delete unused rendered content")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        query = db.query(Item.id, Item.content).order_by(Item.id)
+        if not args.force:
+            # Items with no hash yet, or whose rendered row is gone
+            rendered = db.query(RenderedContent.content_hash)
+            query = query.filter(Item.content_hash.is_(None) | Item.content_hash.notin_(rendered))
+
+        items_done = renders = 0
+        last_id = 0
+        done: Set[str] = set()
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            while True:
+                batch = dict(query.filter(Item.id > last_id).limit(args.batch_size).all())
+                if not batch:
+                    break
+                renders += render_batch(db, pool, batch, args.force, done)
+                items_done += len(batch)
+                last_id = max(batch)
+                print(f"{items_done} items, {renders} rendered")
+
+        print(f"Done: {items_done} items, {renders} distinct contents rendered")
+        if args.prune:
+            print(f"Pruned {render_service.prune(db)} unused rendered contents")
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
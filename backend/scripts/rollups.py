@@ -0,0 +1,31 @@
+"""
+Crypto Toolkit - A comprehensive educational platform for cryptocurrencies
+Copyright (c) 2025 xPOURY4
+MIT License
+
+Fold new rows into the engagement rollups. Meant to run from cron, e.g.
+every minute:
+
+    * * * * * cd /srv/crypto-toolkit/backend && python -m scripts.rollups
+"""
+
+import sys
+
+from app.db.session import SessionLocal
+from app.services import rollup as rollup_service
+
+
+def main() -> int:
+    db = SessionLocal()
+    try:
+        processed = rollup_service.run(db)
+    finally:
+        db.close()
+
+    for metric, count in processed.items():
+        print(f"{metric}: {count} new row id(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())